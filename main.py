@@ -1,4 +1,5 @@
 import logging
+import multiprocessing
 import sys
 import os
 
@@ -22,6 +23,8 @@ logging.basicConfig(
 )
 
 if __name__ == '__main__':
+    # Для пула процессов, считающего хэши модов, в собранном exe
+    multiprocessing.freeze_support()
     logging.info('Initializing directories')
     setup_directories()
     logging.info('Creating application')
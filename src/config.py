@@ -1,8 +1,7 @@
 import os
 
-from minecraft_launcher_lib.utils import get_minecraft_directory, get_version_list
+from minecraft_launcher_lib.utils import get_minecraft_directory
 
-MINECRAFT_VERSIONS: list[str] = [version['id'] for version in get_version_list() if version['type'] == 'release']
 ELY_CLIENT_ID = '16Launcher'
 RELEASE = False
 ELY_BY_INJECT = '-javaagent:{}=ely.by'
@@ -11,17 +10,34 @@ MINECRAFT_DIR: str = os.path.join(get_minecraft_directory(), '16launcher')
 SKINS_DIR: str = os.path.join(MINECRAFT_DIR, 'skins')
 SETTINGS_PATH: str = os.path.join(MINECRAFT_DIR, 'settings.json')
 LOG_FILE: str = os.path.join(MINECRAFT_DIR, 'launcher_log.txt')
+SESSION_LOGS_DIR: str = os.path.join(MINECRAFT_DIR, 'session_logs')
 NEWS_FILE: str = os.path.join(MINECRAFT_DIR, 'launcher_news.json')
+INSTALL_QUEUE_PATH: str = os.path.join(MINECRAFT_DIR, 'install_queue.json')
+VERSION_MANIFEST_URL: str = 'https://launchermeta.mojang.com/mc/game/version_manifest_v2.json'
+VERSION_MANIFEST_PATH: str = os.path.join(MINECRAFT_DIR, 'version_manifest.json')
 ELYBY_API_URL: str = 'https://authserver.ely.by/api/'
 ELYBY_SKINS_URL: str = 'https://skinsystem.ely.by/skins/'
 ELYBY_AUTH_URL: str = 'https://account.ely.by/oauth2/v1'
 MODS_DIR: str = os.path.join(MINECRAFT_DIR, 'mods')
+MODPACKS_DIR: str = os.path.join(MINECRAFT_DIR, 'modpacks')
+MODPACKS_DB_PATH: str = os.path.join(MODPACKS_DIR, 'modpacks.sqlite3')
+INSTANCES_DIR: str = os.path.join(MINECRAFT_DIR, 'instances')
+MOD_STORE_DIR: str = os.path.join(MINECRAFT_DIR, 'store')
+CACHE_DIR: str = os.path.join(MINECRAFT_DIR, 'cache')
+ICON_CACHE_DIR: str = os.path.join(CACHE_DIR, 'icons')
+RESPONSE_CACHE_PATH: str = os.path.join(CACHE_DIR, 'responses.sqlite3')
+FILE_HASH_CACHE_PATH: str = os.path.join(CACHE_DIR, 'file_hashes.sqlite3')
+MOD_INDEX_PATH: str = os.path.join(CACHE_DIR, 'mod_index.sqlite3')
+LAUNCH_PLAN_CACHE_PATH: str = os.path.join(CACHE_DIR, 'launch_plans.sqlite3')
+LOADER_CATALOG_PATH: str = os.path.join(CACHE_DIR, 'loader_catalog.json')
+MOD_CATALOG_PATH: str = os.path.join(MINECRAFT_DIR, 'mod_catalog.sqlite3')
 AUTHLIB_INJECTOR_URL: str = 'https://authlib-injector.ely.by/artifact/latest.json'
 AUTHLIB_JAR_PATH: str = os.path.join(MINECRAFT_DIR, 'authlib-injector.jar')
 CLIENT_ID = '16Launcher1'
 DEVICE_CODE_URL = 'https://authserver.ely.by/oauth2/device'
 TOKEN_URL = 'https://authserver.ely.by/oauth2/token'
-headers = {'Content-Type': 'application/json', 'User-Agent': '16Launcher/1.0'}
+USER_AGENT = '16Launcher/1.0'
+headers = {'Content-Type': 'application/json', 'User-Agent': USER_AGENT}
 default_settings = {
     'show_motd': True,
     'language': 'ru',
@@ -33,6 +49,7 @@ default_settings = {
     'last_version': '',
     'last_loader': 'vanilla',
     'show_snapshots': False,
+    'mod_catalog': False,
 }
 adjectives = [
     'Cool',
@@ -81,3 +98,10 @@ nouns = [
 ]
 numbers = ['123', '42', '99', '2023', '777', '1337', '69', '100', '1', '0']
 versions = 'versions'
+
+
+def get_minecraft_versions() -> list[str]:
+    """Список релизных версий Minecraft (манифест загружается при первом обращении)"""
+    from version_manifest import version_manifest
+
+    return version_manifest.get_release_ids()
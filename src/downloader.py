@@ -0,0 +1,214 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable
+
+import http_client
+
+CHUNK_SIZE = 64 * 1024
+PROGRESS_INTERVAL = 0.2
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadCancelled(DownloadError):
+    pass
+
+
+@dataclass
+class DownloadTask:
+    url: str
+    dest: str
+    # Алгоритм -> ожидаемый hex-хэш, например {'sha1': ..., 'sha512': ...}
+    hashes: dict[str, str] = field(default_factory=dict)
+    size: int | None = None
+
+
+@dataclass
+class DownloadProgress:
+    downloaded: int
+    total: int | None
+    speed: float
+    eta: float | None
+
+
+ProgressCallback = Callable[[DownloadProgress], None]
+
+
+def file_matches(path: str, hashes: dict[str, str]) -> bool:
+    """Проверяет, что файл существует и совпадает со всеми ожидаемыми хэшами"""
+    if not hashes or not os.path.exists(path):
+        return False
+    hashers = {algo: hashlib.new(algo) for algo in hashes}
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            for hasher in hashers.values():
+                hasher.update(chunk)
+    return all(hashers[algo].hexdigest() == expected.lower() for algo, expected in hashes.items())
+
+
+class _ProgressMeter:
+    """Считает скорость и оставшееся время, вызывает callback не чаще PROGRESS_INTERVAL"""
+
+    def __init__(self, total: int | None, callback: ProgressCallback | None) -> None:
+        self.total = total
+        self.callback = callback
+        self.downloaded = 0
+        self._started = time.monotonic()
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def advance(self, count: int, force: bool = False) -> None:
+        with self._lock:
+            self.downloaded += count
+            now = time.monotonic()
+            if not self.callback or (not force and now - self._last_report < PROGRESS_INTERVAL):
+                return
+            self._last_report = now
+            elapsed = max(now - self._started, 1e-6)
+            speed = self.downloaded / elapsed
+            eta = (self.total - self.downloaded) / speed if self.total and speed > 0 else None
+            progress = DownloadProgress(self.downloaded, self.total, speed, eta)
+        self.callback(progress)
+
+
+class Downloader:
+    """Скачивание файлов во временный файл с докачкой, проверкой хэшей и атомарной заменой"""
+
+    def __init__(self, max_workers: int = 4) -> None:
+        self.max_workers = max_workers
+
+    def download(
+        self,
+        task: DownloadTask,
+        progress: ProgressCallback | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> str:
+        meter = _ProgressMeter(task.size, progress)
+        self._download(task, meter, cancel_event)
+        meter.advance(0, force=True)
+        return task.dest
+
+    def download_all(
+        self,
+        tasks: list[DownloadTask],
+        progress: ProgressCallback | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> list[str]:
+        """Скачивает файлы параллельно, прогресс суммируется по всем задачам"""
+        total = sum(task.size for task in tasks if task.size) if all(task.size for task in tasks) else None
+        meter = _ProgressMeter(total, progress)
+        cancel_event = cancel_event or threading.Event()
+        errors: list[Exception] = []
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='downloader') as executor:
+            futures = [executor.submit(self._download, task, meter, cancel_event) for task in tasks]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(e)
+                    # Одна ошибка отменяет остальные загрузки
+                    cancel_event.set()
+
+        meter.advance(0, force=True)
+        if errors:
+            cancelled = [e for e in errors if not isinstance(e, DownloadCancelled)]
+            raise (cancelled or errors)[0]
+        return [task.dest for task in tasks]
+
+    def _download(self, task: DownloadTask, meter: _ProgressMeter, cancel_event: threading.Event | None) -> None:
+        if file_matches(task.dest, task.hashes):
+            meter.advance(task.size or os.path.getsize(task.dest))
+            return
+
+        os.makedirs(os.path.dirname(task.dest) or '.', exist_ok=True)
+        part_path = f'{task.dest}.part'
+        validator_path = f'{part_path}.validator'
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = _read_validator(validator_path) if offset else None
+        if offset and validator is None and not task.hashes:
+            # Без хэшей и без валидатора нельзя проверить, что файл на сервере не изменился - начинаем заново
+            offset = 0
+        request_headers = {}
+        if offset:
+            request_headers['Range'] = f'bytes={offset}-'
+            if validator:
+                # Если файл на сервере изменился, сервер отдаст его целиком (200), а не продолжение
+                request_headers['If-Range'] = validator
+
+        with http_client.get(task.url, headers=request_headers, stream=True) as response:
+            if response.status_code == 416:
+                response.close()
+                if not task.hashes:
+                    # Проверить скачанное нечем - скачиваем файл заново
+                    _remove_part(part_path)
+                    self._download(task, meter, cancel_event)
+                    return
+                # Сервер считает, что докачивать нечего - проверим то, что уже скачано
+            elif response.status_code == 206:
+                meter.advance(offset)
+            elif response.status_code == 200:
+                offset = 0
+                _write_validator(validator_path, response.headers)
+            else:
+                response.raise_for_status()
+
+            if response.status_code != 416:
+                mode = 'ab' if offset else 'wb'
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise DownloadCancelled(f'Загрузка отменена: {task.url}')
+                        f.write(chunk)
+                        meter.advance(len(chunk))
+
+        if task.hashes and not file_matches(part_path, task.hashes):
+            _remove_part(part_path)
+            raise DownloadError(f'Хэш файла не совпадает: {task.url}')
+        os.replace(part_path, task.dest)
+        _remove_file(validator_path)
+        logging.debug(f'Файл скачан: {task.dest}')
+
+
+def _read_validator(path: str) -> str | None:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _write_validator(path: str, headers: Mapping[str, str]) -> None:
+    """Запоминает ETag или Last-Modified ответа, с которого начат .part, для If-Range при докачке"""
+    etag = headers.get('ETag')
+    # If-Range принимает только сильный ETag
+    validator = etag if etag and not etag.startswith('W/') else headers.get('Last-Modified')
+    if validator:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(validator)
+    else:
+        _remove_file(path)
+
+
+def _remove_part(part_path: str) -> None:
+    """Удаляет недокачанный файл вместе с его валидатором"""
+    _remove_file(part_path)
+    _remove_file(f'{part_path}.validator')
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+downloader = Downloader()
@@ -1,7 +1,6 @@
 import logging
 
-import requests
-
+import http_client
 from ely_device import authorize_via_device_code
 from flow import logged
 from util import read, write
@@ -31,7 +30,7 @@ def _auth(login, password):
         'clientToken': 'tlauncher',
         'requestUser': True,
     }
-    r = requests.post(BASE_URL + '/auth/authenticate', data=data)
+    r = http_client.post(BASE_URL + '/auth/authenticate', data=data)
     if r.status_code != 200:
         raise AuthError(r.text)
     return r.json()
@@ -129,7 +128,7 @@ def auth_password(email, password):
         'requestUser': True,
     }
 
-    response = requests.post(url, json=payload)
+    response = http_client.post(url, json=payload)
     if response.status_code != 200:
         raise AuthError(response.text)
 
@@ -143,7 +142,7 @@ def auth_password(email, password):
 
 def get_skin_url(username):
     """Получает URL скина пользователя"""
-    response = requests.get(f'https://skinsystem.ely.by/skins/{username}.png')
+    response = http_client.get(f'https://skinsystem.ely.by/skins/{username}.png')
     return response.url if response.status_code == 200 else None
 
 
@@ -160,7 +159,7 @@ def upload_skin(file_path, token, variant='classic'):
     with open(file_path, 'rb') as f:
         files = {'file': ('skin.png', f, 'image/png'), 'variant': (None, variant)}
 
-        response = requests.put(url, headers=headers, files=files)
+        response = http_client.put(url, headers=headers, files=files)
 
     if response.status_code == 200:
         return True
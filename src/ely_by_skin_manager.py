@@ -1,10 +1,8 @@
 import logging
 import os
-import shutil
 import webbrowser
 from base64 import b64encode
 
-import requests
 from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import (
     QDialog,
@@ -15,7 +13,9 @@ from PyQt5.QtWidgets import (
     QVBoxLayout,
 )
 
+import http_client
 from config import ELYBY_AUTH_URL, ELYBY_SKINS_URL, SKINS_DIR
+from downloader import DownloadTask, downloader
 
 
 class ElyBySkinManager:
@@ -23,7 +23,7 @@ class ElyBySkinManager:
     def get_skin_url(username):
         """Получаем URL скина для указанного пользователя"""
         try:
-            response = requests.get(
+            response = http_client.get(
                 f'{ELYBY_SKINS_URL}{username}.png',
                 allow_redirects=False,
             )
@@ -42,14 +42,8 @@ class ElyBySkinManager:
             return False
 
         try:
-            response = requests.get(skin_url, stream=True)
-            if response.status_code == 200:
-                os.makedirs(SKINS_DIR, exist_ok=True)
-                dest_path = os.path.join(SKINS_DIR, f'{username}.png')
-                with open(dest_path, 'wb') as f:
-                    response.raw.decode_content = True
-                    shutil.copyfileobj(response.raw, f)
-                return True
+            downloader.download(DownloadTask(url=skin_url, dest=os.path.join(SKINS_DIR, f'{username}.png')))
+            return True
         except Exception as e:
             logging.exception(f'Ошибка при загрузке скина: {e}')
 
@@ -116,7 +110,7 @@ class ElyBySkinManager:
                 }
 
                 # Отправляем запрос на авторизацию
-                response = requests.post(
+                response = http_client.post(
                     f'{ELYBY_AUTH_URL}/token',
                     headers=headers,
                     json={
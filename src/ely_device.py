@@ -2,13 +2,12 @@ import logging
 import time
 import webbrowser
 
-import requests
-
+import http_client
 from config import CLIENT_ID, DEVICE_CODE_URL, TOKEN_URL, headers
 
 
 def get_device_code():
-    response = requests.post(
+    response = http_client.post(
         DEVICE_CODE_URL,
         json={  # Используем json= вместо data=
             'client_id': CLIENT_ID,
@@ -25,7 +24,7 @@ def get_device_code():
 
 def poll_for_token(device_code, interval, expires_in):
     for _ in range(int(expires_in / interval)):
-        response = requests.post(
+        response = http_client.post(
             TOKEN_URL,
             data={
                 'client_id': CLIENT_ID,
@@ -2,9 +2,9 @@ import logging
 import os
 import shutil
 
-import requests
-
+import http_client
 from config import MINECRAFT_DIR, SKINS_DIR
+from downloader import DownloadTask, downloader
 
 
 class ElySkinManager:
@@ -40,7 +40,7 @@ class ElySkinManager:
     def get_skin_texture_url(username):
         """Получаем URL текстуры скина через текстуры-прокси"""
         try:
-            response = requests.get(f'https://skinsystem.ely.by/textures/{username}')
+            response = http_client.get(f'https://skinsystem.ely.by/textures/{username}')
             if response.status_code == 200:
                 data = response.json()
                 return data.get('textures', {}).get('SKIN', {}).get('url')
@@ -59,14 +59,8 @@ class ElySkinManager:
         """Скачиваем скин с Ely.by"""
         try:
             skin_url = ElySkinManager.get_skin_image_url(username)
-            response = requests.get(skin_url, stream=True)
-            if response.status_code == 200:
-                os.makedirs(SKINS_DIR, exist_ok=True)
-                dest_path = os.path.join(SKINS_DIR, f'{username}.png')
-                with open(dest_path, 'wb') as f:
-                    response.raw.decode_content = True
-                    shutil.copyfileobj(response.raw, f)
-                return True
+            downloader.download(DownloadTask(url=skin_url, dest=os.path.join(SKINS_DIR, f'{username}.png')))
+            return True
         except Exception as e:
             logging.exception(f'Ошибка при загрузке скина: {e}')
         return False
@@ -89,7 +83,7 @@ class ElySkinManager:
                     'variant': (None, variant),
                 }
 
-                response = requests.put(url, headers=headers, files=files)
+                response = http_client.put(url, headers=headers, files=files)
 
                 if response.status_code == 200:
                     return True, 'Скин успешно загружен!'
@@ -105,7 +99,7 @@ class ElySkinManager:
         """Сбрасывает скин на стандартный"""
         try:
             headers = {'Authorization': f'Bearer {access_token}'}
-            response = requests.delete(
+            response = http_client.delete(
                 'https://account.ely.by/api/resources/skin',
                 headers=headers,
             )
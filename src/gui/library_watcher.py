@@ -0,0 +1,158 @@
+import logging
+import os
+from typing import NamedTuple
+
+from PyQt5.QtCore import QFileSystemWatcher, QObject, QTimer, pyqtSignal
+
+# События файловой системы приходят пачками (копирование, распаковка), ждём их окончания
+RESCAN_DELAY_MS = 200
+
+
+class FileStat(NamedTuple):
+    size: int
+    mtime_ns: int
+
+
+class WatchedDir(NamedTuple):
+    suffixes: tuple[str, ...]
+    # Подпапки тоже отслеживаются (например, MODS_DIR/<версия>)
+    subdirectories: bool
+    # Файлы перезаписываются на месте, и об этом сообщает только наблюдение за самим файлом
+    watch_files: bool
+
+
+class LibraryWatcher(QObject):
+    """
+    Индекс файлов в папках модов, обновляемый по событиям QFileSystemWatcher.
+    При изменении перечитывается только затронутая папка, а наружу уходят сигналы по отдельным файлам.
+    """
+
+    file_added = pyqtSignal(str)
+    file_removed = pyqtSignal(str)
+    file_modified = pyqtSignal(str)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.schedule_rescan)
+        self.watcher.fileChanged.connect(lambda path: self.schedule_rescan(os.path.dirname(path)))
+        self.watched: dict[str, WatchedDir] = {}
+        self.entries: dict[str, dict[str, FileStat]] = {}
+        self.dirty: set[str] = set()
+
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(RESCAN_DELAY_MS)
+        self.rescan_timer.timeout.connect(self.rescan_dirty)
+
+    def watch(
+        self,
+        directory: str,
+        suffixes: tuple[str, ...] = (),
+        subdirectories: bool = False,
+        watch_files: bool = False,
+    ) -> None:
+        """Начинает следить за папкой, текущие файлы попадают в индекс без сигналов"""
+        directory = os.path.abspath(directory)
+        os.makedirs(directory, exist_ok=True)
+        self.watched[directory] = WatchedDir(suffixes, subdirectories, watch_files)
+        self._watch_dir(directory, self.watched[directory], emit=False)
+
+    def files(self, directory: str) -> dict[str, FileStat]:
+        """Имя файла -> (размер, время изменения) без обращения к диску"""
+        return self.entries.get(os.path.abspath(directory), {})
+
+    def stat(self, path: str) -> FileStat | None:
+        path = os.path.abspath(path)
+        return self.entries.get(os.path.dirname(path), {}).get(os.path.basename(path))
+
+    def schedule_rescan(self, directory: str) -> None:
+        self.dirty.add(directory)
+        self.rescan_timer.start()
+
+    def rescan_dirty(self) -> None:
+        dirty, self.dirty = self.dirty, set()
+        for directory in dirty:
+            self.rescan(directory)
+
+    def rescan(self, directory: str) -> None:
+        """Сравнивает папку с индексом и сообщает об отличиях (можно вызвать сразу после записи файла)"""
+        directory = os.path.abspath(directory)
+        self.dirty.discard(directory)
+        if directory in self.watched:
+            self._rescan_subdirectories(directory, self.watched[directory])
+        config = self._config_for(directory)
+        if config is None or directory not in self.entries:
+            return
+
+        old = self.entries[directory]
+        new = self._scan(directory, config)
+        self.entries[directory] = new
+        if config.watch_files:
+            self._watch_files(directory, new)
+
+        for name in old.keys() - new.keys():
+            self.file_removed.emit(os.path.join(directory, name))
+        for name, stat in new.items():
+            if name not in old:
+                self.file_added.emit(os.path.join(directory, name))
+            elif old[name] != stat:
+                self.file_modified.emit(os.path.join(directory, name))
+
+    def _config_for(self, directory: str) -> WatchedDir | None:
+        if directory in self.watched:
+            return self.watched[directory]
+        parent = self.watched.get(os.path.dirname(directory))
+        return parent if parent is not None and parent.subdirectories else None
+
+    def _watch_dir(self, directory: str, config: WatchedDir, emit: bool) -> None:
+        entries = self._scan(directory, config)
+        self.entries[directory] = entries
+        self.watcher.addPath(directory)
+        if config.watch_files:
+            self._watch_files(directory, entries)
+        if emit:
+            for name in entries:
+                self.file_added.emit(os.path.join(directory, name))
+        if config.subdirectories and directory in self.watched:
+            for subdirectory in self._subdirectories(directory):
+                self._watch_dir(subdirectory, config, emit)
+
+    def _rescan_subdirectories(self, directory: str, config: WatchedDir) -> None:
+        if not config.subdirectories:
+            return
+        current = set(self._subdirectories(directory))
+        known = {path for path in self.entries if os.path.dirname(path) == directory}
+        for subdirectory in current - known:
+            self._watch_dir(subdirectory, config, emit=True)
+        for subdirectory in known - current:
+            self.watcher.removePath(subdirectory)
+            for name in self.entries.pop(subdirectory):
+                self.file_removed.emit(os.path.join(subdirectory, name))
+
+    def _watch_files(self, directory: str, entries: dict[str, FileStat]) -> None:
+        # После атомарной замены (os.replace) наблюдение за старым файлом пропадает
+        watched = set(self.watcher.files())
+        paths = [os.path.join(directory, name) for name in entries]
+        missing = [path for path in paths if path not in watched]
+        if missing:
+            self.watcher.addPaths(missing)
+
+    @staticmethod
+    def _subdirectories(directory: str) -> list[str]:
+        try:
+            return [entry.path for entry in os.scandir(directory) if entry.is_dir()]
+        except OSError:
+            return []
+
+    @staticmethod
+    def _scan(directory: str, config: WatchedDir) -> dict[str, FileStat]:
+        entries = {}
+        try:
+            for entry in os.scandir(directory):
+                if entry.is_file() and (not config.suffixes or entry.name.lower().endswith(config.suffixes)):
+                    stat = entry.stat()
+                    entries[entry.name] = FileStat(stat.st_size, stat.st_mtime_ns)
+        except OSError as e:
+            logging.debug(f'Не удалось прочитать папку {directory}: {e}')
+        return entries
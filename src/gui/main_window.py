@@ -8,8 +8,6 @@ import subprocess
 import traceback
 import webbrowser
 
-import requests
-from minecraft_launcher_lib.utils import get_version_list
 from PyQt5.QtCore import QSize, Qt
 from PyQt5.QtGui import QCloseEvent, QIcon
 from PyQt5.QtWidgets import (
@@ -36,9 +34,15 @@ from PyQt5.QtWidgets import (
 import constants
 
 import ely
-from config import AUTHLIB_JAR_PATH, MINECRAFT_DIR, SKINS_DIR
+import http_client
+from config import AUTHLIB_JAR_PATH, MINECRAFT_DIR, MODS_DIR, SKINS_DIR
 from ely_by_skin_manager import ElyBySkinManager
 from ely_skin_manager import ElySkinManager
+from flow import dedicate
+from mod_catalog import mod_catalog
+from mod_install_queue import mod_install_queue
+from mod_store import mod_store
+from process_supervisor import ProcessSupervisor
 from translator import Translator
 from util import (
     download_authlib_injector,
@@ -47,7 +51,9 @@ from util import (
     resource_path,
     save_settings,
 )
+from version_manifest import version_manifest
 from .custom_line_edit import CustomLineEdit
+from .library_watcher import LibraryWatcher
 from .threads.launch_thread import LaunchThread
 from .widgets.mod_loader_tab import ModLoaderTab
 from .widgets.modpack_tab import ModpackTab
@@ -70,7 +76,7 @@ def open_root_folder() -> None:
 def get_ely_skin(username: str) -> str | None:
     """Получает URL скина пользователя с Ely.by"""
     try:
-        response = requests.get(
+        response = http_client.get(
             f'https://skinsystem.ely.by/skins/{username}.png',
             allow_redirects=False,
         )
@@ -149,6 +155,11 @@ class MainWindow(QMainWindow):
         logging.debug('Загружаем настройки')
         self.splash.update_progress(6, 'Загружаем настройки')
         self.settings = load_settings()
+        mod_catalog.enabled = self.settings.get('mod_catalog', False)
+        if mod_catalog.enabled:
+            mod_catalog.sync_in_background()
+        # Моды, удалённые с прошлого запуска, освобождают место в хранилище
+        dedicate(mod_store.collect_garbage)
 
         self.splash.update_progress(7, 'Загружаем сессию через ely')
         self.setup_ely_auth()
@@ -171,6 +182,7 @@ class MainWindow(QMainWindow):
         self.launch_thread.state_update_signal.connect(self.state_update)
         self.launch_thread.progress_update_signal.connect(self.update_progress)
         self.launch_thread.close_launcher_signal.connect(self.close_launcher)
+        self.launch_thread.game_exited_signal.connect(self.handle_game_exit)
 
         logging.debug('Создаём основной контейнер')
         self.splash.update_progress(25, 'Создаём основной экран')
@@ -193,6 +205,10 @@ class MainWindow(QMainWindow):
         self.game_tab = QWidget()
         self.setup_game_tab()
 
+        # Вкладки берут списки модов из общего индекса, а не с диска
+        self.library_watcher = LibraryWatcher(self)
+        self.library_watcher.watch(MODS_DIR, ('.jar', '.zip'), subdirectories=True)
+
         logging.debug('Создаём Mods TAB')
         self.splash.update_progress(38, 'Создаём Mods TAB')
         self.mods_tab = ModsTab(self)
@@ -200,6 +216,8 @@ class MainWindow(QMainWindow):
         logging.debug('Создаём Modpacks TAB')
         self.splash.update_progress(39, 'Создаём Modpacks TAB')
         self.modpacks_tab = ModpackTab(self)
+        # Панель очереди уже подписана, можно продолжить установки прошлого запуска
+        mod_install_queue.restore()
 
         logging.debug('Создаём меню вкладок')
         self.splash.update_progress(40, 'Создаём меню вкладок')
@@ -464,7 +482,7 @@ class MainWindow(QMainWindow):
 
         self.start_button = QPushButton('Играть')
         self.start_button.setMinimumHeight(50)
-        self.start_button.clicked.connect(self.launch_game)
+        self.start_button.clicked.connect(lambda: self.launch_game())
         bottom_row.addWidget(self.start_button)
 
         self.change_skin_button = QPushButton('Сменить скин (Ely.by)')
@@ -561,7 +579,7 @@ class MainWindow(QMainWindow):
                 try:
                     logging.debug('Делаем запрос к API')
                     self.splash.update_progress(13, 'Делаем запрос к API')
-                    texture_info = requests.get(
+                    texture_info = http_client.get(
                         f'https://authserver.ely.by/session/profile/{self.ely_session["uuid"]}',
                         headers={
                             'Authorization': f'Bearer {self.ely_session["token"]}',
@@ -582,7 +600,7 @@ class MainWindow(QMainWindow):
                                 17,
                                 'Делаем запрос на получение данных скина',
                             )
-                            skin_data = requests.get(skin_url).content
+                            skin_data = http_client.get(skin_url).content
                             os.makedirs(SKINS_DIR, exist_ok=True)
                             with open(
                                 os.path.join(
@@ -938,7 +956,7 @@ class MainWindow(QMainWindow):
                 # Скачиваем обновлённый скин для отображения в лаунчере
                 skin_url = ElySkinManager.get_skin_url(self.ely_session['username'])
                 if skin_url:
-                    skin_data = requests.get(skin_url).content
+                    skin_data = http_client.get(skin_url).content
                     skin_path = os.path.join(SKINS_DIR, f'{self.username.text()}.png')
 
                     os.makedirs(SKINS_DIR, exist_ok=True)
@@ -984,7 +1002,7 @@ class MainWindow(QMainWindow):
         show_only_favorites = self.version_type_select.currentText() == 'Избранные'
         show_snapshots = self.settings.get('show_snapshots', False)
 
-        for v in get_version_list():
+        for v in version_manifest.get_versions():
             if v['type'] == 'release' or (show_snapshots and v['type'] == 'snapshot'):
                 version_id = v['id']
                 if not show_only_favorites or version_id in self.favorites:
@@ -1519,16 +1537,20 @@ class MainWindow(QMainWindow):
             self.settings['last_version'] = current_version
             self.settings['last_loader'] = self.loader_select.currentData()
             self.settings['show_snapshots'] = self.settings_tab.show_snapshots_checkbox.isChecked()
+        self.settings['mod_catalog'] = mod_catalog.enabled
 
         self.settings['last_username'] = self.username.text().strip()
         save_settings(self.settings)
+        # Отложенная запись очереди могла не успеть выполниться, а начатые установки не должны держать процесс
+        mod_install_queue.shutdown()
         event.accept()
 
     def close_launcher(self) -> None:
         """Закрывает лаунчер после запуска игры"""
         self.close()
 
-    def launch_game(self) -> None:
+    def launch_game(self, game_directory: str | None = None) -> None:
+        """game_directory - отдельная папка игры сборки, по умолчанию общая папка лаунчера"""
         try:
             logging.info('[LAUNCHER] Starting game launch process...')
 
@@ -1595,6 +1617,7 @@ class MainWindow(QMainWindow):
                 loader_type,
                 memory_mb,
                 close_on_launch,
+                game_directory,
             )
             self.launch_thread.start()
 
@@ -1621,6 +1644,18 @@ class MainWindow(QMainWindow):
             self.start_progress_label.setVisible(False)
             self.start_progress.setVisible(False)
 
+    def handle_game_exit(self, supervisor: ProcessSupervisor) -> None:
+        """Сообщает о падении игры с хвостом лога"""
+        if not supervisor.crashed:
+            return
+
+        details = supervisor.crash_report or supervisor.log_path
+        QMessageBox.warning(
+            self,
+            'Игра завершилась с ошибкой',
+            f'Minecraft завершился с кодом {supervisor.returncode}.\nПодробности: {details}\n\n' + '\n'.join(supervisor.tail(15)),
+        )
+
     def show_message_of_the_day(self) -> None:
         if hasattr(self, 'motd_label') and self.settings.get('show_motd', True):
             message = random.choice(constants.MOTD_MESSAGES)
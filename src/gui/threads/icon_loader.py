@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap, QPixmapCache
+
+import http_client
+from config import ICON_CACHE_DIR
+
+ICON_SIZE = 90
+MAX_ICON_CACHE_BYTES = 50 * 1024 * 1024
+
+
+class IconCache:
+    """Дисковый LRU-кэш уменьшенных иконок (время доступа хранится в mtime файла)"""
+
+    def __init__(self, cache_dir: str = ICON_CACHE_DIR, max_bytes: int = MAX_ICON_CACHE_BYTES) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+
+    def path_for(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.png')
+
+    def get(self, url: str) -> bytes | None:
+        path = self.path_for(url)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def put(self, url: str, data: bytes) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(url)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.is_file())
+            else:
+                self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Удаляет давно не использованные иконки, пока кэш не станет меньше 90% лимита"""
+        entries = sorted(
+            (entry for entry in os.scandir(self.cache_dir) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        target = self.max_bytes * 0.9
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError as e:
+                logging.warning(f'Не удалось удалить иконку из кэша: {e}')
+        self._total_bytes = total
+
+
+class IconLoader(QObject):
+    """Загружает иконки модов в пуле потоков, готовые иконки приходят сигналом"""
+
+    icon_loaded = pyqtSignal(str, QImage)
+
+    def __init__(self, parent: QObject | None = None, max_workers: int = 6) -> None:
+        super().__init__(parent)
+        self.cache = IconCache()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='icon-loader')
+        self._pending: set[str] = set()
+        self.icon_loaded.connect(self._remember)
+
+    def request(self, url: str) -> QPixmap | None:
+        """Возвращает иконку из памяти или ставит её загрузку в очередь"""
+        pixmap = QPixmapCache.find(url)
+        if pixmap is not None and not pixmap.isNull():
+            return pixmap
+        if url not in self._pending:
+            self._pending.add(url)
+            self._executor.submit(self._load, url)
+        return None
+
+    def _load(self, url: str) -> None:
+        try:
+            data = self.cache.get(url)
+            if data is None:
+                response = http_client.get(url, timeout=(5, 15))
+                response.raise_for_status()
+                image = QImage()
+                if not image.loadFromData(response.content):
+                    raise ValueError('неподдерживаемый формат изображения')
+                image = image.scaled(
+                    ICON_SIZE,
+                    ICON_SIZE,
+                    Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation,
+                )
+                self.cache.put(url, self._to_png(image))
+            else:
+                image = QImage()
+                image.loadFromData(data, 'PNG')
+            self.icon_loaded.emit(url, image)
+        except Exception as e:
+            logging.warning(f'Не удалось загрузить иконку {url}: {e}')
+            self.icon_loaded.emit(url, QImage())
+
+    def _remember(self, url: str, image: QImage) -> None:
+        self._pending.discard(url)
+        if not image.isNull():
+            QPixmapCache.insert(url, QPixmap.fromImage(image))
+
+    @staticmethod
+    def _to_png(image: QImage) -> bytes:
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+        image.save(buffer, 'PNG')
+        buffer.close()
+        return bytes(data)
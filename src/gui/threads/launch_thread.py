@@ -7,14 +7,15 @@ import traceback
 import zipfile
 from uuid import uuid1
 
-import requests
-from minecraft_launcher_lib.command import get_minecraft_command
-from minecraft_launcher_lib.fabric import get_latest_loader_version
-from minecraft_launcher_lib.forge import find_forge_version
 from minecraft_launcher_lib.install import install_minecraft_version
 from PyQt5.QtCore import QThread, pyqtSignal
 
+import http_client
 from config import AUTHLIB_JAR_PATH, MINECRAFT_DIR
+from downloader import DownloadTask, downloader
+from launch_plan import launch_plans
+from loader_catalog import loader_catalog
+from process_supervisor import ProcessSupervisor, new_session_log_path
 
 
 class LaunchThread(QThread):
@@ -22,6 +23,8 @@ class LaunchThread(QThread):
     progress_update_signal = pyqtSignal(int, int, str)
     state_update_signal = pyqtSignal(bool)
     close_launcher_signal = pyqtSignal()
+    game_output_signal = pyqtSignal(str, str)
+    game_exited_signal = pyqtSignal(object)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -31,6 +34,8 @@ class LaunchThread(QThread):
         self.loader_type = 'vanilla'
         self.memory_mb = 4096
         self.close_on_launch = False
+        self.game_directory = None
+        self.game_supervisor = None
 
     def launch_setup(
         self,
@@ -39,12 +44,14 @@ class LaunchThread(QThread):
         loader_type,
         memory_mb,
         close_on_launch,
+        game_directory=None,
     ):
         self.version_id = version_id
         self.username = username
         self.loader_type = loader_type
         self.memory_mb = memory_mb
         self.close_on_launch = close_on_launch
+        self.game_directory = game_directory
 
     def run(self):
         try:
@@ -52,7 +59,6 @@ class LaunchThread(QThread):
             self.state_update_signal.emit(True)
 
             # 1. Определение базовых параметров
-            launch_version = self.version_id
             is_legacy = self.is_legacy_version(self.version_id)
             options = {
                 'username': self.username,
@@ -79,80 +85,48 @@ class LaunchThread(QThread):
                     }
                 )
 
-            # 3. Определение версии для модлоадеров
-            if self.loader_type == 'forge':
-                logging.info('[LAUNCH THREAD] Processing Forge version...')
-                forge_version = find_forge_version(self.version_id)
-                if not forge_version:
-                    raise Exception(f'Forge version for {self.version_id} not found')
-                launch_version = f'{self.version_id}-forge-{forge_version.split("-")[-1]}'
-                logging.info(f'[LAUNCH THREAD] Forge launch version: {launch_version}')
-
-            elif self.loader_type == 'fabric':
-                logging.info('[LAUNCH THREAD] Processing Fabric version...')
-                try:
-                    loader_version = get_latest_loader_version()
-                    launch_version = f'fabric-loader-{loader_version}-{self.version_id}'
-                    logging.info(
-                        f'[LAUNCH THREAD] Fabric launch version: {launch_version}',
-                    )
-                except Exception as e:
-                    raise Exception(f'Fabric loader error: {e!s}')
-
-            elif self.loader_type == 'quilt':
-                logging.info('[LAUNCH THREAD] Processing Quilt version...')
-                from minecraft_launcher_lib.quilt import get_quilt_profile
-
-                profile = get_quilt_profile(self.version_id, MINECRAFT_DIR)
-                launch_version = profile['version']
-
-            # 4. Патч для legacy версий
-            if is_legacy:
-                print('[LAUNCH THREAD] Applying legacy patch...')
-                self.apply_legacy_patch(launch_version)
-
-            # 5. Установка версии если требуется
-            print(f'[LAUNCH THREAD] Checking version {launch_version}...')
-            if not os.path.exists(
-                os.path.join(MINECRAFT_DIR, 'versions', launch_version),
-            ):
-                print('[LAUNCH THREAD] Installing version...')
-                install_minecraft_version(
-                    versionid=launch_version,
-                    minecraft_directory=MINECRAFT_DIR,
-                    callback={
-                        'setStatus': lambda text: (
-                            print(f'[INSTALL] {text}', end='\r'),
-                            self.progress_update_signal.emit(0, 100, text),
-                        ),
-                        'setProgress': lambda value: (
-                            print(f'[INSTALL] Progress: {value}%', end='\r'),
-                            self.progress_update_signal.emit(value, 100, ''),
-                        ),
-                        'setMax': lambda value: (
-                            print(f'[INSTALL] Max progress set to: {value}'),
-                            self.progress_update_signal.emit(0, value, ''),
-                        ),
-                    },
-                )
+            if self.game_directory:
+                # Сборка со своей папкой: моды, настройки и миры берутся из неё, версии и библиотеки - общие
+                options['gameDirectory'] = self.game_directory
 
-            # 6. Формирование команды запуска
-            print('[LAUNCH THREAD] Building command...')
-            command = get_minecraft_command(
-                version=launch_version,
-                minecraft_directory=MINECRAFT_DIR,
-                options=options,
-            )
+            # 2. Готовая команда, если версия, настройки и файлы версии не менялись
+            plan = launch_plans.get(self.version_id, self.loader_type, options)
+            if plan is not None:
+                logging.info(f'[LAUNCH THREAD] Using cached launch plan for {plan.launch_version}')
+            else:
+                launch_version = self.prepare_launch_version(is_legacy)
+
+                # 6. Формирование команды запуска
+                print('[LAUNCH THREAD] Building command...')
+                plan = launch_plans.build(self.version_id, self.loader_type, launch_version, options)
+            command = plan.render(options)
             print('[LAUNCH THREAD] Final command:', ' '.join(command))
 
             # 7. Запуск процесса
             print('[LAUNCH THREAD] Starting Minecraft...')
-            minecraft_process = subprocess.Popen(
-                command,
-                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
+            creationflags = subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0
+            if self.close_on_launch:
+                # Лаунчер закроется и не сможет читать пайпы - пишем вывод игры сразу в файл
+                with open(new_session_log_path(), 'wb') as log_file:
+                    subprocess.Popen(
+                        command,
+                        creationflags=creationflags,
+                        stdout=log_file,
+                        stderr=subprocess.STDOUT,
+                    )
+            else:
+                minecraft_process = subprocess.Popen(
+                    command,
+                    creationflags=creationflags,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+                self.game_supervisor = ProcessSupervisor(
+                    minecraft_process,
+                    on_line=self.game_output_signal.emit,
+                    on_exit=self.game_exited_signal.emit,
+                )
+                self.game_supervisor.start()
 
             # 8. Закрытие лаунчера если нужно
             if self.close_on_launch:
@@ -167,6 +141,68 @@ class LaunchThread(QThread):
             logging.exception(f'Launch thread failed: {traceback.format_exc()}')
             self.state_update_signal.emit(False)
 
+    def prepare_launch_version(self, is_legacy: bool) -> str:
+        """Определяет версию с учётом модлоадера и устанавливает её при необходимости"""
+        launch_version = self.version_id
+
+        # 3. Определение версии для модлоадеров
+        if self.loader_type == 'forge':
+            logging.info('[LAUNCH THREAD] Processing Forge version...')
+            forge_version = loader_catalog.latest('forge', self.version_id)
+            if not forge_version:
+                raise Exception(f'Forge version for {self.version_id} not found')
+            launch_version = f'{self.version_id}-forge-{forge_version.split("-")[-1]}'
+            logging.info(f'[LAUNCH THREAD] Forge launch version: {launch_version}')
+
+        elif self.loader_type == 'fabric':
+            logging.info('[LAUNCH THREAD] Processing Fabric version...')
+            loader_version = loader_catalog.latest('fabric', self.version_id)
+            if not loader_version:
+                raise Exception('Fabric loader error: loader versions unavailable')
+            launch_version = f'fabric-loader-{loader_version}-{self.version_id}'
+            logging.info(
+                f'[LAUNCH THREAD] Fabric launch version: {launch_version}',
+            )
+
+        elif self.loader_type == 'quilt':
+            logging.info('[LAUNCH THREAD] Processing Quilt version...')
+            from minecraft_launcher_lib.quilt import get_quilt_profile
+
+            profile = get_quilt_profile(self.version_id, MINECRAFT_DIR)
+            launch_version = profile['version']
+
+        # 4. Патч для legacy версий
+        if is_legacy:
+            print('[LAUNCH THREAD] Applying legacy patch...')
+            self.apply_legacy_patch(launch_version)
+
+        # 5. Установка версии если требуется
+        print(f'[LAUNCH THREAD] Checking version {launch_version}...')
+        if not os.path.exists(
+            os.path.join(MINECRAFT_DIR, 'versions', launch_version),
+        ):
+            print('[LAUNCH THREAD] Installing version...')
+            install_minecraft_version(
+                versionid=launch_version,
+                minecraft_directory=MINECRAFT_DIR,
+                callback={
+                    'setStatus': lambda text: (
+                        print(f'[INSTALL] {text}', end='\r'),
+                        self.progress_update_signal.emit(0, 100, text),
+                    ),
+                    'setProgress': lambda value: (
+                        print(f'[INSTALL] Progress: {value}%', end='\r'),
+                        self.progress_update_signal.emit(value, 100, ''),
+                    ),
+                    'setMax': lambda value: (
+                        print(f'[INSTALL] Max progress set to: {value}'),
+                        self.progress_update_signal.emit(0, value, ''),
+                    ),
+                },
+            )
+
+        return launch_version
+
     @staticmethod
     def is_legacy_version(version: str):
         """Проверяет, является ли версия старой (до 1.7.5)"""
@@ -193,11 +229,12 @@ class LaunchThread(QThread):
     def download_authlib(self):
         """Скачивает authlib-injector"""
         try:
-            response = requests.get(
-                'https://maven.ely.by/releases/by/ely/authlib/1.2.0/authlib-1.2.0.jar',
-            )  # Актуальная версия
-            with open(AUTHLIB_JAR_PATH, 'wb') as f:
-                f.write(response.content)
+            downloader.download(
+                DownloadTask(
+                    url='https://maven.ely.by/releases/by/ely/authlib/1.2.0/authlib-1.2.0.jar',  # Актуальная версия
+                    dest=AUTHLIB_JAR_PATH,
+                ),
+            )
             return True
         except Exception as e:
             logging.exception(f'Authlib download failed: {e!s}')
@@ -212,7 +249,7 @@ class LaunchThread(QThread):
             raise Exception('JAR file not found')
 
         patch_url = 'https://ely.by/load/legacy-patch.jar'  # Пример URL
-        patch_data = requests.get(patch_url).content
+        patch_data = http_client.get(patch_url).content
 
         with zipfile.ZipFile(jar_path, 'a') as jar:
             with zipfile.ZipFile(io.BytesIO(patch_data)) as patch:
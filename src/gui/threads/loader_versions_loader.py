@@ -0,0 +1,54 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from loader_catalog import loader_catalog
+
+
+class LoaderVersionsLoader(QObject):
+    """
+    Загружает списки версий модлоадера в пуле потоков, готовые списки приходят сигналом.
+    Из запросов, которые ещё не начались, выполняется только последний:
+    при быстром переборе версий Minecraft промежуточные не загружаются.
+    """
+
+    # Загрузчик, версия Minecraft, версии загрузчика от новых к старым
+    versions_loaded = pyqtSignal(str, str, list)
+
+    def __init__(self, parent: QObject | None = None, max_workers: int = 2) -> None:
+        super().__init__(parent)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='loader-versions')
+        self._memo: dict[tuple[str, str], list[str]] = {}
+        self._pending: set[tuple[str, str]] = set()
+        self._wanted: dict[str, str] = {}
+        self.versions_loaded.connect(self._remember)
+
+    def request(self, loader: str, mc_version: str) -> list[str] | None:
+        """Возвращает уже загруженный список или ставит его загрузку в очередь"""
+        key = (loader, mc_version)
+        if key in self._memo:
+            return self._memo[key]
+        self._wanted[loader] = mc_version
+        if key not in self._pending:
+            self._pending.add(key)
+            self._executor.submit(self._load, loader, mc_version)
+        return None
+
+    def _load(self, loader: str, mc_version: str) -> None:
+        if self._wanted.get(loader) != mc_version:
+            # Пока запрос ждал в очереди, выбрали другую версию
+            self.versions_loaded.emit(loader, mc_version, [])
+            return
+        try:
+            versions = [build.version for build in loader_catalog.versions(loader, mc_version)]
+        except Exception as e:
+            logging.warning(f'Не удалось загрузить версии {loader} для {mc_version}: {e}')
+            versions = []
+        self.versions_loaded.emit(loader, mc_version, versions)
+
+    def _remember(self, loader: str, mc_version: str, versions: list[str]) -> None:
+        self._pending.discard((loader, mc_version))
+        # Пустой список мог получиться без сети - в следующий раз спросим снова
+        if versions:
+            self._memo[(loader, mc_version)] = versions
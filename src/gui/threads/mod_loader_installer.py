@@ -1,19 +1,18 @@
 import json
 import logging
 import os
-import shutil
 import subprocess
 import traceback
-import urllib.request
 
-import requests
-from minecraft_launcher_lib.fabric import get_all_minecraft_versions, get_latest_loader_version
+from minecraft_launcher_lib.fabric import get_all_minecraft_versions
 from minecraft_launcher_lib.fabric import install_fabric as fabric_install
-from minecraft_launcher_lib.forge import find_forge_version, install_forge_version
+from minecraft_launcher_lib.forge import install_forge_version
 from PyQt5.QtCore import QThread, pyqtSignal
 
-from config import MINECRAFT_DIR, MINECRAFT_VERSIONS
-from util import get_quilt_versions
+import http_client
+from config import MINECRAFT_DIR, get_minecraft_versions
+from downloader import DownloadTask, downloader
+from loader_catalog import loader_catalog
 
 
 class ModLoaderInstaller(QThread):
@@ -64,9 +63,7 @@ class ModLoaderInstaller(QThread):
             download_url = f'https://optifine.net/adloadx?f=OptiFine_{self.mc_version}.jar'
             optifine_path = os.path.join(MINECRAFT_DIR, 'OptiFine.jar')
 
-            with requests.get(download_url, stream=True) as r:
-                with open(optifine_path, 'wb') as f:
-                    shutil.copyfileobj(r.raw, f)
+            downloader.download(DownloadTask(url=download_url, dest=optifine_path))
 
             # Запуск установщика
             command = ['java', '-jar', optifine_path, '--install', MINECRAFT_DIR]
@@ -84,13 +81,11 @@ class ModLoaderInstaller(QThread):
         try:
             from minecraft_launcher_lib.quilt import install_quilt as quilt_install
 
-            # Получаем последнюю версию лоадера для выбранной версии MC
-            quilt_versions = get_quilt_versions(self.mc_version)
-            if not quilt_versions:
+            # Выбранная версия лоадера или последняя для выбранной версии MC
+            loader_version = self.version or loader_catalog.latest('quilt', self.mc_version)
+            if not loader_version:
                 raise ValueError(f'Quilt для {self.mc_version} не найден')
 
-            loader_version = quilt_versions[0]['version']
-
             quilt_install(
                 minecraft_version=self.mc_version,
                 loader_version=loader_version,
@@ -108,7 +103,9 @@ class ModLoaderInstaller(QThread):
     def install_fabric(self):
         try:
             # Получаем последнюю версию лоадера
-            loader_version = get_latest_loader_version()
+            loader_version = loader_catalog.latest('fabric', self.mc_version)
+            if not loader_version:
+                raise ValueError(f'Fabric для {self.mc_version} не найден')
 
             # Создаем профиль Fabric
             fabric_install(
@@ -129,11 +126,11 @@ class ModLoaderInstaller(QThread):
     def _check_internet_connection(self):
         """Проверка соединения с серверами Fabric"""
         try:
-            urllib.request.urlopen('https://meta.fabricmc.net', timeout=5)
+            http_client.get('https://meta.fabricmc.net', timeout=5)
             return True
         except:
             try:
-                urllib.request.urlopen('https://google.com', timeout=5)
+                http_client.get('https://google.com', timeout=5)
                 return False  # Есть интернет, но Fabric недоступен
             except:
                 return False  # Нет интернета
@@ -154,18 +151,18 @@ class ModLoaderInstaller(QThread):
 
         # Попытка 2: Альтернативный источник (GitHub)
         try:
-            with urllib.request.urlopen(
+            response = http_client.get(
                 'https://raw.githubusercontent.com/FabricMC/fabric-meta/main/data/game_versions.json',
-            ) as response:
-                data = json.loads(response.read().decode())
-                versions = [v['version'] for v in data if isinstance(v, dict) and 'version' in v]
-                if versions:
-                    return versions
+            )
+            data = response.json()
+            versions = [v['version'] for v in data if isinstance(v, dict) and 'version' in v]
+            if versions:
+                return versions
         except:
             pass
 
         try:
-            return MINECRAFT_VERSIONS
+            return get_minecraft_versions()
         except:
             pass
 
@@ -174,14 +171,7 @@ class ModLoaderInstaller(QThread):
     @staticmethod
     def find_neoforge_version(mc_version: str):
         """Поиск версии NeoForge для указанной версии MC"""
-        response = requests.get(
-            'https://maven.neoforged.net/api/maven/versions/releases/net.neoforged/neoforge',
-        )
-        versions = response.json()['versions']
-        for v in versions:
-            if mc_version in v:
-                return v
-        return None
+        return loader_catalog.latest('neoforge', mc_version)
 
     @staticmethod
     def install_quilt_version(
@@ -222,7 +212,7 @@ class ModLoaderInstaller(QThread):
         """Выполнение установки с проверкой каждого этапа"""
         # Получаем версию загрузчика
         try:
-            loader_version = get_latest_loader_version()
+            loader_version = loader_catalog.latest('fabric', self.mc_version)
             if not loader_version:
                 # Если не получается определить последнюю версию, пробуем конкретную
                 loader_version = '0.15.7'  # Актуальная стабильная версия на момент написания
@@ -247,7 +237,7 @@ class ModLoaderInstaller(QThread):
     def install_forge(self):
         """Установка Forge"""
         try:
-            forge_version = find_forge_version(self.mc_version)
+            forge_version = self.version or loader_catalog.latest('forge', self.mc_version)
             if not forge_version:
                 self.finished_signal.emit(
                     False,
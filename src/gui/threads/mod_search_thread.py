@@ -1,30 +1,31 @@
+import threading
+
 from PyQt5.QtCore import QThread, pyqtSignal
 
-from mod_manager import ModManager
+from http_client import RequestCancelled
+from search_pages import SearchPages
 
 
 class ModSearchThread(QThread):
-    search_finished = pyqtSignal(list, str)
+    search_finished = pyqtSignal(list)
     error_occurred = pyqtSignal(str)
 
-    def __init__(self, query, version, loader, category, sort_by):
+    def __init__(self, pages: SearchPages, page: int):
         super().__init__()
-        self.query = query
-        self.version = version
-        self.loader = loader
-        self.category = category
-        self.sort_by = sort_by
+        self.pages = pages
+        self.page = page
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        """Прерывает загрузку результатов, отменённый поиск ничего не отправляет"""
+        self.cancel_event.set()
 
     def run(self):
         try:
-            mods = ModManager.cached_search(
-                self.query,
-                self.version,
-                self.loader,
-                self.category,
-                self.sort_by,
-                'modrinth',
-            )
-            self.search_finished.emit(mods, self.query)
+            mods = self.pages.get(self.page, self.cancel_event)
+            if not self.cancel_event.is_set():
+                self.search_finished.emit(mods)
+        except RequestCancelled:
+            pass
         except Exception as e:
             self.error_occurred.emit(str(e))
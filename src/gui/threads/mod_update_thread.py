@@ -0,0 +1,40 @@
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from mod_updates import ModUpdate, mod_update_checker
+
+
+class ModUpdateCheckThread(QThread):
+    updates_found = pyqtSignal(list)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, mods_dir: str, game_version: str, loader: str | None):
+        super().__init__()
+        self.mods_dir = mods_dir
+        self.game_version = game_version
+        self.loader = loader
+
+    def run(self):
+        try:
+            self.updates_found.emit(mod_update_checker.check(self.mods_dir, self.game_version, self.loader))
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+
+class ModUpdateApplyThread(QThread):
+    progress_signal = pyqtSignal(int, int)
+    updates_applied = pyqtSignal(int)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, updates: list[ModUpdate]):
+        super().__init__()
+        self.updates = updates
+
+    def run(self):
+        try:
+            mod_update_checker.apply(
+                self.updates,
+                lambda progress: self.progress_signal.emit(progress.downloaded, progress.total or 0),
+            )
+            self.updates_applied.emit(len(self.updates))
+        except Exception as e:
+            self.error_occurred.emit(str(e))
@@ -0,0 +1,61 @@
+import threading
+from typing import Any, Callable
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from downloader import DownloadCancelled
+from mrpack import export_mrpack, import_pack
+
+
+class ModpackTransferThread(QThread):
+    """Общая часть импорта и экспорта сборки: прогресс долей от 0 до 1 и отмена"""
+
+    # Доля выполнения (-1, пока объём неизвестен), текущий этап
+    progress_signal = pyqtSignal(float, str)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, transfer: Callable[[], None]) -> None:
+        super().__init__()
+        self.transfer = transfer
+        self.cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        """Прерывает работу после текущего блока данных, отменённая задача ничего не отправляет"""
+        self.cancel_event.set()
+
+    def report(self, done: int, total: int | None, stage: str) -> None:
+        self.progress_signal.emit(min(done / total, 1.0) if total else -1.0, stage)
+
+    def run(self) -> None:
+        try:
+            self.transfer()
+        except DownloadCancelled:
+            pass
+        except Exception as e:
+            if not self.cancel_event.is_set():
+                self.error_occurred.emit(str(e))
+
+
+class ModpackImportThread(ModpackTransferThread):
+    pack_imported = pyqtSignal(dict)
+
+    def __init__(self, file_path: str) -> None:
+        super().__init__(self.import_pack)
+        self.file_path = file_path
+
+    def import_pack(self) -> None:
+        self.pack_imported.emit(import_pack(self.file_path, self.report, self.cancel_event))
+
+
+class ModpackExportThread(ModpackTransferThread):
+    # Путь к архиву, модов ссылками, модов в архиве
+    pack_exported = pyqtSignal(str, int, int)
+
+    def __init__(self, pack_data: dict[str, Any], output_path: str) -> None:
+        super().__init__(self.export_pack)
+        self.pack_data = pack_data
+        self.output_path = output_path
+
+    def export_pack(self) -> None:
+        linked, embedded = export_mrpack(self.pack_data, self.output_path, self.report, self.cancel_event)
+        self.pack_exported.emit(self.output_path, linked, embedded)
@@ -0,0 +1,208 @@
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import (
+    QFrame,
+    QHBoxLayout,
+    QLabel,
+    QListWidget,
+    QListWidgetItem,
+    QProgressBar,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from mod_install_queue import (
+    ACTIVE_STATES,
+    JOB_CANCELLED,
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    InstallJob,
+    ModInstallQueue,
+    mod_install_queue,
+)
+
+# Доля выполнения хранится в QProgressBar целым числом
+PROGRESS_SCALE = 1000
+ROW_HEIGHT = 56
+
+STATE_TEXTS = {
+    JOB_QUEUED: 'В очереди',
+    JOB_RUNNING: 'Установка...',
+    JOB_DONE: 'Установлено',
+    JOB_FAILED: 'Ошибка',
+    JOB_CANCELLED: 'Отменено',
+}
+
+BUTTON_STYLE = """
+    QPushButton {
+        background-color: #444444;
+        color: white;
+        border: none;
+        border-radius: 5px;
+        padding: 4px 10px;
+    }
+    QPushButton:hover {
+        background-color: #555555;
+    }
+"""
+PROGRESS_STYLE = """
+    QProgressBar {
+        background-color: #444444;
+        border: none;
+        border-radius: 3px;
+    }
+    QProgressBar::chunk {
+        background-color: #4caf50;
+        border-radius: 3px;
+    }
+"""
+
+
+def job_fraction(job: InstallJob) -> float:
+    if job.state == JOB_DONE:
+        return 1.0
+    if job.state == JOB_RUNNING and job.total:
+        return min(job.downloaded / job.total, 1.0)
+    return 0.0
+
+
+class InstallJobRow(QWidget):
+    """Строка очереди: название, состояние, прогресс и кнопка отмены или повтора"""
+
+    def __init__(self, queue: ModInstallQueue, job: InstallJob, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.queue = queue
+        self.job = job
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 4, 8, 4)
+        text_layout = QVBoxLayout()
+        self.title_label = QLabel(job.title)
+        self.title_label.setStyleSheet('color: white;')
+        self.state_label = QLabel()
+        self.state_label.setStyleSheet('color: #aaaaaa; font-size: 11px;')
+        text_layout.addWidget(self.title_label)
+        text_layout.addWidget(self.state_label)
+        layout.addLayout(text_layout, 1)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, PROGRESS_SCALE)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setFixedSize(160, 8)
+        self.progress_bar.setStyleSheet(PROGRESS_STYLE)
+        layout.addWidget(self.progress_bar)
+
+        self.action_button = QPushButton()
+        self.action_button.setFixedWidth(100)
+        self.action_button.setStyleSheet(BUTTON_STYLE)
+        self.action_button.clicked.connect(self.on_action_clicked)
+        layout.addWidget(self.action_button)
+
+    def update_job(self, job: InstallJob) -> None:
+        self.job = job
+        state_text = STATE_TEXTS.get(job.state, job.state)
+        if job.state == JOB_RUNNING and job.total:
+            state_text += f' {job.downloaded / 1024 / 1024:.1f} / {job.total / 1024 / 1024:.1f} MB'
+        elif job.message and job.state != JOB_QUEUED:
+            state_text = job.message.splitlines()[0]
+        self.state_label.setText(state_text)
+        self.setToolTip(job.message)
+        self.progress_bar.setValue(int(job_fraction(job) * PROGRESS_SCALE))
+
+        if job.state in ACTIVE_STATES:
+            self.action_button.setText('Отмена')
+            self.action_button.setVisible(True)
+        elif job.state in (JOB_FAILED, JOB_CANCELLED):
+            self.action_button.setText('Повторить')
+            self.action_button.setVisible(True)
+        else:
+            self.action_button.setVisible(False)
+
+    def on_action_clicked(self) -> None:
+        if self.job.state in ACTIVE_STATES:
+            self.queue.cancel(self.job.job_id)
+        else:
+            self.queue.retry(self.job.job_id)
+
+
+class InstallQueuePanel(QFrame):
+    """Панель очереди установки модов с общим прогрессом"""
+
+    # Переносит изменения установок из рабочих потоков очереди в поток интерфейса
+    job_changed = pyqtSignal(object)
+
+    def __init__(self, queue: ModInstallQueue = mod_install_queue, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.queue = queue
+        self.rows: dict[str, tuple[QListWidgetItem, InstallJobRow]] = {}
+        self.setStyleSheet("""
+            QFrame {
+                background-color: #333333;
+                border-radius: 10px;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        header = QHBoxLayout()
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet('color: white; font-weight: bold;')
+        header.addWidget(self.summary_label)
+        self.total_progress = QProgressBar()
+        self.total_progress.setTextVisible(False)
+        self.total_progress.setFixedHeight(8)
+        self.total_progress.setStyleSheet(PROGRESS_STYLE)
+        header.addWidget(self.total_progress, 1)
+        self.clear_button = QPushButton('Очистить завершённые')
+        self.clear_button.setStyleSheet(BUTTON_STYLE)
+        self.clear_button.clicked.connect(self.clear_finished)
+        header.addWidget(self.clear_button)
+        layout.addLayout(header)
+
+        self.jobs_list = QListWidget()
+        self.jobs_list.setStyleSheet('QListWidget { border: none; background-color: transparent; }')
+        self.jobs_list.setSelectionMode(QListWidget.SelectionMode.NoSelection)
+        self.jobs_list.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.jobs_list.setMaximumHeight(ROW_HEIGHT * 4)
+        layout.addWidget(self.jobs_list)
+
+        self.job_changed.connect(self.update_job)
+        self.queue.subscribe(self.job_changed.emit)
+        for job in self.queue.jobs():
+            self.update_job(job)
+        self.update_summary()
+
+    def update_job(self, job: InstallJob) -> None:
+        if job.job_id not in self.rows:
+            # Сигнал мог прийти уже после очистки завершённых
+            if self.queue.get(job.job_id) is None:
+                return
+            item = QListWidgetItem()
+            row = InstallJobRow(self.queue, job)
+            item.setSizeHint(row.sizeHint().expandedTo(row.minimumSizeHint()))
+            self.jobs_list.addItem(item)
+            self.jobs_list.setItemWidget(item, row)
+            self.rows[job.job_id] = (item, row)
+        self.rows[job.job_id][1].update_job(job)
+        self.update_summary()
+
+    def update_summary(self) -> None:
+        jobs = [row.job for _, row in self.rows.values() if row.job.state != JOB_CANCELLED]
+        self.setVisible(bool(self.rows))
+        done = sum(job.state == JOB_DONE for job in jobs)
+        failed = sum(job.state == JOB_FAILED for job in jobs)
+        text = f'Установлено {done} из {len(jobs)}'
+        if failed:
+            text += f', ошибок: {failed}'
+        self.summary_label.setText(text)
+        self.total_progress.setRange(0, max(len(jobs), 1) * PROGRESS_SCALE)
+        self.total_progress.setValue(int(sum(job_fraction(job) for job in jobs) * PROGRESS_SCALE))
+
+    def clear_finished(self) -> None:
+        self.queue.clear_finished()
+        for job_id, (item, row) in list(self.rows.items()):
+            if row.job.state == JOB_DONE:
+                self.jobs_list.takeItem(self.jobs_list.row(item))
+                del self.rows[job_id]
+        self.update_summary()
@@ -0,0 +1,248 @@
+from typing import Any
+
+from PyQt5.QtCore import QAbstractListModel, QEvent, QModelIndex, QObject, QRect, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QCursor, QFont, QFontMetrics, QImage, QPainter
+from PyQt5.QtWidgets import QListView, QStyle, QStyledItemDelegate, QStyleOptionViewItem, QWidget
+
+from ..threads.icon_loader import ICON_SIZE, IconLoader
+
+ModRole = Qt.ItemDataRole.UserRole
+InstallStateRole = Qt.ItemDataRole.UserRole + 1
+
+INSTALL_NONE = ''
+INSTALL_QUEUED = 'queued'
+INSTALL_RUNNING = 'installing'
+INSTALL_DONE = 'installed'
+INSTALL_FAILED = 'failed'
+
+# Пока мод в очереди или устанавливается, кнопка не нажимается
+BUSY_STATES = (INSTALL_QUEUED, INSTALL_RUNNING)
+
+CARD_HEIGHT = 120
+CARD_SPACING = 15
+CARD_PADDING = 15
+BUTTON_SIZE = QSize(110, 34)
+
+BUTTON_TEXTS = {
+    INSTALL_NONE: 'Установить',
+    INSTALL_QUEUED: 'В очереди',
+    INSTALL_RUNNING: 'Установка...',
+    INSTALL_DONE: 'Установлено',
+    INSTALL_FAILED: 'Повторить',
+}
+
+
+class ModListModel(QAbstractListModel):
+    """Результаты поиска модов, следующие страницы подгружаются при прокрутке"""
+
+    # Номер страницы, которую нужно догрузить
+    more_requested = pyqtSignal(int)
+
+    def __init__(self, icon_loader: IconLoader, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.icon_loader = icon_loader
+        self.mods: list[dict[str, Any]] = []
+        self.total = 0
+        self.loaded_pages = 0
+        self.loading = False
+        self.install_states: dict[str, str] = {}
+        self._icon_rows: dict[str, list[int]] = {}
+        self._project_rows: dict[str, list[int]] = {}
+        self.icon_loader.icon_loaded.connect(self._on_icon_loaded)
+
+    def reset(self, mods: list[dict[str, Any]], total: int = 0, loaded_pages: int = 0) -> None:
+        """Заменяет список целиком (новый поиск или предпросмотр результатов)"""
+        self.beginResetModel()
+        self.mods = []
+        self._icon_rows.clear()
+        self._project_rows.clear()
+        self._extend(mods)
+        self.total = total
+        self.loaded_pages = loaded_pages
+        self.loading = False
+        self.endResetModel()
+
+    def append_page(self, mods: list[dict[str, Any]], total: int) -> None:
+        self.loaded_pages += 1
+        self.total = total
+        self.loading = False
+        if mods:
+            self.beginInsertRows(QModelIndex(), len(self.mods), len(self.mods) + len(mods) - 1)
+            self._extend(mods)
+            self.endInsertRows()
+
+    def fetch_failed(self) -> None:
+        """Разрешает повторить догрузку после ошибки"""
+        self.loading = False
+
+    def set_install_state(self, project_id: str, state: str) -> None:
+        self.install_states[project_id] = state
+        for row in self._project_rows.get(project_id, []):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [InstallStateRole])
+
+    def find_mod(self, project_id: str) -> dict[str, Any] | None:
+        rows = self._project_rows.get(project_id)
+        return self.mods[rows[0]] if rows else None
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.mods)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self.mods):
+            return None
+        mod = self.mods[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return mod.get('title', mod.get('name', 'N/A'))
+        if role == Qt.ItemDataRole.DecorationRole:
+            icon_url = mod.get('icon_url')
+            return self.icon_loader.request(icon_url) if icon_url else None
+        if role == ModRole:
+            return mod
+        if role == InstallStateRole:
+            return self.install_states.get(mod.get('project_id'), INSTALL_NONE)
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self.loading and self.loaded_pages > 0 and len(self.mods) < self.total
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        if self.canFetchMore(parent):
+            self.loading = True
+            self.more_requested.emit(self.loaded_pages + 1)
+
+    def _extend(self, mods: list[dict[str, Any]]) -> None:
+        for mod in mods:
+            row = len(self.mods)
+            self.mods.append(mod)
+            if mod.get('icon_url'):
+                self._icon_rows.setdefault(mod['icon_url'], []).append(row)
+            if mod.get('project_id'):
+                self._project_rows.setdefault(mod['project_id'], []).append(row)
+
+    def _on_icon_loaded(self, url: str, image: QImage) -> None:
+        if image.isNull():
+            return
+        for row in self._icon_rows.get(url, []):
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+
+class ModCardDelegate(QStyledItemDelegate):
+    """Рисует карточку мода целиком, без виджетов на каждую строку"""
+
+    install_clicked = pyqtSignal(str)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self.title_font = QFont()
+        self.title_font.setPixelSize(16)
+        self.title_font.setBold(True)
+        self.text_font = QFont()
+        self.title_metrics = QFontMetrics(self.title_font)
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), CARD_HEIGHT + CARD_SPACING)
+
+    @staticmethod
+    def card_rect(rect: QRect) -> QRect:
+        return rect.adjusted(0, 0, 0, -CARD_SPACING)
+
+    @staticmethod
+    def button_rect(rect: QRect) -> QRect:
+        card = ModCardDelegate.card_rect(rect)
+        button = QRect(0, 0, BUTTON_SIZE.width(), BUTTON_SIZE.height())
+        button.moveCenter(card.center())
+        button.moveRight(card.right() - CARD_PADDING)
+        return button
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex) -> None:
+        mod = index.data(ModRole) or {}
+        card = self.card_rect(option.rect)
+        button = self.button_rect(option.rect)
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor('#333333'))
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.setPen(QColor('#4caf50'))
+        painter.drawRoundedRect(card, 10, 10)
+        painter.setPen(Qt.PenStyle.NoPen)
+
+        # Иконка (серый плейсхолдер, пока иконка грузится в фоне)
+        icon_rect = QRect(card.left() + CARD_PADDING, card.top() + CARD_PADDING, ICON_SIZE, ICON_SIZE)
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None:
+            target = QRect(0, 0, pixmap.width(), pixmap.height())
+            target.moveCenter(icon_rect.center())
+            painter.drawPixmap(target, pixmap)
+        else:
+            painter.setBrush(QColor('#444444'))
+            painter.drawRoundedRect(icon_rect, 5, 5)
+
+        # Название, описание и статистика
+        text_left = icon_rect.right() + CARD_PADDING
+        text_width = button.left() - CARD_PADDING - text_left
+        painter.setFont(self.title_font)
+        painter.setPen(QColor('white'))
+        title = self.title_metrics.elidedText(index.data(), Qt.TextElideMode.ElideRight, text_width)
+        painter.drawText(QRect(text_left, card.top() + CARD_PADDING, text_width, 22), Qt.AlignmentFlag.AlignLeft, title)
+
+        painter.setFont(self.text_font)
+        painter.setPen(QColor('#aaaaaa'))
+        painter.drawText(
+            QRect(text_left, card.top() + CARD_PADDING + 26, text_width, 40),
+            Qt.AlignmentFlag.AlignLeft | Qt.TextFlag.TextWordWrap,
+            mod.get('description') or 'Нет описания',
+        )
+        painter.drawText(
+            QRect(text_left, card.bottom() - CARD_PADDING - 18, text_width, 18),
+            Qt.AlignmentFlag.AlignLeft,
+            f'📥 {mod.get("downloads", 0)}',
+        )
+
+        # Кнопка установки
+        state = index.data(InstallStateRole)
+        hovered = False
+        if option.state & QStyle.StateFlag.State_MouseOver and isinstance(option.widget, QListView):
+            hovered = button.contains(option.widget.viewport().mapFromGlobal(QCursor.pos()))
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor('#555555' if hovered and state not in BUSY_STATES else '#444444'))
+        painter.drawRoundedRect(button, 5, 5)
+        painter.setPen(QColor('#aaaaaa' if state in (*BUSY_STATES, INSTALL_DONE) else 'white'))
+        painter.drawText(button, Qt.AlignmentFlag.AlignCenter, BUTTON_TEXTS.get(state, BUTTON_TEXTS[INSTALL_NONE]))
+        painter.restore()
+
+    def editorEvent(self, event: QEvent, model: Any, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if (
+            event.type() == QEvent.Type.MouseButtonRelease
+            and event.button() == Qt.MouseButton.LeftButton
+            and self.button_rect(option.rect).contains(event.pos())
+        ):
+            mod = index.data(ModRole) or {}
+            if mod.get('project_id') and index.data(InstallStateRole) not in BUSY_STATES:
+                self.install_clicked.emit(mod['project_id'])
+            return True
+        return super().editorEvent(event, model, option, index)
+
+
+class ModListView(QListView):
+    """Список карточек модов: рисуются только видимые строки одинаковой высоты, Ctrl/Shift выделяют несколько"""
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WidgetAttribute.WA_Hover)
+
+    def mouseMoveEvent(self, event: Any) -> None:
+        # Подсветка кнопки зависит от положения курсора внутри строки
+        index = self.indexAt(event.pos())
+        if index.isValid():
+            self.update(index)
+        super().mouseMoveEvent(event)
@@ -1,6 +1,3 @@
-import logging
-
-from minecraft_launcher_lib.forge import find_forge_version
 from PyQt5.QtWidgets import (
     QComboBox,
     QLabel,
@@ -11,15 +8,20 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
-from config import MINECRAFT_VERSIONS
-from util import get_quilt_versions
+from config import get_minecraft_versions
+from ..threads.loader_versions_loader import LoaderVersionsLoader
 from ..threads.mod_loader_installer import ModLoaderInstaller
 
+LOADING_TEXT = 'Загрузка...'
+AUTO_TEXT = 'Автоматический выбор'
+
 
 class ModLoaderTab(QWidget):
     def __init__(self, loader_type, parent=None):
         super().__init__(parent)
         self.loader_type = loader_type
+        self.versions_loader = LoaderVersionsLoader(self)
+        self.versions_loader.versions_loaded.connect(self.on_versions_loaded)
         self.setup_ui()
         self.load_mc_versions()
 
@@ -64,53 +66,61 @@ class ModLoaderTab(QWidget):
     def load_mc_versions(self):
         """Загружает версии Minecraft"""
         self.mc_version_combo.clear()
-        for version in MINECRAFT_VERSIONS:
+        for version in get_minecraft_versions():
             self.mc_version_combo.addItem(version)
 
     def update_forge_versions(self):
         """Обновляет список версий Forge при изменении версии MC"""
         if self.loader_type != 'forge':
             return
-
-        mc_version = self.mc_version_combo.currentText()
-        self.forge_version_combo.clear()
-
-        try:
-            forge_version = find_forge_version(mc_version)
-            if forge_version:
-                self.forge_version_combo.addItem(forge_version)
-            else:
-                self.forge_version_combo.addItem('Автоматический выбор')
-        except Exception as e:
-            logging.exception(f'Ошибка загрузки Forge: {e!s}')
-            self.forge_version_combo.addItem('Ошибка загрузки')
+        self.request_loader_versions(self.forge_version_combo)
 
     def update_quilt_versions(self):
         """Обновляет список версий Quilt"""
         if self.loader_type != 'quilt':
             return
+        self.request_loader_versions(self.loader_version_combo)
+
+    def request_loader_versions(self, combo: QComboBox):
+        """Показывает версии загрузчика сразу, если они уже загружены, иначе - состояние загрузки"""
+        mc_version = self.mc_version_combo.currentText()
+        if not mc_version:
+            return
+        versions = self.versions_loader.request(self.loader_type, mc_version)
+        if versions is None:
+            combo.clear()
+            combo.addItem(LOADING_TEXT)
+            combo.setEnabled(False)
+        else:
+            self.fill_loader_versions(combo, versions)
+
+    def on_versions_loaded(self, loader_type: str, mc_version: str, versions: list[str]):
+        # Ответ на уже неактуальный выбор версии Minecraft
+        if loader_type != self.loader_type or mc_version != self.mc_version_combo.currentText():
+            return
+        combo = self.forge_version_combo if self.loader_type == 'forge' else self.loader_version_combo
+        self.fill_loader_versions(combo, versions)
 
-        self.loader_version_combo.clear()
-        try:
-            versions = get_quilt_versions(self.mc_version_combo.currentText())
-            for v in versions:
-                self.loader_version_combo.addItem(v['version'])
-            if versions:
-                self.loader_version_combo.setCurrentIndex(0)
-        except Exception as e:
-            logging.exception(f'Ошибка загрузки Quilt: {e}')
-            self.loader_version_combo.addItem('Ошибка загрузки')
+    @staticmethod
+    def fill_loader_versions(combo: QComboBox, versions: list[str]):
+        combo.clear()
+        combo.addItem(AUTO_TEXT)
+        combo.addItems(versions)
+        combo.setCurrentIndex(1 if versions else 0)
+        combo.setEnabled(True)
 
     def install_loader(self):
         mc_version = self.mc_version_combo.currentText()
 
         if self.loader_type == 'forge':
             forge_version = self.forge_version_combo.currentText()
-            if forge_version == 'Автоматический выбор':
+            if forge_version in (AUTO_TEXT, LOADING_TEXT):
                 forge_version = None
             self.install_thread = ModLoaderInstaller('forge', forge_version, mc_version)
         elif self.loader_type == 'quilt':
             loader_version = self.loader_version_combo.currentText()
+            if loader_version in (AUTO_TEXT, LOADING_TEXT):
+                loader_version = None
             self.install_thread = ModLoaderInstaller(
                 'quilt',
                 loader_version,  # Передаем версию лоадера
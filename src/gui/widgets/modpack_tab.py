@@ -1,16 +1,13 @@
-import json
 import logging
 import os
 import shutil
 import time
 from typing import Any, Callable
-import zipfile
 
-from PyQt5.QtCore import QSize, Qt
-from PyQt5.QtGui import QCursor, QDragEnterEvent, QDropEvent, QFont, QIcon, QPixmap
+from PyQt5.QtCore import QSize, Qt, QTimer, QUrl, pyqtSignal
+from PyQt5.QtGui import QCursor, QDesktopServices, QDragEnterEvent, QDropEvent, QFont, QIcon, QPixmap
 from PyQt5.QtWidgets import (
     QAction,
-    QApplication,
     QComboBox,
     QDialog,
     QDialogButtonBox,
@@ -25,6 +22,7 @@ from PyQt5.QtWidgets import (
     QListWidget,
     QMenu,
     QMessageBox,
+    QProgressBar,
     QPushButton,
     QScrollArea,
     QStackedWidget,
@@ -33,22 +31,69 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
-from config import MINECRAFT_DIR, MINECRAFT_VERSIONS, MODS_DIR
+from config import MINECRAFT_DIR, MODS_DIR, get_minecraft_versions
+from flow import dedicate
+from instances import instance_manager
+from mod_index import ModInfo
 from mod_manager import ModManager
+from mod_store import mod_store
+from modpack_repository import PACK_REMOVED, PackStats, modpack_repository
 from util import resource_path
+from ..threads.modpack_transfer_thread import ModpackExportThread, ModpackImportThread, ModpackTransferThread
+from .install_queue_panel import BUTTON_STYLE, PROGRESS_SCALE, PROGRESS_STYLE
+
+# .zip - прежний формат лаунчера с модами внутри архива
+MODPACK_EXTENSIONS = ('.mrpack', '.zip')
+LOADER_NAMES = {'fabric': 'Fabric', 'forge': 'Forge', 'quilt': 'Quilt', 'neoforge': 'NeoForge'}
+
+
+def mod_tooltip(info: ModInfo) -> str:
+    """Подсказка к файлу мода по метаданным из jar"""
+    if info.mod_id is None:
+        return info.filename
+    lines = [f'{info.display_name} {info.version or ""}'.strip(), f'ID: {info.mod_id} ({info.loader})']
+    if info.depends:
+        lines.append(f'Зависимости: {", ".join(info.depends)}')
+    if info.description:
+        lines.append(info.description)
+    return '\n'.join(lines)
 
 
 class ModpackTab(QWidget):
+    # Переносит изменения сборок из потока, который их сделал, в поток интерфейса
+    pack_changed = pyqtSignal(str, str, object)
+
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self.parent_window = parent
-        self.modpacks_dir = os.path.join(MINECRAFT_DIR, 'modpacks')
         self.icons_dir = os.path.join(
             MINECRAFT_DIR,
             'modpack_icons',
         )  # Директория для иконок
-        os.makedirs(self.modpacks_dir, exist_ok=True)
         os.makedirs(self.icons_dir, exist_ok=True)
+
+        self.modpacks: dict[str, dict[str, Any]] = {}
+        self.cards: dict[str, QFrame] = {}
+        # ID сборок в том порядке, в котором карточки стоят в сетке
+        self.cards_order: list[str] = []
+        # ID сборок, карточки которых нужно пересоздать одной пачкой
+        self.stale_cards: set[str] = set()
+        # ID сборки -> файлы модов, статистику которых нужно перечитать
+        self.stale_files: dict[str, set[str]] = {}
+        self.cards_timer = QTimer(self)
+        self.cards_timer.setSingleShot(True)
+        self.cards_timer.timeout.connect(self.update_stale_cards)
+        self.transfer_thread: ModpackTransferThread | None = None
+        self.pack_changed.connect(self.on_pack_changed)
+        modpack_repository.subscribe(self.pack_changed.emit)
+        self.library_watcher = self.parent_window.library_watcher
+        for signal in (
+            self.library_watcher.file_added,
+            self.library_watcher.file_removed,
+            self.library_watcher.file_modified,
+        ):
+            signal.connect(self.on_library_changed)
+
         self.setup_ui()
         self.load_modpacks()
         self.setup_drag_drop()
@@ -126,6 +171,29 @@ class ModpackTab(QWidget):
         self.scroll_area.setWidget(self.scroll_content)
         layout.addWidget(self.scroll_area)
 
+        # Import/Export Progress
+        self.transfer_panel = QFrame()
+        transfer_layout = QHBoxLayout(self.transfer_panel)
+        transfer_layout.setContentsMargins(8, 4, 8, 4)
+        transfer_text = QVBoxLayout()
+        self.transfer_title = QLabel()
+        self.transfer_stage = QLabel()
+        self.transfer_stage.setStyleSheet('color: #AAAAAA;')
+        transfer_text.addWidget(self.transfer_title)
+        transfer_text.addWidget(self.transfer_stage)
+        transfer_layout.addLayout(transfer_text, 1)
+        self.transfer_progress = QProgressBar()
+        self.transfer_progress.setTextVisible(False)
+        self.transfer_progress.setFixedHeight(8)
+        self.transfer_progress.setStyleSheet(PROGRESS_STYLE)
+        transfer_layout.addWidget(self.transfer_progress, 2)
+        self.transfer_cancel_btn = QPushButton('Отмена')
+        self.transfer_cancel_btn.setStyleSheet(BUTTON_STYLE)
+        self.transfer_cancel_btn.clicked.connect(self.cancel_transfer)
+        transfer_layout.addWidget(self.transfer_cancel_btn)
+        self.transfer_panel.hide()
+        layout.addWidget(self.transfer_panel)
+
         # Status Label
         self.status_label = QLabel()
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -183,7 +251,7 @@ class ModpackTab(QWidget):
         """)
         return btn
 
-    def create_modpack_card(self, pack_data: dict[str, Any]) -> QFrame:
+    def create_modpack_card(self, pack_data: dict[str, Any], stats: PackStats) -> QFrame:
         icon = QLabel()
         icon_name = pack_data.get('icon')
         icon_path = os.path.join(self.icons_dir, icon_name) if icon_name else ''
@@ -228,8 +296,8 @@ class ModpackTab(QWidget):
         details = QLabel(f"""
             <div style='color: #CCCCCC; font-size: 12px;'>
                 <b>Тип:</b> {pack_data['loader']}<br>
-                <b>Моды:</b> {len(pack_data['mods'])}<br>
-                <b>Размер:</b> {self.get_modpack_size(pack_data)}
+                <b>Моды:</b> {self.format_mod_count(stats)}<br>
+                <b>Размер:</b> {stats.total_size / 1024 / 1024:.1f} MB
             </div>
         """)
         layout.addWidget(details)
@@ -306,52 +374,115 @@ class ModpackTab(QWidget):
         )
 
     def load_modpacks(self) -> None:
-        # Clear existing cards
-        while self.grid_layout.count():
-            item = self.grid_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        # Load modpacks
-        modpacks = []
-        for file in os.listdir(self.modpacks_dir):
-            if file.endswith('.json'):
-                try:
-                    with open(os.path.join(self.modpacks_dir, file)) as f:
-                        pack = json.load(f)
-                        pack['filename'] = file
-                        modpacks.append(pack)
-                except Exception as e:
-                    logging.exception(f'Error loading modpack {file}: {e}')
-
-        if not modpacks:
-            self.status_label.setText('🎮 Создайте свою первую сборку!')
+        """Строит все карточки заново, дальше они обновляются по одной по изменениям сборок"""
+        for card in self.cards.values():
+            self.grid_layout.removeWidget(card)
+            card.deleteLater()
+        self.cards = {}
+        # Сетка пуста - новые карточки нужно расставить, а не подменять ими старые
+        self.cards_order = []
+        self.modpacks = modpack_repository.all()
+        self.stale_cards = set(self.modpacks)
+        # Пока лаунчер был закрыт, файлы модов могли измениться - сверяем статистику с индексом папок
+        for pack_id in self.modpacks:
+            stale = self.find_stale_files(pack_id)
+            if stale:
+                self.stale_files[pack_id] = stale
+        self.update_stale_cards()
+
+    def find_stale_files(self, pack_id: str) -> set[str]:
+        stats = modpack_repository.stats(pack_id)
+        if stats is None:
+            return set()
+        files = self.library_watcher.files(os.path.join(MODS_DIR, stats.version))
+        stale = set()
+        for name, entry in stats.files.items():
+            current = files.get(name)
+            if (current and [current.size, current.mtime_ns]) != (entry and entry[:2]):
+                stale.add(name)
+        return stale
+
+    def on_pack_changed(self, change: str, pack_id: str, pack: dict[str, Any] | None) -> None:
+        if change == PACK_REMOVED:
+            self.modpacks.pop(pack_id, None)
+        else:
+            self.modpacks[pack_id] = pack
+        self.stale_cards.add(pack_id)
+        self.cards_timer.start()
+
+    def on_library_changed(self, path: str) -> None:
+        """Помечает сборки, в которые входит изменённый файл мода; статистика перечитается только для него"""
+        directory, name = os.path.split(path)
+        if os.path.dirname(directory) != os.path.abspath(MODS_DIR):
             return
-
-        # Create cards
-        row, col = 0, 0
-        for pack in sorted(modpacks, key=lambda x: x['name'].lower()):
-            card = self.create_modpack_card(pack)
-            card.setProperty('pack_name', pack['name'])
-            card.setProperty('loader_type', pack['loader'])
-            self.grid_layout.addWidget(card, row, col)
-
-            col += 1
-            if col > 3:  # 4 columns
-                col = 0
-                row += 1
-
-        self.status_label.setText(f'Загружено сборок: {len(modpacks)}')
-
-    def get_modpack_size(self, pack_data: dict[str, Any]) -> str:
-        total_size = 0
-        mods_dir = os.path.join(MODS_DIR, pack_data['version'])
-        if os.path.exists(mods_dir):
-            for mod in pack_data['mods']:
-                mod_path = os.path.join(mods_dir, mod)
-                if os.path.exists(mod_path):
-                    total_size += os.path.getsize(mod_path)
-        return f'{total_size / 1024 / 1024:.1f} MB'
+        for pack_id in modpack_repository.packs_with_mod(os.path.basename(directory), name):
+            self.stale_files.setdefault(pack_id, set()).add(name)
+            self.stale_cards.add(pack_id)
+        self.cards_timer.start()
+
+    def update_stale_cards(self) -> None:
+        """Пересоздаёт только карточки изменившихся сборок"""
+        changed, self.stale_cards = self.stale_cards, set()
+        stale_files, self.stale_files = self.stale_files, {}
+        for pack_id, names in stale_files.items():
+            modpack_repository.refresh_stats(pack_id, names)
+        replaced = {}
+        for pack_id in changed:
+            old_card = self.cards.pop(pack_id, None)
+            pack = self.modpacks.get(pack_id)
+            if pack is not None:
+                card = self.create_modpack_card(pack, modpack_repository.stats(pack_id))
+                card.setProperty('pack_name', pack['name'])
+                card.setProperty('loader_type', pack['loader'])
+                self.cards[pack_id] = card
+                if old_card is not None:
+                    replaced[pack_id] = old_card
+                    continue
+            if old_card is not None:
+                self.grid_layout.removeWidget(old_card)
+                old_card.deleteLater()
+
+        if changed and self.card_order() == self.cards_order:
+            # Порядок не изменился - новые карточки встают на места старых
+            for pack_id, old_card in replaced.items():
+                self.grid_layout.replaceWidget(old_card, self.cards[pack_id])
+                old_card.deleteLater()
+            self.update_status()
+        elif changed:
+            for old_card in replaced.values():
+                self.grid_layout.removeWidget(old_card)
+                old_card.deleteLater()
+            self.layout_cards()
+
+    def card_order(self) -> list[str]:
+        return sorted(self.cards, key=lambda pack_id: (self.modpacks[pack_id]['name'].lower(), pack_id))
+
+    def layout_cards(self) -> None:
+        """Расставляет карточки по сетке в алфавитном порядке, не пересоздавая их"""
+        for card in self.cards.values():
+            self.grid_layout.removeWidget(card)
+        self.cards_order = self.card_order()
+        for index, pack_id in enumerate(self.cards_order):
+            self.grid_layout.addWidget(self.cards[pack_id], index // 4, index % 4)  # 4 columns
+        self.update_status()
+
+    def update_status(self) -> None:
+        if not self.cards:
+            self.status_label.setText('🎮 Создайте свою первую сборку!')
+        elif self.search_bar.text() or self.filter_combo.currentText() != 'Все':
+            self.filter_modpacks()
+        else:
+            self.status_label.setText(f'Загружено сборок: {len(self.cards)}')
+
+    @staticmethod
+    def format_mod_count(stats: PackStats) -> str:
+        text = str(stats.mod_count)
+        loaders = ', '.join(f'{LOADER_NAMES.get(loader, loader)}: {count}' for loader, count in sorted(stats.loaders.items()))
+        if loaders:
+            text += f' ({loaders})'
+        if stats.missing:
+            text += f", <span style='color: #FF8A80;'>нет файлов: {stats.missing}</span>"
+        return text
 
     def show_context_menu(self, pack_data: dict[str, Any]) -> None:
         menu = QMenu(self)
@@ -370,6 +501,13 @@ class ModpackTab(QWidget):
         )
         duplicate_action.triggered.connect(lambda: self.duplicate_modpack(pack_data))
 
+        folder_action = QAction(
+            QIcon(resource_path('assets/folder.png')),
+            'Открыть папку',
+            self,
+        )
+        folder_action.triggered.connect(lambda: self.open_instance_folder(pack_data))
+
         delete_action = QAction(
             QIcon(resource_path('assets/delete.png')),
             'Удалить',
@@ -379,6 +517,7 @@ class ModpackTab(QWidget):
 
         menu.addAction(export_action)
         menu.addAction(duplicate_action)
+        menu.addAction(folder_action)
         menu.addAction(delete_action)
         menu.exec_(QCursor.pos())
 
@@ -392,10 +531,7 @@ class ModpackTab(QWidget):
         )
 
         if ok and new_name:
-            new_filename = f'{new_name}.json'
-            new_path = os.path.join(self.modpacks_dir, new_filename)
-
-            if os.path.exists(new_path):
+            if modpack_repository.find_by_name(new_name) is not None:
                 QMessageBox.warning(
                     self,
                     'Ошибка',
@@ -404,27 +540,47 @@ class ModpackTab(QWidget):
                 return
 
             try:
-                shutil.copyfile(
-                    os.path.join(self.modpacks_dir, pack_data['filename']),
-                    new_path,
-                )
-                self.load_modpacks()
+                new_pack = modpack_repository.create({**pack_data, 'name': new_name})
             except Exception as e:
                 QMessageBox.critical(
                     self,
                     'Ошибка',
                     f'Не удалось создать копию: {e!s}',
                 )
+                return
+            # Без reflink настройки и миры копируются целиком, поэтому не в потоке интерфейса
+            dedicate(instance_manager.clone, pack_data['id'], new_pack['id'])
+
+    def open_instance_folder(self, pack_data: dict[str, Any]) -> None:
+        try:
+            path = instance_manager.ensure(modpack_repository.get(pack_data['id']) or pack_data)
+        except Exception as e:
+            QMessageBox.critical(self, 'Ошибка', f'Не удалось подготовить папку сборки: {e!s}')
+            return
+        QDesktopServices.openUrl(QUrl.fromLocalFile(path))
 
     def launch_modpack(self, pack_data: dict[str, Any]) -> None:
+        """Запускает игру с версией и загрузчиком сборки и с папкой сборки в качестве папки игры"""
+        pack_data = modpack_repository.get(pack_data['id']) or pack_data
         self.parent_window.version_select.setCurrentText(pack_data['version'])
         self.parent_window.loader_select.setCurrentText(pack_data['loader'])
+        if (
+            self.parent_window.version_select.currentText() != pack_data['version']
+            or self.parent_window.loader_select.currentText() != pack_data['loader']
+        ):
+            QMessageBox.warning(
+                self,
+                'Запуск сборки',
+                f'Версия {pack_data["version"]} с загрузчиком {pack_data["loader"]} недоступна в списке версий',
+            )
+            return
+        try:
+            game_directory = instance_manager.ensure(pack_data)
+        except Exception as e:
+            QMessageBox.critical(self, 'Ошибка', f'Не удалось подготовить папку сборки: {e!s}')
+            return
         self.parent_window.tabs.setCurrentIndex(0)
-        QMessageBox.information(
-            self,
-            'Запуск сборки',
-            f"Параметры сборки '{pack_data['name']}' установлены!\nНажмите 'Играть' для запуска.",
-        )
+        self.parent_window.launch_game(game_directory)
 
     def edit_modpack(self, pack_data: dict[str, Any]) -> None:
         dialog = QDialog(self)
@@ -444,7 +600,7 @@ class ModpackTab(QWidget):
         version_layout = QHBoxLayout()
         version_label = QLabel('Версия:')
         self.version_combo = QComboBox()
-        self.version_combo.addItems(MINECRAFT_VERSIONS)
+        self.version_combo.addItems(get_minecraft_versions())
         self.version_combo.setCurrentText(pack_data['version'])
         version_layout.addWidget(version_label)
         version_layout.addWidget(self.version_combo)
@@ -461,7 +617,7 @@ class ModpackTab(QWidget):
         mods_layout = QVBoxLayout()
         mods_label = QLabel('Моды в сборке:')
         self.mods_list = QListWidget()
-        self.mods_list.addItems(pack_data['mods'])
+        self.add_mod_items(self.mods_list, pack_data['version'], pack_data['mods'])
 
         # Кнопки управления модами
         mod_buttons = QHBoxLayout()
@@ -500,6 +656,16 @@ class ModpackTab(QWidget):
             row = self.mods_list.row(item)
             self.mods_list.takeItem(row)
 
+    @staticmethod
+    def add_mod_items(list_widget: QListWidget, version: str, mod_names: list[str]) -> None:
+        """Добавляет файлы модов в список, подсказки берутся из индекса метаданных"""
+        infos = {info.filename: info for info in ModManager.get_installed_mods(version)}
+        for mod_name in mod_names:
+            list_widget.addItem(mod_name)
+            info = infos.get(mod_name)
+            if info is not None:
+                list_widget.item(list_widget.count() - 1).setToolTip(mod_tooltip(info))
+
     def add_mods_to_pack(self, pack_data: dict[str, Any]) -> None:
         # Диалог выбора модов
         file_dialog = QFileDialog()
@@ -514,13 +680,13 @@ class ModpackTab(QWidget):
                 mod_name = os.path.basename(file_path)
                 dest_path = os.path.join(mods_dir, mod_name)
 
-                # Копируем мод в папку сборки
+                # Кладём мод в папку сборки через общее хранилище
                 if not os.path.exists(dest_path):
-                    shutil.copyfile(file_path, dest_path)
+                    mod_store.install_file(file_path, dest_path)
 
                 # Добавляем в список, если еще нет
                 if not self.mods_list.findItems(mod_name, Qt.MatchExactly):
-                    self.mods_list.addItem(mod_name)
+                    self.add_mod_items(self.mods_list, pack_data['version'], [mod_name])
 
             QMessageBox.information(self, 'Успех', 'Моды успешно добавлены!')
 
@@ -535,23 +701,16 @@ class ModpackTab(QWidget):
             new_mods.append(self.mods_list.item(i).text())
 
         try:
-            # Удаляем старый файл
-            old_path = os.path.join(self.modpacks_dir, old_pack['filename'])
-            os.remove(old_path)
-
-            # Создаем новый
-            new_filename = f'{new_name}.json'
-            new_pack = {
-                'name': new_name,
-                'version': new_version,
-                'loader': new_loader,
-                'mods': new_mods,
-            }
-
-            with open(os.path.join(self.modpacks_dir, new_filename), 'w') as f:
-                json.dump(new_pack, f)
-
-            self.load_modpacks()
+            modpack_repository.update(
+                old_pack['id'],
+                {
+                    **old_pack,
+                    'name': new_name,
+                    'version': new_version,
+                    'loader': new_loader,
+                    'mods': new_mods,
+                },
+            )
             dialog.accept()
 
         except Exception as e:
@@ -562,18 +721,24 @@ class ModpackTab(QWidget):
             )
 
     def delete_modpack(self, pack_data: dict[str, Any]) -> None:
+        message = f"Вы уверены, что хотите удалить сборку '{pack_data['name']}'?"
+        if instance_manager.exists(pack_data['id']):
+            message += '\n\nПапка сборки будет удалена вместе с настройками'
+            saves = instance_manager.saves(pack_data['id'])
+            if saves:
+                message += f' и мирами ({len(saves)}): {", ".join(saves)}.\nСкопируйте нужные миры через «Открыть папку» заранее'
+            message += '.'
         confirm = QMessageBox.question(
             self,
             'Удаление сборки',  # Исправлен заголовок
-            f"Вы уверены, что хотите удалить сборку '{pack_data['name']}'?",  # Исправлен текст
+            message,
             QMessageBox.Yes | QMessageBox.No,  # Правильные константы кнопок
             QMessageBox.No,  # Кнопка по умолчанию
         )
 
         if confirm == QMessageBox.Yes:
             try:
-                os.remove(os.path.join(self.modpacks_dir, pack_data['filename']))
-                self.load_modpacks()
+                modpack_repository.delete(pack_data['id'])
             except Exception as e:
                 QMessageBox.critical(
                     self,
@@ -589,46 +754,19 @@ class ModpackTab(QWidget):
     def dragEnterEvent(self, event: QDragEnterEvent) -> None:
         if event.mimeData().hasUrls():
             urls = event.mimeData().urls()
-            if any(url.toLocalFile().lower().endswith('.zip') for url in urls):
+            if any(url.toLocalFile().lower().endswith(MODPACK_EXTENSIONS) for url in urls):
                 event.acceptProposedAction()
 
     def dropEvent(self, event: QDropEvent) -> None:
         urls = event.mimeData().urls()
         for url in urls:
             file_path = url.toLocalFile()
-            if file_path.lower().endswith('.zip'):
+            if file_path.lower().endswith(MODPACK_EXTENSIONS):
                 self.handle_dropped_file(file_path)
         event.acceptProposedAction()
 
     def handle_dropped_file(self, file_path: str) -> None:
-        try:
-            loading_indicator = QLabel('Импорт сборки...', self)
-            loading_indicator.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            loading_indicator.setStyleSheet("""
-                QLabel {
-                    background-color: #454545;
-                    color: white;
-                    padding: 20px;
-                    border-radius: 10px;
-                    font-size: 16px;
-                }
-            """)
-            loading_indicator.setGeometry(
-                self.width() // 2 - 150,
-                self.height() // 2 - 50,
-                300,
-                100,
-            )
-            loading_indicator.show()
-            QApplication.processEvents()
-
-            self.import_modpack(file_path)
-            self.load_modpacks()
-
-        except Exception as e:
-            QMessageBox.critical(self, 'Ошибка', f'Ошибка импорта: {e!s}')
-        finally:
-            loading_indicator.hide()
+        self.import_modpack(file_path)
 
     def import_modpack(self, file_path=None):
         if not file_path:
@@ -636,37 +774,20 @@ class ModpackTab(QWidget):
                 self,
                 'Выберите файл сборки',
                 '',
-                'ZIP файлы (*.zip)',
+                'Сборки (*.mrpack *.zip)',
             )
             if not file_path:
                 return
 
-        try:
-            with zipfile.ZipFile(file_path, 'r') as zipf:
-                if 'modpack.json' not in zipf.namelist():
-                    raise ValueError('Отсутствует файл modpack.json в архиве')
-
-                pack_data = json.loads(zipf.read('modpack.json'))
-                mods_dir = os.path.join(MODS_DIR, pack_data['version'])
-                os.makedirs(mods_dir, exist_ok=True)
-
-                for mod in pack_data['mods']:
-                    try:
-                        zipf.extract(f'mods/{mod}', mods_dir)
-                    except KeyError:
-                        logging.warning(f'Мод {mod} отсутствует в архиве')
-
-                with open(
-                    os.path.join(self.modpacks_dir, f'{pack_data["name"]}.json'),
-                    'w',
-                ) as f:
-                    json.dump(pack_data, f)
-
-            self.load_modpacks()
-            QMessageBox.information(self, 'Успех', 'Сборка успешно импортирована!')
+        thread = ModpackImportThread(file_path)
+        thread.pack_imported.connect(self.on_pack_imported)
+        thread.error_occurred.connect(
+            lambda error: QMessageBox.critical(self, 'Ошибка', f'Ошибка импорта: {error}'),
+        )
+        self.start_transfer(thread, f'Импорт {os.path.basename(file_path)}')
 
-        except Exception as e:
-            QMessageBox.critical(self, 'Ошибка', f'Ошибка импорта: {e!s}')
+    def on_pack_imported(self, pack_data: dict[str, Any]) -> None:
+        QMessageBox.information(self, 'Успех', 'Сборка успешно импортирована!')
 
     def export_modpack(self, pack_data):
         try:
@@ -675,27 +796,63 @@ class ModpackTab(QWidget):
                 os.path.expanduser('~/Desktop'),
             )
             os.makedirs(export_path, exist_ok=True)
+        except Exception as e:
+            QMessageBox.critical(self, 'Ошибка', f'Ошибка экспорта: {e!s}')
+            return
 
-            with open(os.path.join(self.modpacks_dir, pack_data['filename'])) as f:
-                pack_data = json.load(f)
-
-            zip_path = os.path.join(export_path, f'{pack_data["name"]}.zip')
-            with zipfile.ZipFile(zip_path, 'w') as zipf:
-                mods_dir = os.path.join(MODS_DIR, pack_data['version'])
-                for mod in pack_data['mods']:
-                    mod_path = os.path.join(mods_dir, mod)
-                    if os.path.exists(mod_path):
-                        zipf.write(mod_path, arcname=f'mods/{mod}')
+        pack_data = modpack_repository.get(pack_data['id']) or pack_data
+        pack_path = os.path.join(export_path, f'{pack_data["name"]}.mrpack')
+        thread = ModpackExportThread(pack_data, pack_path)
+        thread.pack_exported.connect(self.on_pack_exported)
+        thread.error_occurred.connect(
+            lambda error: QMessageBox.critical(self, 'Ошибка', f'Ошибка экспорта: {error}'),
+        )
+        self.start_transfer(thread, f'Экспорт {pack_data["name"]}')
 
-                zipf.writestr('modpack.json', json.dumps(pack_data))
+    def on_pack_exported(self, pack_path: str, linked: int, embedded: int) -> None:
+        QMessageBox.information(
+            self,
+            'Успех',
+            f'Сборка экспортирована в:\n{pack_path}\n\nМодов с Modrinth: {linked}, модов внутри архива: {embedded}',
+        )
 
-            QMessageBox.information(
-                self,
-                'Успех',
-                f'Сборка экспортирована в:\n{zip_path}',
-            )
-        except Exception as e:
-            QMessageBox.critical(self, 'Ошибка', f'Ошибка экспорта: {e!s}')
+    def start_transfer(self, thread: ModpackTransferThread, title: str) -> None:
+        """Запускает импорт или экспорт в фоне; одновременно выполняется только одна такая задача"""
+        if self.transfer_thread is not None:
+            thread.deleteLater()
+            QMessageBox.warning(self, 'Подождите', 'Дождитесь окончания импорта или экспорта другой сборки')
+            return
+        self.transfer_thread = thread
+        thread.progress_signal.connect(self.on_transfer_progress)
+        thread.finished.connect(self.on_transfer_finished)
+        self.transfer_title.setText(title)
+        self.transfer_stage.setText('')
+        self.transfer_progress.setRange(0, 0)
+        self.transfer_cancel_btn.setEnabled(True)
+        self.transfer_panel.show()
+        self.import_btn.setEnabled(False)
+        thread.start()
+
+    def on_transfer_progress(self, fraction: float, stage: str) -> None:
+        self.transfer_stage.setText(stage)
+        if fraction < 0:
+            self.transfer_progress.setRange(0, 0)
+        else:
+            self.transfer_progress.setRange(0, PROGRESS_SCALE)
+            self.transfer_progress.setValue(int(fraction * PROGRESS_SCALE))
+
+    def cancel_transfer(self) -> None:
+        if self.transfer_thread is not None:
+            self.transfer_thread.cancel()
+            self.transfer_stage.setText('Отмена...')
+            self.transfer_cancel_btn.setEnabled(False)
+
+    def on_transfer_finished(self) -> None:
+        self.transfer_panel.hide()
+        self.import_btn.setEnabled(True)
+        if self.transfer_thread is not None:
+            self.transfer_thread.deleteLater()
+            self.transfer_thread = None
 
     def show_creation_dialog(self):
         dialog = QDialog(self)
@@ -712,7 +869,7 @@ class ModpackTab(QWidget):
         self.pack_version = QComboBox()
         self.pack_loader = QComboBox()
 
-        for v in MINECRAFT_VERSIONS:
+        for v in get_minecraft_versions():
             self.pack_version.addItem(v)
         self.pack_loader.addItems(['Vanilla', 'Forge', 'Fabric', 'OptiFine'])
 
@@ -728,8 +885,8 @@ class ModpackTab(QWidget):
         self.mods_selection.setSelectionMode(QListWidget.MultiSelection)
 
         version = self.pack_version.currentText()
-        mods = ModManager.get_mods_list(version)
-        self.mods_selection.addItems(mods)
+        mods = ModManager.get_mods_list(version, self.library_watcher)
+        self.add_mod_items(self.mods_selection, version, mods)
 
         mods_layout.addWidget(QLabel('Выберите моды:'))
         mods_layout.addWidget(self.mods_selection)
@@ -774,6 +931,10 @@ class ModpackTab(QWidget):
         loader = self.pack_loader.currentText()
         selected_mods = [item.text() for item in self.mods_selection.selectedItems()]
 
+        if modpack_repository.find_by_name(name) is not None:
+            QMessageBox.warning(self, 'Ошибка', 'Сборка с таким именем уже существует!')
+            return
+
         icon_name = None
         # Проверяем, существует ли атрибут и путь
         if hasattr(self, 'selected_icon') and self.selected_icon:
@@ -795,8 +956,5 @@ class ModpackTab(QWidget):
         if icon_name:
             pack_data['icon'] = icon_name
 
-        with open(os.path.join(self.modpacks_dir, f'{name}.json'), 'w') as f:
-            json.dump(pack_data, f)
-
-        self.load_modpacks()
+        modpack_repository.create(pack_data)
         dialog.close()
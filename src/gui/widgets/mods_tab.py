@@ -1,9 +1,10 @@
 import logging
+import os
+from functools import partial
 from typing import Any
 
-import requests
-from PyQt5.QtCore import QSize, Qt, QTimer
-from PyQt5.QtGui import QIcon, QPixmap, QShowEvent
+from PyQt5.QtCore import QModelIndex, QSize, Qt, QTimer
+from PyQt5.QtGui import QIcon, QShowEvent
 from PyQt5.QtWidgets import (
     QComboBox,
     QHBoxLayout,
@@ -11,44 +12,74 @@ from PyQt5.QtWidgets import (
     QLineEdit,
     QMessageBox,
     QPushButton,
-    QScrollArea,
     QSlider,
     QVBoxLayout,
     QWidget,
 )
 
-from config import MINECRAFT_VERSIONS
+from config import MODS_DIR, get_minecraft_versions
+from mod_install_queue import JOB_CANCELLED, JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, InstallJob, mod_install_queue
 from mod_manager import ModManager
+from mod_updates import ModUpdate
+from search_pages import PAGE_SIZE, SearchPages
 from util import resource_path
+from ..threads.icon_loader import IconLoader
 from ..threads.mod_search_thread import ModSearchThread
-from ..threads.popular_mods_thread import PopularModsThread
+from ..threads.mod_update_thread import ModUpdateApplyThread, ModUpdateCheckThread
+from .install_queue_panel import InstallQueuePanel
+from .mod_list_view import (
+    INSTALL_DONE,
+    INSTALL_FAILED,
+    INSTALL_NONE,
+    INSTALL_QUEUED,
+    INSTALL_RUNNING,
+    ModCardDelegate,
+    ModListModel,
+    ModListView,
+    ModRole,
+)
+
+# Пауза после последнего нажатия клавиши перед отправкой запроса
+SEARCH_DEBOUNCE_MS = 350
+# Отменённые потоки дочитывают ответ в фоне, поэтому их число ограничено
+MAX_CONCURRENT_SEARCHES = 2
+
+# Состояние установки в очереди -> состояние кнопки на карточке мода
+INSTALL_STATES = {
+    JOB_QUEUED: INSTALL_QUEUED,
+    JOB_RUNNING: INSTALL_RUNNING,
+    JOB_DONE: INSTALL_DONE,
+    JOB_FAILED: INSTALL_FAILED,
+    JOB_CANCELLED: INSTALL_NONE,
+}
 
 
 class ModsTab(QWidget):
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self.parent_window = parent
-        self.search_thread = None
-        self.popular_mods_thread = None
+        self.search_threads: list[ModSearchThread] = []
+        self.pending_search: tuple[SearchPages, int] | None = None
+        # Текущий поиск: страницы и (запрос, фильтры), для популярных модов ключа нет
+        self.search_pages: SearchPages | None = None
+        self.search_key: tuple[str, tuple] | None = None
+        # Первая страница последнего завершённого поиска: (запрос, фильтры, моды)
+        self.last_search: tuple[str, tuple, list] | None = None
         self.current_search_query = ''
         self.current_page = 1
         self.total_pages = 1
-        self.mods_data = []
+        # Строка, к которой нужно прокрутить список, когда её страница загрузится
+        self.pending_scroll_row: int | None = None
         self.minecraft_versions = []
+        self.update_thread = None
+        self.icon_loader = IconLoader(self)
+        self.mods_model = ModListModel(self.icon_loader, self)
+        self.mods_model.more_requested.connect(self.load_page)
         self.setup_ui()
         self.is_loaded = False
 
         # Добавляем надпись о загрузке
-        self.loading_label = QLabel('Моды загружаются, подождите...')
-        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.loading_label.setStyleSheet("""
-            QLabel {
-                color: #aaaaaa;
-                font-size: 16px;
-                padding: 20px;
-            }
-        """)
-        self.mods_layout.addWidget(self.loading_label)
+        self.show_loading_indicator('Моды загружаются, подождите...')
 
     def showEvent(self, event: QShowEvent) -> None:
         """Запускаем загрузку только при первом открытии вкладки"""
@@ -90,7 +121,12 @@ class ModsTab(QWidget):
                 border-color: #666666;
             }
         """)
-        self.search_input.returnPressed.connect(self.search_mods)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_mods)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.search_now)
         search_layout.addWidget(self.search_input)
 
         self.search_button = QPushButton()
@@ -107,8 +143,36 @@ class ModsTab(QWidget):
                 background-color: #555555;
             }
         """)
-        self.search_button.clicked.connect(self.search_mods)
+        self.search_button.clicked.connect(self.search_now)
         search_layout.addWidget(self.search_button)
+
+        self.update_button = QPushButton('Проверить обновления')
+        self.update_button.setFixedHeight(40)
+        self.update_button.setStyleSheet("""
+            QPushButton {
+                background-color: #444444;
+                color: white;
+                border: none;
+                border-radius: 5px;
+                padding: 0 12px;
+            }
+            QPushButton:hover {
+                background-color: #555555;
+            }
+            QPushButton:disabled {
+                color: #666666;
+            }
+        """)
+        self.update_button.clicked.connect(self.check_mod_updates)
+        search_layout.addWidget(self.update_button)
+
+        self.install_selected_button = QPushButton('Установить выбранные')
+        self.install_selected_button.setFixedHeight(40)
+        self.install_selected_button.setStyleSheet(self.update_button.styleSheet())
+        self.install_selected_button.setEnabled(False)
+        self.install_selected_button.setToolTip('Выделите моды в списке с Ctrl или Shift')
+        self.install_selected_button.clicked.connect(self.install_selected_mods)
+        search_layout.addWidget(self.install_selected_button)
         top_layout.addLayout(search_layout)
 
         # Фильтры
@@ -197,10 +261,9 @@ class ModsTab(QWidget):
         layout.addWidget(top_panel)
 
         # --- Список модов ---
-        self.mods_scroll = QScrollArea()
-        self.mods_scroll.setWidgetResizable(True)
-        self.mods_scroll.setStyleSheet("""
-            QScrollArea {
+        self.mods_view = ModListView()
+        self.mods_view.setStyleSheet("""
+            QListView {
                 border: none;
                 background-color: transparent;
             }
@@ -219,12 +282,32 @@ class ModsTab(QWidget):
                 background: #666666;
             }
         """)
-
-        self.mods_container = QWidget()
-        self.mods_layout = QVBoxLayout(self.mods_container)
-        self.mods_layout.setSpacing(15)
-        self.mods_scroll.setWidget(self.mods_container)
-        layout.addWidget(self.mods_scroll)
+        self.mods_view.setModel(self.mods_model)
+        self.mods_delegate = ModCardDelegate(self.mods_view)
+        self.mods_delegate.install_clicked.connect(self.install_modrinth_mod)
+        self.mods_view.setItemDelegate(self.mods_delegate)
+        self.mods_view.verticalScrollBar().valueChanged.connect(self.update_page_label)
+        self.mods_view.selectionModel().selectionChanged.connect(self.update_install_selected_button)
+        self.mods_model.modelReset.connect(self.update_install_selected_button)
+        layout.addWidget(self.mods_view)
+
+        self.queue_panel = InstallQueuePanel(parent=self)
+        self.queue_panel.job_changed.connect(self.on_install_job_changed)
+        for job in mod_install_queue.jobs():
+            self.on_install_job_changed(job)
+        layout.addWidget(self.queue_panel)
+
+        self.status_label = QLabel()
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.status_label.setStyleSheet("""
+            QLabel {
+                color: #aaaaaa;
+                font-size: 16px;
+                padding: 20px;
+            }
+        """)
+        self.status_label.setVisible(False)
+        layout.addWidget(self.status_label)
 
         # --- Пагинация ---
         pagination_widget = QWidget()
@@ -270,83 +353,10 @@ class ModsTab(QWidget):
 
         layout.addWidget(pagination_widget)
 
-    def create_mod_card(self, mod: dict[str, Any]) -> QWidget:
-        """Создает карточку мода"""
-        card = QWidget()
-        card.setStyleSheet("""
-            QWidget {
-                background-color: #333333;
-                border-radius: 10px;
-            }
-            QPushButton {
-                background-color: #444444;
-                color: white;
-                border: none;
-                border-radius: 5px;
-                padding: 8px;
-            }
-            QPushButton:hover {
-                background-color: #555555;
-            }
-        """)
-        card.setFixedHeight(120)
-
-        layout = QHBoxLayout(card)
-        layout.setContentsMargins(15, 15, 15, 15)
-
-        # Иконка
-        icon_label = QLabel()
-        icon_label.setFixedSize(90, 90)
-        icon_label.setStyleSheet('background-color: #444444; border-radius: 5px;')
-        icon_url = ModManager.get_mod_icon(
-            mod.get('project_id', mod.get('id')),
-            'modrinth',
-        )
-        if icon_url:
-            pixmap = QPixmap()
-            try:
-                pixmap.loadFromData(requests.get(icon_url).content)
-                icon_label.setPixmap(
-                    pixmap.scaled(90, 90, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation),
-                )
-            except:
-                pass
-        layout.addWidget(icon_label)
-
-        # Информация
-        info_layout = QVBoxLayout()
-
-        # Название
-        name_label = QLabel(mod.get('title', mod.get('name', 'N/A')))
-        name_label.setStyleSheet('color: white; font-size: 16px; font-weight: bold;')
-        info_layout.addWidget(name_label)
-
-        # Описание
-        desc_label = QLabel(mod.get('description', 'Нет описания'))
-        desc_label.setStyleSheet('color: #aaaaaa;')
-        desc_label.setWordWrap(True)
-        desc_label.setMaximumHeight(40)
-        info_layout.addWidget(desc_label)
-
-        # Статистика
-        stats_layout = QHBoxLayout()
-        downloads_label = QLabel(f'📥 {mod.get("downloads", 0)}')
-        downloads_label.setStyleSheet('color: #aaaaaa;')
-        stats_layout.addWidget(downloads_label)
-        stats_layout.addStretch()
-        info_layout.addLayout(stats_layout)
-
-        layout.addLayout(info_layout)
-
-        # Кнопка установки
-        install_button = QPushButton('Установить')
-        install_button.setFixedWidth(100)
-        install_button.clicked.connect(
-            lambda: self.install_modrinth_mod(mod['project_id']),
-        )
-        layout.addWidget(install_button)
-
-        return card
+    def search_now(self):
+        """Поиск без ожидания паузы в наборе (Enter или кнопка)"""
+        self.search_timer.stop()
+        self.search_mods()
 
     def search_mods(self):
         """Выполняет поиск модов"""
@@ -354,20 +364,10 @@ class ModsTab(QWidget):
 
         # Если строка поиска пуста, показываем популярные моды
         if not query:
+            self.current_search_query = ''
             self.load_popular_mods()
             return
 
-        # Сохраняем текущий запрос
-        self.current_search_query = query
-
-        # Очищаем предыдущие результаты
-        self.current_page = 1
-        self.mods_data = []
-        self.update_page()
-
-        # Показываем индикатор загрузки
-        self.show_loading_indicator()
-
         # Получаем параметры поиска
         version = self.get_selected_version()
         loader = self.loader_combo.currentText()
@@ -377,63 +377,105 @@ class ModsTab(QWidget):
         if category == 'Все категории':
             category = None
         sort_by = self.sort_combo.currentText()
+        filters = (version, loader, category, sort_by)
+
+        if self.search_key == (query, filters) and self.mods_model.loaded_pages == 0:
+            return
+
+        # Сохраняем текущий запрос
+        self.current_search_query = query
+        self.search_key = (query, filters)
 
-        # Создаем и запускаем поток поиска
-        self.search_thread = ModSearchThread(query, version, loader, category, sort_by)
-        self.search_thread.search_finished.connect(
-            lambda mods, q: self.handle_search_results(mods, q),
+        # Пока идёт запрос, показываем подходящие моды из результатов более короткого запроса
+        self.start_search(
+            SearchPages(partial(ModManager.search_modrinth_page, query, *filters)),
+            self.filter_previous_results(query, filters),
         )
-        self.search_thread.error_occurred.connect(self.handle_search_error)
-        self.search_thread.start()
+
+    def filter_previous_results(self, query: str, filters: tuple) -> list[dict[str, Any]]:
+        """Моды прошлого поиска, если новый запрос его продолжает"""
+        if self.last_search is None:
+            return []
+        last_query, last_filters, last_mods = self.last_search
+        if last_filters != filters or not query.lower().startswith(last_query.lower()):
+            return []
+        needle = query.lower()
+        return [mod for mod in last_mods if any(needle in (mod.get(field) or '').lower() for field in ('title', 'slug', 'description'))]
+
+    def start_search(self, pages: SearchPages, preview: list[dict[str, Any]] | None = None):
+        """Начинает новый поиск с первой страницы"""
+        # Более новый запрос делает результаты запущенных поисков ненужными
+        self.pending_search = None
+        for thread in self.search_threads:
+            thread.cancel()
+
+        self.search_pages = pages
+        self.pending_scroll_row = None
+        self.mods_model.reset(preview or [])
+        self.mods_view.scrollToTop()
+        self.load_page(1)
+
+    def load_page(self, page: int):
+        """Добавляет в список страницу текущего поиска, загружая её при необходимости"""
+        mods = self.search_pages.peek(page)
+        if mods is not None:
+            self.show_page(page, mods)
+            return
+
+        self.show_loading_indicator()
+        self.pending_search = (self.search_pages, page)
+        self.start_pending_search()
+
+    def start_pending_search(self):
+        """Запускает отложенный поиск, если есть свободный слот"""
+        if self.pending_search is None or len(self.search_threads) >= MAX_CONCURRENT_SEARCHES:
+            return
+        pages, page = self.pending_search
+        self.pending_search = None
+
+        thread = ModSearchThread(pages, page)
+        thread.search_finished.connect(lambda mods: self.handle_search_results(pages, page, mods))
+        thread.error_occurred.connect(lambda message: self.handle_search_error(pages, page, message))
+        thread.finished.connect(lambda: self.on_search_thread_finished(thread))
+        self.search_threads.append(thread)
+        thread.start()
+
+    def on_search_thread_finished(self, thread: ModSearchThread):
+        if thread in self.search_threads:
+            self.search_threads.remove(thread)
+        thread.deleteLater()
+        self.start_pending_search()
 
     def load_popular_mods(self):
         """Загружает список популярных модов"""
-        try:
-            # Показываем индикатор загрузки
-            self.loading_label.setVisible(True)
-            self.mods_scroll.setVisible(False)
-
-            # Получаем параметры
-            version = self.get_selected_version()
-            loader = self.loader_combo.currentText()
-            if loader == 'Любой':
-                loader = None
-
-            # Создаем и запускаем поток
-            self.popular_mods_thread = PopularModsThread(version, loader)
-            self.popular_mods_thread.finished.connect(self.handle_popular_mods_loaded)
-            self.popular_mods_thread.error.connect(self.handle_popular_mods_error)
-            self.popular_mods_thread.start()
-
-        except Exception as e:
-            self.handle_popular_mods_error(str(e))
-
-    def handle_popular_mods_loaded(self, mods):
-        """Обрабатывает загруженные моды"""
-        self.mods_data = mods
-        self.current_page = 1
-        self.loading_label.setVisible(False)
-        self.mods_scroll.setVisible(True)
-        self.update_page()
+        version = self.get_selected_version()
+        loader = self.loader_combo.currentText()
+        if loader == 'Любой':
+            loader = None
 
-    def handle_popular_mods_error(self, error_message):
-        """Обрабатывает ошибки загрузки"""
-        self.loading_label.setText(f'Ошибка загрузки: {error_message}')
-        QTimer.singleShot(5000, lambda: self.loading_label.setVisible(False))
-        logging.error(f'Ошибка загрузки популярных модов: {error_message}')
+        self.search_key = None
+        self.start_search(SearchPages(partial(ModManager.search_modrinth_page, '', version, loader, None, 'По загрузкам')))
 
-    def handle_search_results(self, mods, query):
+    def handle_search_results(self, pages: SearchPages, page: int, mods: list[dict[str, Any]]):
         """Обрабатывает результаты поиска"""
-        if query != self.search_input.text().strip():
+        if pages is not self.search_pages:
             return  # Игнорируем устаревшие результаты
 
-        self.mods_data = mods
-        self.current_page = 1
-        self.hide_loading_indicator()
-        self.update_page()
+        if page == 1 and self.search_key is not None:
+            self.last_search = (*self.search_key, mods)
+        self.show_page(page, mods)
 
-    def handle_search_error(self, error_message):
+    def handle_search_error(self, pages: SearchPages, page: int, error_message: str):
         """Обрабатывает ошибки поиска"""
+        if pages is not self.search_pages:
+            return  # Ошибка устаревшего запроса
+        self.mods_model.fetch_failed()
+        self.pending_scroll_row = None
+        if self.search_key is None:
+            self.show_loading_indicator(f'Ошибка загрузки: {error_message}')
+            QTimer.singleShot(5000, self.hide_loading_indicator)
+            logging.error(f'Ошибка загрузки популярных модов: {error_message}')
+            return
         self.hide_loading_indicator()
         QMessageBox.critical(
             self,
@@ -441,80 +483,69 @@ class ModsTab(QWidget):
             f'Не удалось выполнить поиск: {error_message}',
         )
 
+    def show_page(self, page: int, mods: list[dict[str, Any]]):
+        """Добавляет загруженную страницу в список и заранее подгружает следующую"""
+        self.hide_loading_indicator()
+        total = self.search_pages.total_hits or 0
+        if page == 1:
+            self.mods_model.reset(mods, total, loaded_pages=1)
+            if not mods:
+                self.show_no_results_message()
+        else:
+            self.mods_model.append_page(mods, total)
+        self.search_pages.prefetch(page + 1)
+
+        if self.pending_scroll_row is not None and self.pending_scroll_row < self.mods_model.rowCount():
+            self.scroll_to_row(self.pending_scroll_row)
+        self.update_page_label()
+
+    def update_page_label(self):
+        """Номер страницы считается по верхней видимой карточке"""
+        self.total_pages = self.search_pages.total_pages if self.search_pages else 1
+        row = self.mods_view.indexAt(self.mods_view.viewport().rect().topLeft()).row()
+        scroll_bar = self.mods_view.verticalScrollBar()
+        if scroll_bar.maximum() > 0 and scroll_bar.value() == scroll_bar.maximum():
+            row = self.mods_model.rowCount() - 1
+        self.current_page = max(row, 0) // PAGE_SIZE + 1
+        self.page_label.setText(f'Страница {self.current_page} из {self.total_pages}')
+        self.prev_page_button.setEnabled(self.current_page > 1)
+        self.next_page_button.setEnabled(self.current_page < self.total_pages)
+
+    def scroll_to_row(self, row: int):
+        """Прокручивает список к строке, догружая её страницу при необходимости"""
+        if row < self.mods_model.rowCount():
+            self.pending_scroll_row = None
+            self.mods_view.scrollTo(self.mods_model.index(row), ModListView.ScrollHint.PositionAtTop)
+            return
+        self.pending_scroll_row = row
+        self.mods_model.fetchMore(QModelIndex())
+
     def prev_page(self):
         """Переход на предыдущую страницу"""
         if self.current_page > 1:
-            self.current_page -= 1
-            self.update_page()
+            self.scroll_to_row((self.current_page - 2) * PAGE_SIZE)
 
     def next_page(self):
         """Переход на следующую страницу"""
         if self.current_page < self.total_pages:
-            self.current_page += 1
-            self.update_page()
+            self.scroll_to_row(self.current_page * PAGE_SIZE)
 
-    def show_loading_indicator(self):
+    def show_loading_indicator(self, text: str = 'Загрузка...'):
         """Показывает индикатор загрузки"""
-        self.loading_label = QLabel('Загрузка...')
-        self.loading_label.setAlignment(Qt.AlignCenter)
-        self.loading_label.setStyleSheet("""
-            QLabel {
-                color: #aaaaaa;
-                font-size: 16px;
-                padding: 20px;
-            }
-        """)
-        self.mods_layout.addWidget(self.loading_label)
+        self.status_label.setText(text)
+        self.status_label.setVisible(True)
 
     def hide_loading_indicator(self):
         """Скрывает индикатор загрузки"""
-        if hasattr(self, 'loading_label'):
-            self.loading_label.deleteLater()
+        self.status_label.setVisible(False)
 
     def show_no_results_message(self):
         """Показывает сообщение об отсутствии результатов"""
-        no_results_label = QLabel('Ничего не найдено')
-        no_results_label.setAlignment(Qt.AlignCenter)
-        no_results_label.setStyleSheet("""
-            QLabel {
-                color: #aaaaaa;
-                font-size: 16px;
-                padding: 20px;
-            }
-        """)
-        self.mods_layout.addWidget(no_results_label)
-
-    def update_page(self):
-        """Обновляет отображение текущей страницы с модами"""
-        # Очищаем текущие карточки
-        while self.mods_layout.count():
-            item = self.mods_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-
-        # Если нет данных, показываем сообщение
-        if not self.mods_data:
-            self.show_no_results_message()
-            return
-
-        # Обновляем информацию о странице
-        self.total_pages = (len(self.mods_data) + 9) // 10  # Округляем вверх
-        self.page_label.setText(f'Страница {self.current_page} из {self.total_pages}')
-        self.prev_page_button.setEnabled(self.current_page > 1)
-        self.next_page_button.setEnabled(self.current_page < self.total_pages)
-
-        # Добавляем карточки для текущей страницы
-        start = (self.current_page - 1) * 10
-        end = min(start + 10, len(self.mods_data))
-        for mod in self.mods_data[start:end]:
-            self.mods_layout.addWidget(self.create_mod_card(mod))
-
-        # Добавляем растягивающийся элемент
-        self.mods_layout.addStretch()
+        self.show_loading_indicator('Ничего не найдено')
 
     def load_minecraft_versions(self):
         """Загружает и обрабатывает список версий Minecraft"""
-        self.minecraft_versions = MINECRAFT_VERSIONS[::-1]
+        self.minecraft_versions = get_minecraft_versions()[::-1]
 
         # Настраиваем слайдер
         if self.minecraft_versions:
@@ -535,31 +566,100 @@ class ModsTab(QWidget):
             return self.minecraft_versions[self.version_slider.value()]
         return None
 
+    def check_mod_updates(self):
+        """Ищет обновления модов, установленных для выбранной версии"""
+        version = self.get_selected_version()
+        if not version:
+            QMessageBox.warning(self, 'Ошибка', 'Выберите версию Minecraft')
+            return
+        loader = self.loader_combo.currentText()
+
+        self.update_button.setEnabled(False)
+        self.update_button.setText('Проверка...')
+        self.update_thread = ModUpdateCheckThread(
+            os.path.join(MODS_DIR, version),
+            version,
+            None if loader == 'Любой' else loader,
+        )
+        self.update_thread.updates_found.connect(self.handle_updates_found)
+        self.update_thread.error_occurred.connect(self.handle_update_error)
+        self.update_thread.start()
+
+    def handle_updates_found(self, updates: list[ModUpdate]):
+        self.reset_update_button()
+        if not updates:
+            QMessageBox.information(self, 'Обновления', 'Все моды обновлены')
+            return
+
+        lines = [f'{update.name}: {update.latest.get("version_number", "")}' for update in updates[:20]]
+        if len(updates) > 20:
+            lines.append(f'... и ещё {len(updates) - 20}')
+        answer = QMessageBox.question(
+            self,
+            'Обновления',
+            f'Доступны обновления ({len(updates)}):\n' + '\n'.join(lines) + '\n\nОбновить все?',
+        )
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+
+        self.update_button.setEnabled(False)
+        self.update_button.setText('Обновление...')
+        self.update_thread = ModUpdateApplyThread(updates)
+        self.update_thread.progress_signal.connect(self.handle_update_progress)
+        self.update_thread.updates_applied.connect(self.handle_updates_applied)
+        self.update_thread.error_occurred.connect(self.handle_update_error)
+        self.update_thread.start()
+
+    def handle_update_progress(self, downloaded: int, total: int):
+        if total:
+            self.update_button.setText(f'Обновление... {downloaded * 100 // total}%')
+
+    def handle_updates_applied(self, count: int):
+        self.reset_update_button()
+        QMessageBox.information(self, 'Обновления', f'Обновлено модов: {count}')
+
+    def handle_update_error(self, error_message: str):
+        self.reset_update_button()
+        logging.error(f'Ошибка обновления модов: {error_message}')
+        QMessageBox.critical(self, 'Ошибка', f'Не удалось обновить моды: {error_message}')
+
+    def reset_update_button(self):
+        self.update_button.setEnabled(True)
+        self.update_button.setText('Проверить обновления')
+
     def install_modrinth_mod(self, mod_id):
-        """Устанавливает мод с Modrinth"""
-        try:
-            # Получаем выбранную версию Minecraft
-            version = self.get_selected_version()
-            if not version:
-                QMessageBox.warning(self, 'Ошибка', 'Выберите версию Minecraft')
-                return
-
-            # Показываем индикатор загрузки
-            self.show_loading_indicator()
-
-            # Устанавливаем мод
-            success, message = ModManager.download_modrinth_mod(mod_id, version)
-
-            # Скрываем индикатор загрузки
-            self.hide_loading_indicator()
-
-            # Показываем результат
-            if success:
-                QMessageBox.information(self, 'Успех', message)
-            else:
-                QMessageBox.critical(self, 'Ошибка', message)
-
-        except Exception as e:
-            self.hide_loading_indicator()
-            QMessageBox.critical(self, 'Ошибка', f'Не удалось установить мод: {e!s}')
-            logging.exception(f'Ошибка установки мода: {e!s}')
+        """Ставит мод с Modrinth в очередь установки"""
+        self.install_mods([mod_id])
+
+    def install_selected_mods(self):
+        project_ids = [
+            mod['project_id']
+            for mod in (index.data(ModRole) for index in self.mods_view.selectionModel().selectedIndexes())
+            if mod and mod.get('project_id')
+        ]
+        self.install_mods(project_ids)
+        self.mods_view.clearSelection()
+
+    def install_mods(self, project_ids: list[str]):
+        """Добавляет моды в очередь, установка идёт в фоне и не блокирует интерфейс"""
+        version = self.get_selected_version()
+        if not version:
+            QMessageBox.warning(self, 'Ошибка', 'Выберите версию Minecraft')
+            return
+        loader = self.loader_combo.currentText()
+        for project_id in project_ids:
+            mod = self.mods_model.find_mod(project_id) or {}
+            mod_install_queue.enqueue(
+                project_id,
+                mod.get('title') or project_id,
+                version,
+                None if loader == 'Любой' else loader,
+            )
+
+    def on_install_job_changed(self, job: InstallJob):
+        self.mods_model.set_install_state(job.project_id, INSTALL_STATES[job.state])
+
+    def update_install_selected_button(self):
+        count = len(self.mods_view.selectionModel().selectedIndexes())
+        self.install_selected_button.setEnabled(count > 0)
+        self.install_selected_button.setText(f'Установить выбранные ({count})' if count else 'Установить выбранные')
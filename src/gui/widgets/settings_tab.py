@@ -21,6 +21,7 @@ from PyQt5.QtWidgets import (
 )
 
 from config import MINECRAFT_DIR, MODS_DIR
+from mod_catalog import mod_catalog
 from util import load_settings, resource_path, save_settings
 
 
@@ -329,6 +330,21 @@ class SettingsTab(QWidget):
         versions_layout.addWidget(self.show_snapshots_checkbox)
         settings_layout.addWidget(versions_card)
 
+        # Каталог модов
+        catalog_card = QWidget()
+        catalog_card.setStyleSheet(card_style)
+        catalog_layout = QVBoxLayout(catalog_card)
+        catalog_layout.setSpacing(7)
+        catalog_header = QLabel('Поиск модов')
+        catalog_header.setStyleSheet(header_style)
+        catalog_layout.addWidget(catalog_header)
+        self.mod_catalog_checkbox = QCheckBox('Локальный каталог модов (быстрый поиск без интернета)')
+        self.mod_catalog_checkbox.setStyleSheet(self.show_snapshots_checkbox.styleSheet())
+        self.mod_catalog_checkbox.setChecked(mod_catalog.enabled)
+        self.mod_catalog_checkbox.stateChanged.connect(self.toggle_mod_catalog)
+        catalog_layout.addWidget(self.mod_catalog_checkbox)
+        settings_layout.addWidget(catalog_card)
+
         # Аккаунт Ely.by
         if hasattr(self.parent_window, 'ely_session') and self.parent_window.ely_session:
             ely_card = QWidget()
@@ -506,6 +522,13 @@ class SettingsTab(QWidget):
         # Принудительно обновляем layout
         self.layout().update()
 
+    def toggle_mod_catalog(self, state):
+        """Включает локальный каталог, первая синхронизация идёт в фоне"""
+        mod_catalog.enabled = bool(state)
+        self.parent_window.settings['mod_catalog'] = mod_catalog.enabled
+        if mod_catalog.enabled:
+            mod_catalog.sync_in_background()
+
     def choose_directory(self):
         try:
             directory = QFileDialog.getExistingDirectory(
@@ -0,0 +1,82 @@
+import threading
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import USER_AGENT
+
+# (connect, read) в секундах
+DEFAULT_TIMEOUT = (5, 30)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+CHUNK_SIZE = 16 * 1024
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+def _create_session() -> requests.Session:
+    """Сессия с пулом keep-alive соединений и повторами с backoff"""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """Возвращает общую сессию для хоста из URL"""
+    host = urlsplit(url).netloc.lower()
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _sessions[host] = _create_session()
+        return session
+
+
+def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+    return get_session(url).request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request('POST', url, **kwargs)
+
+
+def put(url: str, **kwargs: Any) -> requests.Response:
+    return request('PUT', url, **kwargs)
+
+
+def delete(url: str, **kwargs: Any) -> requests.Response:
+    return request('DELETE', url, **kwargs)
+
+
+def read_text(response: requests.Response, cancel_event: threading.Event | None = None) -> str:
+    """Читает тело ответа кусками, прерываясь, как только выставлен cancel_event"""
+    if cancel_event is None:
+        return response.text
+    chunks = []
+    for chunk in response.iter_content(CHUNK_SIZE):
+        if cancel_event.is_set():
+            response.close()
+            raise RequestCancelled(response.url)
+        chunks.append(chunk)
+    return b''.join(chunks).decode(response.encoding or 'utf-8', errors='replace')
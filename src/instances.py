@@ -0,0 +1,226 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from typing import Any
+
+from config import INSTANCES_DIR, MODS_DIR
+from flow import dedicate
+from mod_store import reflink
+from modpack_repository import PACK_REMOVED, PACK_UPDATED, modpack_repository
+
+# Папки игры, которые у каждой сборки свои
+INSTANCE_DIRS = ('mods', 'config', 'saves', 'resourcepacks')
+# Эти файлы игра только читает, поэтому их можно делить между сборками жёсткими ссылками
+READ_ONLY_EXTENSIONS = ('.jar', '.zip')
+
+
+def clone_file(src: str, dest: str, use_reflink: bool = True) -> str:
+    """
+    Копирует файл без копирования данных, где это возможно.
+    Файлы, которые игра может изменить, делят данные с оригиналом только через reflink:
+    файловая система сама разделит их при первой записи, а жёсткую ссылку игра изменила бы в обеих сборках.
+    :return: использованный способ ('hardlink', 'reflink', 'copy')
+    """
+    tmp_path = f'{dest}.{threading.get_ident()}.tmp'
+    if src.lower().endswith(READ_ONLY_EXTENSIONS):
+        try:
+            os.link(src, tmp_path)
+            os.replace(tmp_path, dest)
+            return 'hardlink'
+        except OSError:
+            pass
+    method = 'reflink'
+    try:
+        if not use_reflink:
+            raise OSError('reflink не поддерживается')
+        reflink(src, tmp_path)
+    except OSError:
+        method = 'copy'
+        shutil.copyfile(src, tmp_path)
+    shutil.copystat(src, tmp_path)
+    os.replace(tmp_path, dest)
+    return method
+
+
+def _same_file(src: str, dest: str) -> bool:
+    try:
+        src_stat = os.stat(src)
+        dest_stat = os.stat(dest)
+    except OSError:
+        return False
+    return os.path.samestat(src_stat, dest_stat) or (src_stat.st_size, src_stat.st_mtime_ns) == (dest_stat.st_size, dest_stat.st_mtime_ns)
+
+
+def _merge_tree(src_root: str, dst_root: str, overwrite: bool = False) -> None:
+    """Переносит файлы из src_root в dst_root, существующие заменяются только при overwrite"""
+    for dirpath, _, filenames in os.walk(src_root):
+        target_dir = os.path.join(dst_root, os.path.relpath(dirpath, src_root))
+        os.makedirs(target_dir, exist_ok=True)
+        for name in filenames:
+            target = os.path.join(target_dir, name)
+            if overwrite or not os.path.exists(target):
+                os.replace(os.path.join(dirpath, name), target)
+
+
+class InstanceManager:
+    """
+    Отдельные папки игры для сборок: моды, настройки, миры и ресурспаки.
+    Папка создаётся при первом обращении, а копия сборки делит файлы с оригиналом,
+    поэтому копирование занимает миллисекунды и почти не тратит место на диске.
+    """
+
+    def __init__(self, root: str = INSTANCES_DIR) -> None:
+        self.root = root
+        self._locks_guard = threading.Lock()
+        # Блокировка на каждую сборку: долгое копирование одной не мешает работать с остальными
+        self._locks: dict[str, threading.Lock] = {}
+
+    def path(self, pack_id: str) -> str:
+        return os.path.join(self.root, pack_id)
+
+    def exists(self, pack_id: str) -> bool:
+        return os.path.isdir(self.path(pack_id))
+
+    def ensure(self, pack: dict[str, Any]) -> str:
+        """Папка сборки с актуальным набором модов"""
+        with self._lock(pack['id']):
+            path = self.path(pack['id'])
+            for name in INSTANCE_DIRS:
+                os.makedirs(os.path.join(path, name), exist_ok=True)
+            added = self._sync_mods(pack)
+        self._add_to_pack(pack['id'], added)
+        return path
+
+    def saves(self, pack_id: str) -> list[str]:
+        """Миры, сохранённые в папке сборки"""
+        saves_dir = os.path.join(self.path(pack_id), 'saves')
+        if not os.path.isdir(saves_dir):
+            return []
+        return sorted(entry.name for entry in os.scandir(saves_dir) if entry.is_dir())
+
+    def stage(self) -> str:
+        """Временная папка для файлов игры сборки, у которой ещё нет ID; удаляет её вызывающий"""
+        os.makedirs(self.root, exist_ok=True)
+        return tempfile.mkdtemp(prefix='.staging-', dir=self.root)
+
+    def apply_staged(self, pack_id: str, staging_dir: str) -> None:
+        """Переносит файлы из временной папки в папку сборки, одноимённые файлы заменяются"""
+        with self._lock(pack_id):
+            _merge_tree(staging_dir, self.path(pack_id), overwrite=True)
+
+    def clone(self, src_id: str, dst_id: str) -> int:
+        """
+        Копирует папку сборки src_id в папку dst_id.
+        Файлы копируются во временную папку без блокировок, под блокировкой dst_id она только переносится на место.
+        :return: число скопированных файлов (0, если у исходной сборки ещё нет папки)
+        """
+        src_root = self.path(src_id)
+        if not os.path.isdir(src_root):
+            return 0
+        os.makedirs(self.root, exist_ok=True)
+        tmp_root = tempfile.mkdtemp(prefix=f'.{dst_id}-', dir=self.root)
+        try:
+            methods = self._copy_tree(src_root, tmp_root)
+            with self._lock(dst_id):
+                pack = modpack_repository.get(dst_id)
+                if pack is None:
+                    # Сборку удалили, пока шло копирование
+                    return 0
+                dst_root = self.path(dst_id)
+                if os.path.isdir(dst_root):
+                    # Папку успели создать (например, открыли её) - добавляем только недостающие файлы
+                    _merge_tree(tmp_root, dst_root)
+                else:
+                    os.replace(tmp_root, dst_root)
+                added = self._sync_mods(pack)
+        finally:
+            shutil.rmtree(tmp_root, ignore_errors=True)
+        self._add_to_pack(dst_id, added)
+        logging.info(f'Папка сборки {src_id} скопирована в {dst_id}: {dict(methods)}')
+        return sum(methods.values())
+
+    def delete(self, pack_id: str) -> None:
+        """Удаляет папку сборки в фоне"""
+        dedicate(self._delete, pack_id)
+
+    def on_pack_changed(self, change: str, pack_id: str, pack: dict[str, Any] | None) -> None:
+        if change == PACK_REMOVED:
+            self.delete(pack_id)
+        elif change == PACK_UPDATED and self.exists(pack_id):
+            with self._lock(pack_id):
+                added = self._sync_mods(pack)
+            self._add_to_pack(pack_id, added)
+
+    def _lock(self, pack_id: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(pack_id, threading.Lock())
+
+    def _delete(self, pack_id: str) -> None:
+        with self._lock(pack_id):
+            shutil.rmtree(self.path(pack_id), ignore_errors=True)
+
+    @staticmethod
+    def _copy_tree(src_root: str, dst_root: str) -> Counter[str]:
+        methods: Counter[str] = Counter()
+        use_reflink = True
+        for dirpath, _, filenames in os.walk(src_root):
+            target_dir = os.path.join(dst_root, os.path.relpath(dirpath, src_root))
+            os.makedirs(target_dir, exist_ok=True)
+            for name in filenames:
+                try:
+                    method = clone_file(os.path.join(dirpath, name), os.path.join(target_dir, name), use_reflink)
+                except FileNotFoundError:
+                    # Исходную сборку меняют во время копирования
+                    continue
+                # Если файловая система не умеет reflink, не пробуем его для каждого файла
+                use_reflink = use_reflink and method != 'copy'
+                methods[method] += 1
+        return methods
+
+    @staticmethod
+    def _add_to_pack(pack_id: str, names: list[str]) -> None:
+        """Дописывает в сборку моды, которые положили прямо в её папку; вызывается без блокировки сборки"""
+        if not names:
+            return
+        pack = modpack_repository.get(pack_id)
+        if pack is None:
+            return
+        new_names = [name for name in names if name not in pack['mods']]
+        if new_names:
+            logging.info(f'В сборку {pack["name"]} добавлены моды из её папки: {new_names}')
+            modpack_repository.update(pack_id, {**pack, 'mods': [*pack['mods'], *new_names]})
+
+    def _sync_mods(self, pack: dict[str, Any]) -> list[str]:
+        """
+        Вызывается под блокировкой сборки.
+        Папка mods сборки повторяет список модов: недостающие берутся из папки версии,
+        а jar, которых в списке нет, копируются в папку версии, чтобы их добавили в сборку.
+        :return: имена модов, которые нужно добавить в сборку
+        """
+        mods_dir = os.path.join(self.path(pack['id']), 'mods')
+        library_dir = os.path.join(MODS_DIR, pack['version'])
+        wanted = set(pack['mods'])
+        added = []
+        os.makedirs(mods_dir, exist_ok=True)
+        for entry in os.scandir(mods_dir):
+            if entry.is_file() and entry.name.endswith(READ_ONLY_EXTENSIONS) and entry.name not in wanted:
+                os.makedirs(library_dir, exist_ok=True)
+                library_path = os.path.join(library_dir, entry.name)
+                if not os.path.exists(library_path):
+                    clone_file(entry.path, library_path)
+                added.append(entry.name)
+        for name in pack['mods']:
+            src = os.path.join(library_dir, name)
+            dest = os.path.join(mods_dir, name)
+            if not os.path.exists(src):
+                logging.warning(f'Мод {name} сборки {pack["name"]} отсутствует в {library_dir}')
+            elif not _same_file(src, dest):
+                clone_file(src, dest)
+        return added
+
+
+instance_manager = InstanceManager()
+modpack_repository.subscribe(instance_manager.on_pack_changed)
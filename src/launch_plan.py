@@ -0,0 +1,140 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from minecraft_launcher_lib.command import get_minecraft_command
+
+from config import LAUNCH_PLAN_CACHE_PATH, MINECRAFT_DIR
+
+# Значения, которые меняются от запуска к запуску: в сохранённой команде вместо них метки
+PLACEHOLDERS = {
+    'username': '${16launcher_username}',
+    'uuid': '${16launcher_uuid}',
+    'token': '${16launcher_token}',
+}
+# Версию загрузчика для Forge/Fabric/Quilt иногда стоит перепроверить, даже если файлы не менялись
+LOADER_PLAN_TTL = 24 * 60 * 60
+
+
+@dataclass
+class LaunchPlan:
+    launch_version: str
+    # Команда запуска с метками из PLACEHOLDERS
+    command: list[str]
+    # Путь -> [размер, время изменения] или None, если файла не было
+    files: dict[str, list[int] | None]
+    created_at: float
+
+    def render(self, options: dict[str, Any]) -> list[str]:
+        """Команда запуска с подставленными данными текущей сессии"""
+        values = {placeholder: str(options.get(name, '')) for name, placeholder in PLACEHOLDERS.items()}
+        command = []
+        for arg in self.command:
+            for placeholder, value in values.items():
+                arg = arg.replace(placeholder, value)
+            command.append(arg)
+        return command
+
+
+def _file_state(path: str) -> list[int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _version_files(launch_version: str) -> dict[str, list[int] | None]:
+    """JSON версии и всех версий, от которых она наследуется, и папка Java, выбранной для неё"""
+    files: dict[str, list[int] | None] = {}
+    version: str | None = launch_version
+    java_component = None
+    while version and len(files) < 10:
+        path = os.path.join(MINECRAFT_DIR, 'versions', version, f'{version}.json')
+        files[path] = _file_state(path)
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            break
+        java_component = java_component or data.get('javaVersion', {}).get('component')
+        version = data.get('inheritsFrom')
+    if java_component:
+        runtime_dir = os.path.join(MINECRAFT_DIR, 'runtime', java_component)
+        files[runtime_dir] = _file_state(runtime_dir)
+    return files
+
+
+class LaunchPlanCache:
+    """
+    Готовые команды запуска: повторный запуск той же версии с теми же настройками
+    не перечитывает цепочку JSON версий и не собирает classpath заново.
+    """
+
+    def __init__(self, path: str = LAUNCH_PLAN_CACHE_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS launch_plans (
+                    key TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+                """,
+            )
+        return self._db
+
+    @staticmethod
+    def make_key(version_id: str, loader_type: str, options: dict[str, Any]) -> str:
+        stable_options = {name: value for name, value in options.items() if name not in PLACEHOLDERS}
+        raw = json.dumps([MINECRAFT_DIR, version_id, loader_type, stable_options], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, version_id: str, loader_type: str, options: dict[str, Any]) -> LaunchPlan | None:
+        """Сохранённый план, если ни один из файлов, от которых он зависит, не изменился"""
+        key = self.make_key(version_id, loader_type, options)
+        with self._lock:
+            row = self._connect().execute('SELECT data FROM launch_plans WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        plan = LaunchPlan(**json.loads(row[0]))
+        if loader_type != 'vanilla' and time.time() - plan.created_at > LOADER_PLAN_TTL:
+            return None
+        changed = [path for path, state in plan.files.items() if _file_state(path) != state]
+        if changed:
+            logging.debug(f'План запуска {plan.launch_version} устарел: изменились {changed}')
+            return None
+        return plan
+
+    def build(self, version_id: str, loader_type: str, launch_version: str, options: dict[str, Any]) -> LaunchPlan:
+        """Собирает команду запуска установленной версии и запоминает её"""
+        files = _version_files(launch_version)
+        command = get_minecraft_command(
+            version=launch_version,
+            minecraft_directory=MINECRAFT_DIR,
+            options={**options, **PLACEHOLDERS},
+        )
+        plan = LaunchPlan(launch_version, command, files, time.time())
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute(
+                    'INSERT OR REPLACE INTO launch_plans VALUES (?, ?)',
+                    (self.make_key(version_id, loader_type, options), json.dumps(asdict(plan))),
+                )
+        return plan
+
+
+launch_plans = LaunchPlanCache()
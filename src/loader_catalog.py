@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Any, Callable, NamedTuple
+
+import http_client
+from config import LOADER_CATALOG_PATH
+from flow import dedicate
+
+# Списки версий загрузчиков меняются редко; устаревший список всё равно отдаётся сразу
+LOADER_CATALOG_TTL = 6 * 60 * 60
+# Ключ индекса для сборок, которые подходят к любой версии Minecraft (Fabric, Quilt)
+ANY_MC_VERSION = '*'
+# Без сети не пытаемся обновить список при каждом обращении
+RETRY_DELAY = 5 * 60
+
+FORGE_METADATA_URL = 'https://maven.minecraftforge.net/net/minecraftforge/forge/maven-metadata.xml'
+FABRIC_LOADERS_URL = 'https://meta.fabricmc.net/v2/versions/loader'
+QUILT_LOADERS_URL = 'https://meta.quiltmc.org/v3/versions/loader'
+NEOFORGE_VERSIONS_URL = 'https://maven.neoforged.net/api/maven/versions/releases/net.neoforged/neoforge'
+
+
+class LoaderBuild(NamedTuple):
+    version: str
+    stable: bool
+
+
+# Версия Minecraft -> сборки загрузчика, от новых к старым
+LoaderIndex = dict[str, list[LoaderBuild]]
+
+
+def _add(index: LoaderIndex, mc_version: str, build: LoaderBuild) -> None:
+    index.setdefault(mc_version, []).append(build)
+
+
+def _fetch_forge() -> LoaderIndex:
+    """Версии Forge вида 1.20.1-47.2.0, в maven-metadata они идут от новых к старым"""
+    response = http_client.get(FORGE_METADATA_URL, timeout=(5, 15))
+    response.raise_for_status()
+    index: LoaderIndex = {}
+    for element in ET.fromstring(response.content).iterfind('./versioning/versions/version'):
+        version = (element.text or '').strip()
+        if '-' in version:
+            _add(index, version.split('-')[0], LoaderBuild(version, True))
+    return index
+
+
+def _fetch_fabric() -> LoaderIndex:
+    response = http_client.get(FABRIC_LOADERS_URL, timeout=(5, 15))
+    response.raise_for_status()
+    return {ANY_MC_VERSION: [LoaderBuild(loader['version'], loader.get('stable', True)) for loader in response.json()]}
+
+
+def _fetch_quilt() -> LoaderIndex:
+    response = http_client.get(QUILT_LOADERS_URL, timeout=(5, 15))
+    response.raise_for_status()
+    return {
+        ANY_MC_VERSION: [
+            LoaderBuild(loader['version'], not any(tag in loader['version'] for tag in ('beta', 'pre', 'rc'))) for loader in response.json()
+        ],
+    }
+
+
+def neoforge_mc_version(version: str) -> str | None:
+    """20.4.80-beta -> 1.20.4, 21.0.10 -> 1.21"""
+    parts = version.split('-')[0].split('.')
+    if len(parts) < 3 or not parts[0].isdigit() or not parts[1].isdigit():
+        return None
+    return f'1.{parts[0]}' if parts[1] == '0' else f'1.{parts[0]}.{parts[1]}'
+
+
+def _fetch_neoforge() -> LoaderIndex:
+    """Maven API NeoForge отдаёт версии от старых к новым"""
+    response = http_client.get(NEOFORGE_VERSIONS_URL, timeout=(5, 15))
+    response.raise_for_status()
+    index: LoaderIndex = {}
+    for version in reversed(response.json()['versions']):
+        mc_version = neoforge_mc_version(version)
+        if mc_version:
+            _add(index, mc_version, LoaderBuild(version, 'beta' not in version))
+    return index
+
+
+FETCHERS: dict[str, Callable[[], LoaderIndex]] = {
+    'forge': _fetch_forge,
+    'fabric': _fetch_fabric,
+    'quilt': _fetch_quilt,
+    'neoforge': _fetch_neoforge,
+}
+
+
+class LoaderCatalog:
+    """
+    Версии Forge, Fabric, Quilt и NeoForge, разложенные по версиям Minecraft.
+    Метаданные каждого загрузчика скачиваются один раз и хранятся на диске;
+    после TTL список обновляется в фоне, а без сети используется сохранённый.
+    """
+
+    def __init__(self, path: str = LOADER_CATALOG_PATH, ttl: int = LOADER_CATALOG_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._fetch_locks = {loader: threading.Lock() for loader in FETCHERS}
+        self._data: dict[str, dict[str, Any]] | None = None
+        self._refreshing: set[str] = set()
+        self._failed_at: dict[str, float] = {}
+        self._save_lock = threading.Lock()
+
+    def versions(self, loader: str, mc_version: str) -> list[LoaderBuild]:
+        """Сборки загрузчика для версии Minecraft, от новых к старым"""
+        index = self._index(loader)
+        return index.get(mc_version) or index.get(ANY_MC_VERSION, [])
+
+    def latest(self, loader: str, mc_version: str, stable_only: bool = False) -> str | None:
+        for build in self.versions(loader, mc_version):
+            if build.stable or not stable_only:
+                return build.version
+        return None
+
+    def refresh(self, loader: str) -> LoaderIndex | None:
+        """Скачивает метаданные загрузчика заново; при ошибке сети остаётся прежний список"""
+        with self._fetch_locks[loader]:
+            return self._fetch(loader)
+
+    def _fetch(self, loader: str) -> LoaderIndex | None:
+        try:
+            index = FETCHERS[loader]()
+        except Exception as e:
+            logging.warning(f'Не удалось обновить список версий {loader}: {e}')
+            self._failed_at[loader] = time.time()
+            return None
+        finally:
+            with self._lock:
+                self._refreshing.discard(loader)
+        with self._lock:
+            data = self._load()
+            data[loader] = {'fetched_at': time.time(), 'index': index}
+            snapshot = dict(data)
+        with self._save_lock:
+            self._save_to_disk(snapshot)
+        logging.debug(f'Список версий {loader} обновлён: {sum(map(len, index.values()))} сборок')
+        return index
+
+    def _index(self, loader: str) -> LoaderIndex:
+        if loader not in FETCHERS:
+            raise ValueError(f'Неизвестный загрузчик: {loader}')
+        with self._lock:
+            entry = self._load().get(loader)
+        if entry is None:
+            # Списка ещё нет ни в памяти, ни на диске - единственный случай, когда ждём сеть
+            with self._fetch_locks[loader]:
+                with self._lock:
+                    entry = self._load().get(loader)
+                    failed_recently = time.time() - self._failed_at.get(loader, 0) < RETRY_DELAY
+                if entry is None:
+                    # Без сети пустой список отдаётся сразу, новая попытка - не раньше чем через RETRY_DELAY
+                    return {} if failed_recently else self._fetch(loader) or {}
+        if time.time() - entry['fetched_at'] > self.ttl:
+            self._refresh_in_background(loader)
+        return entry['index']
+
+    def _refresh_in_background(self, loader: str) -> None:
+        with self._lock:
+            if loader in self._refreshing or time.time() - self._failed_at.get(loader, 0) < RETRY_DELAY:
+                return
+            self._refreshing.add(loader)
+        dedicate(self.refresh, loader)
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """Вызывается под self._lock"""
+        if self._data is None:
+            self._data = self._load_from_disk()
+        return self._data
+
+    def _load_from_disk(self) -> dict[str, dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+            return {
+                loader: {
+                    'fetched_at': entry['fetched_at'],
+                    'index': {mc_version: [LoaderBuild(*build) for build in builds] for mc_version, builds in entry['index'].items()},
+                }
+                for loader, entry in saved.items()
+                if loader in FETCHERS
+            }
+        except Exception as e:
+            logging.exception(f'Ошибка чтения списка версий загрузчиков: {e}')
+            return {}
+
+    def _save_to_disk(self, data: dict[str, dict[str, Any]]) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.exception(f'Ошибка сохранения списка версий загрузчиков: {e}')
+
+
+loader_catalog = LoaderCatalog()
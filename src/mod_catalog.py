@@ -0,0 +1,280 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable
+
+import http_client
+from config import MOD_CATALOG_PATH
+from flow import dedicate
+
+MODRINTH_SEARCH_URL = 'https://api.modrinth.com/v2/search'
+SYNC_PAGE_SIZE = 100
+# Modrinth не отдаёт результаты поиска дальше этого смещения
+MAX_SYNC_PROJECTS = 10_000
+# Каталог старше этого считается устаревшим и не используется для поиска
+MAX_CATALOG_AGE = 24 * 60 * 60
+# Раз в неделю каталог перекачивается целиком, чтобы обновить число загрузок
+FULL_SYNC_INTERVAL = 7 * 24 * 60 * 60
+
+ORDER_BY = {
+    'downloads': 'p.downloads DESC',
+    'newest': 'p.date_created DESC',
+    'updated': 'p.date_modified DESC',
+    'follows': 'p.follows DESC',
+}
+
+
+def fts_query(text: str) -> str:
+    """Превращает пользовательский ввод в запрос FTS5: каждое слово ищется по префиксу"""
+    tokens = [token.replace('"', '""') for token in text.split()]
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+class ModCatalog:
+    """
+    Локальная копия каталога модов Modrinth в SQLite с полнотекстовым индексом FTS5.
+    Позволяет искать моды без сети и без задержек на каждый запрос.
+    """
+
+    def __init__(self, path: str = MOD_CATALOG_PATH) -> None:
+        self.path = path
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._meta: dict[str, str] | None = None
+        self._sync_started = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS projects (
+                    project_id TEXT PRIMARY KEY,
+                    slug TEXT,
+                    title TEXT,
+                    description TEXT,
+                    downloads INTEGER NOT NULL DEFAULT 0,
+                    follows INTEGER NOT NULL DEFAULT 0,
+                    date_created TEXT,
+                    date_modified TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS projects_downloads ON projects (downloads);
+                CREATE TABLE IF NOT EXISTS project_versions (
+                    project_id TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    PRIMARY KEY (version, project_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS project_categories (
+                    project_id TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    PRIMARY KEY (category, project_id)
+                ) WITHOUT ROWID;
+                CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+                    project_id UNINDEXED,
+                    title,
+                    slug,
+                    description
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                """,
+            )
+        return self._db
+
+    def _get_meta(self) -> dict[str, str]:
+        with self._lock:
+            if self._meta is None:
+                self._meta = dict(self._connect().execute('SELECT key, value FROM meta').fetchall())
+            return self._meta
+
+    def has_data(self) -> bool:
+        return 'last_sync' in self._get_meta()
+
+    def is_fresh(self) -> bool:
+        """Каталог включён, заполнен и синхронизирован не позже MAX_CATALOG_AGE назад"""
+        if not self.enabled:
+            return False
+        last_sync = self._get_meta().get('last_sync')
+        return last_sync is not None and time.time() - float(last_sync) < MAX_CATALOG_AGE
+
+    def search(
+        self,
+        query: str,
+        version: str | None = None,
+        categories: Iterable[str] = (),
+        index: str = 'relevance',
+        offset: int = 0,
+        limit: int = 10,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Поиск в локальном каталоге с теми же фильтрами, что и /v2/search.
+        :return: (моды страницы в формате ответа Modrinth, всего найдено)
+        """
+        joins = []
+        where = []
+        params: list[Any] = []
+        match = fts_query(query)
+        if match:
+            joins.append('JOIN projects_fts f ON f.project_id = p.project_id')
+            where.append('projects_fts MATCH ?')
+            params.append(match)
+        if version:
+            where.append('EXISTS (SELECT 1 FROM project_versions v WHERE v.version = ? AND v.project_id = p.project_id)')
+            params.append(version)
+        for category in categories:
+            where.append(
+                'EXISTS (SELECT 1 FROM project_categories c WHERE c.category = ? AND c.project_id = p.project_id)',
+            )
+            params.append(category)
+
+        if index == 'relevance' and match:
+            # Вес совпадений: название важнее slug, slug важнее описания
+            order = 'bm25(projects_fts, 0.0, 10.0, 5.0, 1.0), p.downloads DESC'
+        else:
+            order = ORDER_BY.get(index, ORDER_BY['downloads'])
+
+        sql_from = f'FROM projects p {" ".join(joins)}'
+        sql_where = f'WHERE {" AND ".join(where)}' if where else ''
+        with self._lock:
+            db = self._connect()
+            total = db.execute(f'SELECT COUNT(*) {sql_from} {sql_where}', params).fetchone()[0]
+            rows = db.execute(
+                f'SELECT p.data {sql_from} {sql_where} ORDER BY {order} LIMIT ? OFFSET ?',
+                [*params, limit, offset],
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows], total
+
+    def sync_in_background(self) -> None:
+        """Один раз за сессию обновляет каталог в фоновом потоке"""
+        with self._lock:
+            if self._sync_started:
+                return
+            self._sync_started = True
+        dedicate(self.sync)
+
+    def sync(self, cancel_event: threading.Event | None = None) -> None:
+        """Полная синхронизация для пустого или давно обновлённого каталога, иначе инкрементальная"""
+        with self._sync_lock:
+            meta = self._get_meta()
+            last_full_sync = float(meta.get('last_full_sync', 0))
+            try:
+                if time.time() - last_full_sync > FULL_SYNC_INTERVAL:
+                    self._sync_full(cancel_event)
+                else:
+                    self._sync_incremental(meta.get('watermark', ''), cancel_event)
+            except Exception as e:
+                logging.warning(f'Не удалось синхронизировать каталог модов: {e}')
+
+    def _sync_full(self, cancel_event: threading.Event | None) -> None:
+        logging.info('Полная синхронизация каталога модов')
+        started = time.time()
+        watermark = ''
+        offset = 0
+        total = MAX_SYNC_PROJECTS
+        while offset < min(total, MAX_SYNC_PROJECTS):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            hits, total = self._fetch_page('downloads', offset)
+            if not hits:
+                break
+            self._upsert(hits)
+            watermark = max([watermark, *(hit.get('date_modified') or '' for hit in hits)])
+            offset += len(hits)
+
+        self._set_meta(last_full_sync=started, last_sync=started, watermark=watermark)
+        logging.info(f'Каталог модов синхронизирован: {offset} проектов')
+
+    def _sync_incremental(self, watermark: str, cancel_event: threading.Event | None) -> None:
+        """Забирает проекты, изменённые после последней синхронизации (сортировка по дате изменения)"""
+        started = time.time()
+        new_watermark = watermark
+        offset = 0
+        while offset < MAX_SYNC_PROJECTS:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            hits, _ = self._fetch_page('updated', offset)
+            changed = [hit for hit in hits if (hit.get('date_modified') or '') > watermark]
+            self._upsert(changed)
+            new_watermark = max([new_watermark, *(hit.get('date_modified') or '' for hit in changed)])
+            offset += len(hits)
+            if len(changed) < len(hits) or not hits:
+                break
+
+        self._set_meta(last_sync=started, watermark=new_watermark)
+        logging.debug(f'Каталог модов обновлён: {offset} проверено')
+
+    @staticmethod
+    def _fetch_page(index: str, offset: int) -> tuple[list[dict[str, Any]], int]:
+        response = http_client.get(
+            MODRINTH_SEARCH_URL,
+            params={
+                'facets': json.dumps([['project_type:mod']]),
+                'index': index,
+                'offset': offset,
+                'limit': SYNC_PAGE_SIZE,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        return data.get('hits', []), data.get('total_hits', 0)
+
+    def _upsert(self, hits: list[dict[str, Any]]) -> None:
+        if not hits:
+            return
+        ids = [(hit['project_id'],) for hit in hits]
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.executemany('DELETE FROM projects_fts WHERE project_id = ?', ids)
+                db.executemany('DELETE FROM project_versions WHERE project_id = ?', ids)
+                db.executemany('DELETE FROM project_categories WHERE project_id = ?', ids)
+                db.executemany(
+                    'INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (
+                            hit['project_id'],
+                            hit.get('slug'),
+                            hit.get('title'),
+                            hit.get('description'),
+                            hit.get('downloads', 0),
+                            hit.get('follows', 0),
+                            hit.get('date_created'),
+                            hit.get('date_modified'),
+                            json.dumps(hit),
+                        )
+                        for hit in hits
+                    ],
+                )
+                db.executemany(
+                    'INSERT INTO projects_fts VALUES (?, ?, ?, ?)',
+                    [(hit['project_id'], hit.get('title'), hit.get('slug'), hit.get('description')) for hit in hits],
+                )
+                db.executemany(
+                    'INSERT OR IGNORE INTO project_versions VALUES (?, ?)',
+                    [(hit['project_id'], version) for hit in hits for version in hit.get('versions', [])],
+                )
+                # Загрузчики (fabric, forge, ...) Modrinth тоже отдаёт в categories
+                db.executemany(
+                    'INSERT OR IGNORE INTO project_categories VALUES (?, ?)',
+                    [(hit['project_id'], category) for hit in hits for category in hit.get('categories', [])],
+                )
+
+    def _set_meta(self, **values: Any) -> None:
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', [(k, str(v)) for k, v in values.items()])
+            self._meta = None
+
+
+mod_catalog = ModCatalog()
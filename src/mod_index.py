@@ -0,0 +1,284 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import tomllib
+import zipfile
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from config import MOD_INDEX_PATH
+
+# Версия формата записей: при изменении парсеров все jar-файлы перечитываются
+INDEX_VERSION = 1
+# Зависимости, которые есть у любого мода и не интересны при поиске
+IMPLICIT_DEPENDENCIES = {'minecraft', 'java', 'fabricloader', 'fabric-loader', 'quilt_loader', 'forge', 'neoforge'}
+FORGE_TOMLS = (('META-INF/neoforge.mods.toml', 'neoforge'), ('META-INF/mods.toml', 'forge'))
+
+
+@dataclass
+class ModInfo:
+    path: str
+    mod_id: str | None = None
+    name: str | None = None
+    version: str | None = None
+    # fabric, quilt, forge, neoforge или None, если метаданных нет
+    loader: str | None = None
+    description: str | None = None
+    authors: list[str] = field(default_factory=list)
+    depends: list[str] = field(default_factory=list)
+
+    @property
+    def filename(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def display_name(self) -> str:
+        return self.name or self.mod_id or self.filename
+
+
+def _author_names(authors: Any) -> list[str]:
+    if isinstance(authors, str):
+        return [authors]
+    return [author if isinstance(author, str) else author.get('name', '') for author in authors or []]
+
+
+def _parse_fabric(data: dict[str, Any], info: ModInfo) -> None:
+    info.loader = 'fabric'
+    info.mod_id = data.get('id')
+    info.name = data.get('name')
+    info.version = data.get('version')
+    info.description = data.get('description')
+    info.authors = _author_names(data.get('authors'))
+    info.depends = list(data.get('depends') or {})
+
+
+def _parse_quilt(data: dict[str, Any], info: ModInfo) -> None:
+    loader = data.get('quilt_loader', {})
+    metadata = loader.get('metadata', {})
+    info.loader = 'quilt'
+    info.mod_id = loader.get('id')
+    info.version = loader.get('version')
+    info.name = metadata.get('name')
+    info.description = metadata.get('description')
+    info.authors = list(metadata.get('contributors') or {})
+    info.depends = []
+    for dep in loader.get('depends', []):
+        # Элемент может быть массивом альтернатив - записываем каждую из них
+        for option in dep if isinstance(dep, list) else [dep]:
+            info.depends.append(option.get('id') if isinstance(option, dict) else option)
+
+
+def _parse_forge_toml(data: dict[str, Any], loader: str, manifest_version: str | None, info: ModInfo) -> None:
+    mods = data.get('mods') or [{}]
+    mod = mods[0]
+    info.loader = loader
+    info.mod_id = mod.get('modId')
+    info.name = mod.get('displayName')
+    info.version = mod.get('version')
+    # ${file.jarVersion} подставляется из MANIFEST.MF при сборке мода
+    if info.version and '${' in info.version:
+        info.version = manifest_version
+    info.description = (mod.get('description') or '').strip() or None
+    info.authors = _author_names(mod.get('authors') or data.get('authors'))
+    dependencies = data.get('dependencies', {}).get(info.mod_id or '', [])
+    info.depends = [
+        dep['modId'] for dep in dependencies if dep.get('mandatory', dep.get('type', 'required') == 'required') and dep.get('modId')
+    ]
+
+
+def _parse_mcmod_info(data: Any, info: ModInfo) -> None:
+    mods = data.get('modList', []) if isinstance(data, dict) else data
+    if not mods:
+        return
+    mod = mods[0]
+    info.loader = 'forge'
+    info.mod_id = mod.get('modid')
+    info.name = mod.get('name')
+    info.version = mod.get('version')
+    info.description = mod.get('description')
+    info.authors = _author_names(mod.get('authorList') or mod.get('authors'))
+    info.depends = [re.split(r'[@:]', dep)[0] for dep in mod.get('requiredMods') or mod.get('dependencies') or []]
+
+
+def _manifest_version(jar: zipfile.ZipFile) -> str | None:
+    try:
+        manifest = jar.read('META-INF/MANIFEST.MF').decode('utf-8', errors='replace')
+    except KeyError:
+        return None
+    match = re.search(r'^Implementation-Version:\s*(\S+)', manifest, re.MULTILINE)
+    return match.group(1) if match else None
+
+
+def read_mod_info(path: str) -> ModInfo:
+    """Читает метаданные мода из jar (fabric.mod.json, quilt.mod.json, mods.toml, mcmod.info)"""
+    info = ModInfo(path)
+    try:
+        with zipfile.ZipFile(path) as jar:
+            names = set(jar.namelist())
+            if 'fabric.mod.json' in names:
+                # Встречаются файлы с переводами строк внутри строковых значений
+                _parse_fabric(json.loads(jar.read('fabric.mod.json'), strict=False), info)
+            elif 'quilt.mod.json' in names:
+                _parse_quilt(json.loads(jar.read('quilt.mod.json'), strict=False), info)
+            elif toml := next(((name, loader) for name, loader in FORGE_TOMLS if name in names), None):
+                data = tomllib.loads(jar.read(toml[0]).decode('utf-8', errors='replace'))
+                _parse_forge_toml(data, toml[1], _manifest_version(jar), info)
+            elif 'mcmod.info' in names:
+                _parse_mcmod_info(json.loads(jar.read('mcmod.info'), strict=False), info)
+    except (zipfile.BadZipFile, OSError, ValueError, tomllib.TOMLDecodeError) as e:
+        logging.warning(f'Не удалось прочитать метаданные {os.path.basename(path)}: {e}')
+    except (AttributeError, TypeError, KeyError) as e:
+        # Метаданные не по схеме не должны ломать сканирование всей папки
+        logging.warning(f'Некорректные метаданные {os.path.basename(path)}: {e!r}')
+    depends = [dep for dep in info.depends if isinstance(dep, str)] if isinstance(info.depends, list) else []
+    info.depends = [dep for dep in dict.fromkeys(depends) if dep and dep not in IMPLICIT_DEPENDENCIES]
+    return info
+
+
+class ModIndex:
+    """Индекс метаданных установленных модов, jar-файл перечитывается только после изменения"""
+
+    def __init__(self, path: str = MOD_INDEX_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS mods (
+                    path TEXT PRIMARY KEY,
+                    directory TEXT NOT NULL,
+                    inode INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    format INTEGER NOT NULL,
+                    mod_id TEXT,
+                    loader TEXT,
+                    data TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS mods_directory ON mods (directory);
+                CREATE INDEX IF NOT EXISTS mods_mod_id ON mods (mod_id);
+                CREATE TABLE IF NOT EXISTS mod_depends (
+                    path TEXT NOT NULL,
+                    depends_on TEXT NOT NULL,
+                    PRIMARY KEY (depends_on, path)
+                ) WITHOUT ROWID;
+                """,
+            )
+        return self._db
+
+    def scan(self, directory: str) -> list[ModInfo]:
+        """Обновляет индекс папки: новые и изменённые jar-файлы читаются, удалённые забываются"""
+        directory = os.path.abspath(directory)
+        current: dict[str, tuple[int, int, int]] = {}
+        if os.path.isdir(directory):
+            for entry in os.scandir(directory):
+                if entry.is_file() and entry.name.endswith(('.jar', '.zip')):
+                    stat = entry.stat()
+                    current[entry.path] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            db = self._connect()
+            known = {
+                path: ((inode, size, mtime_ns), fmt)
+                for path, inode, size, mtime_ns, fmt in db.execute(
+                    'SELECT path, inode, size, mtime_ns, format FROM mods WHERE directory = ?',
+                    (directory,),
+                )
+            }
+        changed = [path for path, identity in current.items() if known.get(path) != (identity, INDEX_VERSION)]
+        removed = [(path,) for path in known if path not in current]
+        parsed = [read_mod_info(path) for path in changed]
+
+        if changed or removed:
+            with self._lock:
+                db = self._connect()
+                with db:
+                    stale = removed + [(info.path,) for info in parsed]
+                    db.executemany('DELETE FROM mods WHERE path = ?', stale)
+                    db.executemany('DELETE FROM mod_depends WHERE path = ?', stale)
+                    db.executemany(
+                        'INSERT INTO mods VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        [
+                            (
+                                info.path,
+                                directory,
+                                *current[info.path],
+                                INDEX_VERSION,
+                                info.mod_id,
+                                info.loader,
+                                json.dumps(asdict(info)),
+                            )
+                            for info in parsed
+                        ],
+                    )
+                    db.executemany(
+                        'INSERT OR IGNORE INTO mod_depends VALUES (?, ?)',
+                        [(info.path, dep) for info in parsed for dep in info.depends],
+                    )
+            logging.debug(f'Индекс модов {directory}: прочитано {len(parsed)}, удалено {len(removed)}')
+        return self.query(directory=directory)
+
+    def query(
+        self,
+        directory: str | None = None,
+        mod_id: str | None = None,
+        loader: str | None = None,
+        depends_on: str | None = None,
+    ) -> list[ModInfo]:
+        """Моды из индекса (без чтения jar-файлов), все условия объединяются через И"""
+        where = []
+        params: list[Any] = []
+        if directory is not None:
+            where.append('directory = ?')
+            params.append(os.path.abspath(directory))
+        if mod_id is not None:
+            where.append('mod_id = ?')
+            params.append(mod_id)
+        if loader is not None:
+            where.append('loader = ?')
+            params.append(loader)
+        if depends_on is not None:
+            where.append('path IN (SELECT path FROM mod_depends WHERE depends_on = ?)')
+            params.append(depends_on)
+        sql = 'SELECT data FROM mods'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        with self._lock:
+            rows = self._connect().execute(sql + ' ORDER BY path', params).fetchall()
+        return [ModInfo(**json.loads(data)) for (data,) in rows]
+
+    def get(self, path: str) -> ModInfo | None:
+        with self._lock:
+            row = self._connect().execute('SELECT data FROM mods WHERE path = ?', (os.path.abspath(path),)).fetchone()
+        return ModInfo(**json.loads(row[0])) if row else None
+
+    def missing_dependencies(self, directory: str) -> dict[str, list[str]]:
+        """Зависимость -> моды папки, которым она нужна, но не установлена"""
+        directory = os.path.abspath(directory)
+        with self._lock:
+            cursor = self._connect().execute(
+                """
+                SELECT d.depends_on, m.path FROM mod_depends d JOIN mods m USING (path)
+                WHERE m.directory = ? AND d.depends_on NOT IN (
+                    SELECT mod_id FROM mods WHERE directory = ? AND mod_id IS NOT NULL
+                )
+                ORDER BY d.depends_on
+                """,
+                (directory, directory),
+            )
+            rows = cursor.fetchall()
+        missing: dict[str, list[str]] = {}
+        for dependency, path in rows:
+            missing.setdefault(dependency, []).append(os.path.basename(path))
+        return missing
+
+
+mod_index = ModIndex()
@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from typing import Callable
+
+from config import INSTALL_QUEUE_PATH, MODS_DIR
+from downloader import DownloadCancelled, DownloadProgress
+from flow import dedicate
+from mod_resolver import ResolveError, mod_resolver
+
+MAX_CONCURRENT_INSTALLS = 3
+# Чаще обновлять прогресс одной установки в интерфейсе нет смысла
+PROGRESS_INTERVAL = 0.25
+SAVE_DELAY = 0.5
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+# Установки в этих состояниях ещё не завершились
+ACTIVE_STATES = (JOB_QUEUED, JOB_RUNNING)
+
+
+@dataclass
+class InstallJob:
+    project_id: str
+    title: str
+    game_version: str
+    loader: str | None
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    state: str = JOB_QUEUED
+    downloaded: int = 0
+    total: int = 0
+    message: str = ''
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False, compare=False)
+
+    def to_json(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'cancel_event'}
+
+
+JobListener = Callable[[InstallJob], None]
+
+
+class ModInstallQueue:
+    """
+    Очередь установки модов Modrinth: несколько установок идут параллельно в пуле потоков,
+    незавершённые установки сохраняются на диск и продолжаются после перезапуска лаунчера.
+    """
+
+    def __init__(self, path: str = INSTALL_QUEUE_PATH, max_workers: int = MAX_CONCURRENT_INSTALLS) -> None:
+        self.path = path
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._jobs: dict[str, InstallJob] = {}
+        self._listeners: list[JobListener] = []
+        self._executor: ThreadPoolExecutor | None = None
+        self._restored = False
+        self._save_lock = threading.Lock()
+        self._save_pending = False
+        self._closed = False
+
+    def subscribe(self, listener: JobListener) -> None:
+        """listener вызывается из рабочих потоков при каждом изменении установки"""
+        self._listeners.append(listener)
+
+    def jobs(self) -> list[InstallJob]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def get(self, job_id: str) -> InstallJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def enqueue(self, project_id: str, title: str, game_version: str, loader: str | None = None) -> InstallJob:
+        """Добавляет мод в очередь; повторный запрос того же мода возвращает уже идущую установку"""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.state in ACTIVE_STATES and (job.project_id, job.game_version, job.loader) == (project_id, game_version, loader):
+                    return job
+            job = InstallJob(project_id, title, game_version, loader)
+            self._jobs[job.job_id] = job
+        self._submit(job)
+        return job
+
+    def cancel(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.state not in ACTIVE_STATES:
+            return
+        job.cancel_event.set()
+        # Ещё не начатая установка отменяется сразу, начатая - когда загрузчик заметит флаг
+        if job.state == JOB_QUEUED:
+            self._update(job, state=JOB_CANCELLED, message='Отменено')
+
+    def retry(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.state not in (JOB_FAILED, JOB_CANCELLED):
+            return
+        job.cancel_event = threading.Event()
+        self._update(job, state=JOB_QUEUED, downloaded=0, total=0, message='')
+        self._submit(job)
+
+    def clear_finished(self) -> None:
+        with self._lock:
+            self._jobs = {job_id: job for job_id, job in self._jobs.items() if job.state != JOB_DONE}
+
+    def restore(self) -> None:
+        """Возвращает в очередь установки, не завершённые при прошлом запуске"""
+        with self._lock:
+            if self._restored:
+                return
+            self._restored = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f'Не удалось прочитать очередь установки модов: {e}')
+            return
+
+        jobs = []
+        for data in saved:
+            try:
+                jobs.append(InstallJob(**data))
+            except TypeError as e:
+                # Запись от другой версии лаунчера или испорченный файл
+                logging.warning(f'Пропущена запись очереди установки модов: {e}')
+        with self._lock:
+            for job in jobs:
+                self._jobs.setdefault(job.job_id, job)
+        for job in jobs:
+            if job.state in ACTIVE_STATES:
+                job.state = JOB_QUEUED
+                self._submit(job)
+        logging.info(f'Восстановлена очередь установки модов: {len(jobs)}')
+
+    def shutdown(self) -> None:
+        """
+        При закрытии лаунчера: сохраняет очередь и прерывает установки, чтобы процесс не продолжал
+        скачивать в фоне. Незавершённые установки продолжатся при следующем запуске.
+        """
+        self.save()
+        with self._lock:
+            self._closed = True
+            active = [job for job in self._jobs.values() if job.state in ACTIVE_STATES]
+            executor = self._executor
+        for job in active:
+            job.cancel_event.set()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, job: InstallJob) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='mod-install')
+            executor = self._executor
+        self._save()
+        self._notify(job)
+        executor.submit(self._run, job, job.cancel_event)
+
+    def _run(self, job: InstallJob, cancel_event: threading.Event) -> None:
+        # После отмены и повтора в пуле может остаться прежний запуск той же установки
+        if cancel_event is not job.cancel_event or cancel_event.is_set():
+            return
+        self._update(job, state=JOB_RUNNING)
+        last_report = 0.0
+
+        def on_progress(progress: DownloadProgress) -> None:
+            nonlocal last_report
+            now = time.monotonic()
+            if now - last_report < PROGRESS_INTERVAL and progress.downloaded != progress.total:
+                return
+            last_report = now
+            job.downloaded = progress.downloaded
+            job.total = progress.total or 0
+            self._notify(job)
+
+        try:
+            mods_dir = os.path.join(MODS_DIR, job.game_version)
+            plan = mod_resolver.resolve([job.project_id], job.game_version, job.loader, mods_dir)
+            if cancel_event.is_set():
+                raise DownloadCancelled(job.title)
+            mod_resolver.install(plan, mods_dir, on_progress, cancel_event)
+        except DownloadCancelled:
+            self._update(job, state=JOB_CANCELLED, message='Отменено')
+        except ResolveError as e:
+            self._update(job, state=JOB_FAILED, message=f'Не найдена подходящая версия мода:\n{e}')
+        except Exception as e:
+            logging.exception(f'Ошибка установки мода {job.title}: {e}')
+            self._update(job, state=JOB_FAILED, message=f'Ошибка загрузки мода: {e!s}')
+        else:
+            message = 'Установлено'
+            if plan.dependencies:
+                message += f' вместе с зависимостями: {", ".join(mod.title for mod in plan.dependencies)}'
+            self._update(job, state=JOB_DONE, message=message, downloaded=job.total)
+
+    def _update(self, job: InstallJob, **changes: object) -> None:
+        for name, value in changes.items():
+            setattr(job, name, value)
+        self._save()
+        self._notify(job)
+
+    def _notify(self, job: InstallJob) -> None:
+        for listener in self._listeners:
+            listener(job)
+
+    def _save(self) -> None:
+        """Откладывает запись на SAVE_DELAY, чтобы пачка изменений сохранилась одной записью"""
+        with self._lock:
+            if self._save_pending:
+                return
+            self._save_pending = True
+        dedicate(self._save_later)
+
+    def _save_later(self) -> None:
+        time.sleep(SAVE_DELAY)
+        self.save()
+
+    def save(self) -> None:
+        """Сохраняет незавершённые и неудавшиеся установки (запись через временный файл)"""
+        with self._lock:
+            self._save_pending = False
+            if self._closed:
+                # Прерванные при закрытии установки должны остаться в очереди, а не стать отменёнными
+                return
+            data = [job.to_json() for job in self._jobs.values() if job.state != JOB_DONE]
+        with self._save_lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logging.warning(f'Не удалось сохранить очередь установки модов: {e}')
+
+
+mod_install_queue = ModInstallQueue()
@@ -1,25 +1,38 @@
 import json
 import logging
 import os
-import shutil
-from typing import Any
-import zipfile
-from functools import lru_cache
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Any
 
 import requests
 
+import http_client
 from config import MODS_DIR
+from downloader import DownloadTask, downloader
+from http_client import RequestCancelled
+from mod_catalog import mod_catalog
+from mod_index import ModInfo, mod_index
+from mod_resolver import ResolveError, mod_resolver
+from mod_store import mod_store
+from modrinth_metadata import modrinth_metadata
+from mrpack import export_mrpack
+from response_cache import response_cache
+
+if TYPE_CHECKING:
+    from gui.library_watcher import LibraryWatcher
 
 
 class ModManager:
     @staticmethod
-    def get_mods_list(version: str) -> list[str]:
-        """Получает список установленных модов для указанной версии"""
-        version_mods_dir = os.path.join(MODS_DIR, version)
-        if not os.path.exists(version_mods_dir):
-            return []
+    def get_mods_list(version: str, library_watcher: 'LibraryWatcher') -> list[str]:
+        """Получает список установленных модов для указанной версии из индекса наблюдателя, без обращения к диску"""
+        return sorted(library_watcher.files(os.path.join(MODS_DIR, version)))
 
-        return [f for f in os.listdir(version_mods_dir) if f.endswith('.jar') or f.endswith('.zip')]
+    @staticmethod
+    def get_installed_mods(version: str) -> list[ModInfo]:
+        """Установленные моды версии с метаданными из jar (читаются только изменённые файлы)"""
+        return mod_index.scan(os.path.join(MODS_DIR, version))
 
     @staticmethod
     def install_mod_from_file(file_path: str, version: str) -> tuple[bool, str]:
@@ -27,7 +40,7 @@ class ModManager:
         try:
             os.makedirs(os.path.join(MODS_DIR, version), exist_ok=True)
             dest_path = os.path.join(MODS_DIR, version, os.path.basename(file_path))
-            shutil.copy(file_path, dest_path)
+            mod_store.install_file(file_path, dest_path)
             return True, 'Мод успешно установлен!'
         except Exception as e:
             return False, f'Ошибка установки мода: {e!s}'
@@ -39,6 +52,7 @@ class ModManager:
             mod_path = os.path.join(MODS_DIR, version, mod_name)
             if os.path.exists(mod_path):
                 os.remove(mod_path)
+                mod_store.release(mod_path)
                 return True, 'Мод успешно удален'
             return False, 'Мод не найден'
         except Exception as e:
@@ -51,48 +65,98 @@ class ModManager:
         loader: str | None = None,
         category: str | None = None,
         sort_by: str = 'relevance',
+        cancel_event: threading.Event | None = None,
     ) -> list[dict[str, Any]]:
         try:
-            # Преобразуем параметры сортировки
-            sort_mapping = {
-                'По релевантности': 'relevance',
-                'По загрузкам': 'downloads',
-                'По дате': 'newest',
-            }
-            sort_by = sort_mapping.get(sort_by, 'relevance')
-
-            facets = []
-
-            # Фильтр по версии Minecraft
-            if version and version != 'Все версии':
-                facets.append(['versions:' + version])
-
-            # Фильтр по модлоадеру
-            if loader and loader.lower() != 'vanilla':
-                loader = loader.lower()
-                if loader == 'optifine':
-                    facets.append(['categories:optimization'])
-                else:
-                    facets.append(['categories:' + loader])
+            hits, _ = ModManager.search_modrinth_page(query, version, loader, category, sort_by, 0, 50, cancel_event)
+            return hits
+        except RequestCancelled:
+            raise
+        except Exception as e:
+            logging.exception(f'Ошибка поиска на Modrinth: {e}')
+            return []
 
-            # Фильтр по категории
-            if category and category != 'Все категории':
-                facets.append(['categories:' + category.lower()])
+    @staticmethod
+    def search_modrinth_page(
+        query: str,
+        version: str | None = None,
+        loader: str | None = None,
+        category: str | None = None,
+        sort_by: str = 'relevance',
+        offset: int = 0,
+        limit: int = 10,
+        cancel_event: threading.Event | None = None,
+    ) -> tuple[list[dict[str, Any]], int]:
+        """
+        Одна страница поиска на Modrinth.
+        :return: (моды страницы, всего найдено)
+        :raises requests.RequestException: при ошибке сети
+        """
+        # Преобразуем параметры сортировки
+        sort_mapping = {
+            'По релевантности': 'relevance',
+            'По загрузкам': 'downloads',
+            'По дате': 'newest',
+        }
+        sort_by = sort_mapping.get(sort_by, 'relevance')
+
+        facets = []
+
+        # Фильтр по версии Minecraft
+        if version and version != 'Все версии':
+            facets.append(['versions:' + version])
+
+        # Фильтр по модлоадеру
+        if loader and loader.lower() != 'vanilla':
+            loader = loader.lower()
+            if loader == 'optifine':
+                facets.append(['categories:optimization'])
+            else:
+                facets.append(['categories:' + loader])
+
+        # Фильтр по категории
+        if category and category != 'Все категории':
+            facets.append(['categories:' + category.lower()])
+
+        if mod_catalog.is_fresh():
+            try:
+                return ModManager._search_catalog(query, version, facets, sort_by, offset, limit)
+            except sqlite3.Error as e:
+                logging.warning(f'Ошибка поиска в локальном каталоге: {e}')
+        elif mod_catalog.enabled:
+            mod_catalog.sync_in_background()
 
-            # Формируем параметры запроса
-            params = {'query': query, 'limit': 50, 'index': sort_by}
+        # Формируем параметры запроса
+        params = {'query': query, 'offset': offset, 'limit': limit, 'index': sort_by}
 
-            if facets:
-                params['facets'] = json.dumps(facets)
+        if facets:
+            params['facets'] = json.dumps(facets)
 
-            response = requests.get('https://api.modrinth.com/v2/search', params=params)
+        try:
+            data = response_cache.get_json('https://api.modrinth.com/v2/search', params, cancel_event=cancel_event)
+        except requests.RequestException:
+            # Без сети устаревший каталог лучше, чем ничего
+            if mod_catalog.enabled and mod_catalog.has_data():
+                logging.warning('Modrinth недоступен, ищем в локальном каталоге')
+                return ModManager._search_catalog(query, version, facets, sort_by, offset, limit)
+            raise
+        if not data:
+            return [], 0
+        return data.get('hits', []), data.get('total_hits', 0)
 
-            if response.status_code == 200:
-                return response.json().get('hits', [])
-            return []
-        except Exception as e:
-            logging.exception(f'Ошибка поиска на Modrinth: {e}')
-            return []
+    @staticmethod
+    def _search_catalog(
+        query: str,
+        version: str | None,
+        facets: list[list[str]],
+        index: str,
+        offset: int,
+        limit: int,
+    ) -> tuple[list[dict[str, Any]], int]:
+        categories = [facet[0].removeprefix('categories:') for facet in facets if facet[0].startswith('categories:')]
+        if version == 'Все версии':
+            version = None
+        return mod_catalog.search(query, version, categories, index, offset, limit)
 
     @staticmethod
     def search_curseforge(query: str, version: str | None = None, loader: str | None = None) -> list[dict[str, Any]]:
@@ -111,7 +175,7 @@ class ModManager:
             if loader:
                 params['modLoaderType'] = loader
 
-            response = requests.get(
+            response = http_client.get(
                 'https://api.curseforge.com/v1/mods/search',
                 headers=headers,
                 params=params,
@@ -124,33 +188,20 @@ class ModManager:
             return []
 
     @staticmethod
-    def download_modrinth_mod(mod_id: str, version: str) -> tuple[bool, str]:
-        """Скачивает мод с Modrinth"""
+    def download_modrinth_mod(mod_id: str, version: str, loader: str | None = None) -> tuple[bool, str]:
+        """Скачивает мод с Modrinth вместе с обязательными зависимостями"""
         try:
-            # Получаем информацию о файле
-            response = requests.get(
-                f'https://api.modrinth.com/v2/project/{mod_id}/version',
-            )
-            if response.status_code != 200:
-                return False, 'Не удалось получить информацию о моде'
-
-            versions = response.json()
-            for v in versions:
-                if version in v['game_versions']:
-                    file_url = v['files'][0]['url']
-                    file_name = v['files'][0]['filename']
-
-                    # Скачиваем файл
-                    os.makedirs(os.path.join(MODS_DIR, version), exist_ok=True)
-                    dest_path = os.path.join(MODS_DIR, version, file_name)
-
-                    response = requests.get(file_url, stream=True)
-                    if response.status_code == 200:
-                        with open(dest_path, 'wb') as f:
-                            response.raw.decode_content = True
-                            shutil.copyfileobj(response.raw, f)
-                        return True, 'Мод успешно установлен!'
-            return False, 'Не найдена подходящая версия мода'
+            mods_dir = os.path.join(MODS_DIR, version)
+            plan = mod_resolver.resolve([mod_id], version, loader, mods_dir)
+            mod_resolver.install(plan, mods_dir)
+
+            message = 'Мод успешно установлен!'
+            if plan.dependencies:
+                names = ', '.join(mod.title for mod in plan.dependencies)
+                message += f'\nТакже установлены зависимости: {names}'
+            return True, message
+        except ResolveError as e:
+            return False, f'Не найдена подходящая версия мода:\n{e}'
         except Exception as e:
             return False, f'Ошибка загрузки мода: {e!s}'
 
@@ -161,7 +212,7 @@ class ModManager:
             headers = {'x-api-key': 'YOUR_CURSEFORGE_API_KEY'}
 
             # Получаем информацию о файле
-            response = requests.get(
+            response = http_client.get(
                 f'https://api.curseforge.com/v1/mods/{mod_id}/files',
                 headers=headers,
             )
@@ -171,51 +222,31 @@ class ModManager:
             files = response.json()['data']
             for file in files:
                 if version in file['gameVersions']:
-                    file_url = file['downloadUrl']
-                    file_name = file['fileName']
+                    # В CurseForge algo 1 - SHA-1, algo 2 - MD5
+                    sha1 = next((h['value'] for h in file.get('hashes', []) if h.get('algo') == 1), None)
 
                     # Скачиваем файл
-                    os.makedirs(os.path.join(MODS_DIR, version), exist_ok=True)
-                    dest_path = os.path.join(MODS_DIR, version, file_name)
-
-                    response = requests.get(file_url, stream=True)
-                    if response.status_code == 200:
-                        with open(dest_path, 'wb') as f:
-                            response.raw.decode_content = True
-                            shutil.copyfileobj(response.raw, f)
-                        return True, 'Мод успешно установлен!'
+                    downloader.download(
+                        DownloadTask(
+                            url=file['downloadUrl'],
+                            dest=os.path.join(MODS_DIR, version, file['fileName']),
+                            hashes={'sha1': sha1} if sha1 else {},
+                            size=file.get('fileLength'),
+                        ),
+                    )
+                    return True, 'Мод успешно установлен!'
             return False, 'Не найдена подходящая версия мода'
         except Exception as e:
             return False, f'Ошибка загрузки мода: {e!s}'
 
     @staticmethod
     def create_modpack(version: str, mods: list[str], output_path: str) -> tuple[bool, str]:
-        """Создает сборку модов"""
+        """Создает сборку модов в формате Modrinth (.mrpack)"""
         try:
-            with zipfile.ZipFile(output_path, 'w') as zipf:
-                # Добавляем моды
-                for mod in mods:
-                    mod_path = os.path.join(MODS_DIR, version, mod)
-                    if os.path.exists(mod_path):
-                        zipf.write(mod_path, os.path.join('mods', mod))
-
-                # Добавляем файл манифеста
-                manifest = {
-                    'minecraft': {'version': version, 'modLoaders': []},
-                    'manifestType': 'minecraftModpack',
-                    'manifestVersion': 1,
-                    'name': f'Modpack {version}',
-                    'version': '1.0.0',
-                    'author': '16Launcher',
-                    'files': [],
-                }
-
-                manifest_path = os.path.join(MODS_DIR, 'manifest.json')
-                with open(manifest_path, 'w') as f:
-                    json.dump(manifest, f, indent=4)
-                zipf.write(manifest_path, 'manifest.json')
-                os.remove(manifest_path)
-
+            export_mrpack(
+                {'name': f'Modpack {version}', 'version': version, 'loader': 'Vanilla', 'mods': mods},
+                output_path,
+            )
             return True, 'Сборка успешно создана!'
         except Exception as e:
             return False, f'Ошибка создания сборки: {e!s}'
@@ -225,9 +256,8 @@ class ModManager:
         """Получает список доступных категорий модов"""
         if source == 'modrinth':
             try:
-                response = requests.get('https://api.modrinth.com/v2/tag/category')
-                if response.status_code == 200:
-                    return [cat['name'] for cat in response.json()]
+                categories = response_cache.get_json('https://api.modrinth.com/v2/tag/category')
+                return [cat['name'] for cat in categories or []]
             except Exception as e:
                 logging.exception(f'Ошибка получения категорий Modrinth: {e}')
         return []
@@ -237,12 +267,10 @@ class ModManager:
         """Получает подробную информацию о моде"""
         try:
             if source == 'modrinth':
-                response = requests.get(f'https://api.modrinth.com/v2/project/{mod_id}')
-                if response.status_code == 200:
-                    return response.json()
+                return modrinth_metadata.get_project(mod_id)
             elif source == 'curseforge':
                 headers = {'x-api-key': 'YOUR_CURSEFORGE_API_KEY'}
-                response = requests.get(
+                response = http_client.get(
                     f'https://api.curseforge.com/v1/mods/{mod_id}',
                     headers=headers,
                 )
@@ -258,13 +286,11 @@ class ModManager:
         """Получает URL иконки мода"""
         try:
             if source == 'modrinth':
-                response = requests.get(f'https://api.modrinth.com/v2/project/{mod_id}')
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get('icon_url')
+                data = modrinth_metadata.get_project(mod_id)
+                return data.get('icon_url') if data else None
             elif source == 'curseforge':
                 headers = {'x-api-key': 'YOUR_CURSEFORGE_API_KEY'}
-                response = requests.get(
+                response = http_client.get(
                     f'https://api.curseforge.com/v1/mods/{mod_id}',
                     headers=headers,
                 )
@@ -277,7 +303,6 @@ class ModManager:
             return None
 
     @staticmethod
-    @lru_cache(maxsize=100)
     def cached_search(
         query: str,
         version: str | None = None,
@@ -285,8 +310,9 @@ class ModManager:
         category: str | None = None,
         sort_by: str = 'relevance',
         source: str = 'modrinth',
+        cancel_event: threading.Event | None = None,
     ) -> list[dict[str, Any]]:
-        """Кэшированный поиск модов"""
+        """Кэшированный поиск модов (ответы Modrinth хранятся в дисковом кэше)"""
         if source == 'modrinth':
-            return ModManager.search_modrinth(query, version, loader, category, sort_by)
+            return ModManager.search_modrinth(query, version, loader, category, sort_by, cancel_event)
         return ModManager.search_curseforge(query, version, loader)
@@ -0,0 +1,330 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from downloader import DownloadTask, ProgressCallback, downloader
+from mod_index import ModInfo, mod_index
+from mod_store import mod_store
+from modrinth_metadata import MODRINTH_API_URL, modrinth_metadata
+from response_cache import response_cache
+
+# Чем меньше, тем предпочтительнее
+VERSION_TYPE_PRIORITY = {'release': 0, 'beta': 1, 'alpha': 2}
+PLAN_TTL = 30 * 60
+MAX_WORKERS = 8
+
+
+class ResolveError(Exception):
+    """Набор модов нельзя установить: нет совместимой версии или есть конфликт"""
+
+    def __init__(self, problems: list[str]) -> None:
+        super().__init__('\n'.join(problems))
+        self.problems = problems
+
+
+@dataclass
+class PlannedMod:
+    project_id: str
+    version_id: str
+    version_number: str
+    title: str
+    filename: str
+    url: str
+    hashes: dict[str, str]
+    size: int | None
+    # Пусто для модов, которые запросил пользователь
+    required_by: list[str] = field(default_factory=list)
+
+    def task(self, dest_dir: str) -> DownloadTask:
+        return DownloadTask(self.url, os.path.join(dest_dir, self.filename), self.hashes, self.size)
+
+
+@dataclass
+class InstallPlan:
+    game_version: str
+    loader: str | None
+    mods: list[PlannedMod]
+
+    @property
+    def dependencies(self) -> list[PlannedMod]:
+        return [mod for mod in self.mods if mod.required_by]
+
+
+def primary_file(version: dict[str, Any]) -> dict[str, Any]:
+    files = version.get('files') or []
+    if not files:
+        raise ResolveError([f'У версии {version.get("version_number", version["id"])} нет файлов'])
+    return next((file for file in files if file.get('primary')), files[0])
+
+
+def mod_key(name: str) -> str:
+    """ID мода из jar-файла и slug проекта Modrinth обычно совпадают с точностью до регистра и '_'/'-'"""
+    return name.lower().replace('_', '-')
+
+
+def is_compatible(version: dict[str, Any], game_version: str, loader: str | None) -> bool:
+    return game_version in version.get('game_versions', []) and (loader is None or loader in version.get('loaders', []))
+
+
+class ModResolver:
+    """
+    Подбирает версии модов Modrinth под версию игры и загрузчик
+    вместе со всеми обязательными зависимостями.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._plans: dict[tuple, tuple[float, InstallPlan]] = {}
+        # Файлы, которые сейчас скачивает какая-то установка
+        self._installing: dict[str, threading.Event] = {}
+
+    def resolve(
+        self,
+        project_ids: Iterable[str],
+        game_version: str,
+        loader: str | None = None,
+        mods_dir: str | None = None,
+    ) -> InstallPlan:
+        """
+        Строит план установки: транзитивное замыкание обязательных зависимостей.
+        Зависимости, которые уже есть в mods_dir, в план не попадают.
+        :raises ResolveError: если у мода нет совместимой версии или моды конфликтуют, в том числе с установленными
+        """
+        project_ids = list(dict.fromkeys(project_ids))
+        loader = loader.lower() if loader else None
+        installed = mod_index.scan(mods_dir) if mods_dir else []
+        key = (frozenset(project_ids), game_version, loader, frozenset((info.filename, info.version) for info in installed))
+        with self._lock:
+            cached = self._plans.get(key)
+        if cached is not None and time.time() - cached[0] < PLAN_TTL:
+            return cached[1]
+
+        plan = self._resolve(project_ids, game_version, loader, installed)
+        with self._lock:
+            self._plans[key] = (time.time(), plan)
+        return plan
+
+    def install(
+        self,
+        plan: InstallPlan,
+        dest_dir: str,
+        progress: ProgressCallback | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> list[str]:
+        """Скачивает файлы плана параллельно, уже известные берутся из хранилища модов"""
+        missing = []
+        for mod in plan.mods:
+            sha256 = mod_store.find(mod.hashes)
+            if sha256 is not None:
+                mod_store.materialize(sha256, os.path.join(dest_dir, mod.filename))
+            else:
+                missing.append(mod)
+
+        # Общую зависимость параллельных установок скачивает одна из них, остальные ждут
+        claimed: list[PlannedMod] = []
+        waiting: list[tuple[PlannedMod, threading.Event]] = []
+        with self._lock:
+            for mod in missing:
+                path = os.path.join(dest_dir, mod.filename)
+                if path in self._installing:
+                    waiting.append((mod, self._installing[path]))
+                else:
+                    self._installing[path] = threading.Event()
+                    claimed.append(mod)
+        try:
+            downloader.download_all([mod.task(dest_dir) for mod in claimed], progress, cancel_event)
+            for mod in claimed:
+                mod_store.adopt(os.path.join(dest_dir, mod.filename))
+        finally:
+            with self._lock:
+                for mod in claimed:
+                    self._installing.pop(os.path.join(dest_dir, mod.filename)).set()
+
+        if waiting:
+            for _, event in waiting:
+                event.wait()
+            # Если чужая установка не удалась, файлы докачает эта
+            waiting_mods = [mod for mod, _ in waiting]
+            self.install(InstallPlan(plan.game_version, plan.loader, waiting_mods), dest_dir, progress, cancel_event)
+        return [os.path.join(dest_dir, mod.filename) for mod in plan.mods]
+
+    def _resolve(self, project_ids: list[str], game_version: str, loader: str | None, installed: list[ModInfo]) -> InstallPlan:
+        chosen: dict[str, dict[str, Any]] = {}
+        required_by: dict[str, list[str]] = {project_id: [] for project_id in project_ids}
+        # Зависимость на конкретную версию: project_id -> (version_id, кто требует)
+        pinned: dict[str, tuple[str, str]] = {}
+        incompatible: list[tuple[str, str]] = []
+        problems: list[str] = []
+        installed_by_key = {mod_key(info.mod_id): info for info in installed if info.mod_id}
+        # Зависимости, которые уже установлены: project_id -> установленный мод
+        satisfied: dict[str, ModInfo] = {}
+
+        frontier = project_ids
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='mod-resolver') as executor:
+            while frontier:
+                already_installed = self._find_installed([p for p in frontier if required_by[p]], installed_by_key)
+                satisfied.update(already_installed)
+                frontier = [project_id for project_id in frontier if project_id not in already_installed]
+                # Загрузчик не задан - берём тот, под который собран первый запрошенный мод
+                if loader is None and chosen:
+                    loader = next(iter(chosen.values()))['loaders'][0]
+                versions = executor.map(
+                    lambda project_id: self._pick_version(project_id, game_version, loader, pinned.get(project_id)),
+                    frontier,
+                )
+                next_frontier: list[str] = []
+                for project_id, version in zip(frontier, versions):
+                    if version is None:
+                        problems.append(self._no_version_message(project_id, game_version, loader, required_by))
+                        continue
+                    chosen[project_id] = version
+                    dependencies = version.get('dependencies') or []
+                    self._resolve_dependency_projects(dependencies)
+                    for dependency in dependencies:
+                        dep_project = dependency.get('project_id')
+                        if not dep_project:
+                            continue
+                        if dependency.get('dependency_type') == 'incompatible':
+                            incompatible.append((project_id, dep_project))
+                            continue
+                        if dependency.get('dependency_type') != 'required':
+                            continue
+                        dep_version = dependency.get('version_id')
+                        if dep_version:
+                            previous = pinned.get(dep_project)
+                            if previous and previous[0] != dep_version:
+                                problems.append(
+                                    f'{project_id} и {previous[1]} требуют разные версии зависимости {dep_project}',
+                                )
+                                continue
+                            pinned[dep_project] = (dep_version, project_id)
+                        if dep_project not in required_by:
+                            required_by[dep_project] = [project_id]
+                            next_frontier.append(dep_project)
+                        elif project_id not in required_by[dep_project] and required_by[dep_project]:
+                            required_by[dep_project].append(project_id)
+                frontier = next_frontier
+
+        # Версию могли закрепить уже после того, как проект был выбран на прошлом шаге
+        for project_id, (version_id, pinned_by) in pinned.items():
+            if project_id in chosen and chosen[project_id]['id'] != version_id:
+                problems.append(f'{pinned_by} требует версию {version_id} мода {project_id}')
+        pinned_versions = modrinth_metadata.get_versions(
+            version_id for project_id, (version_id, _) in pinned.items() if project_id in satisfied
+        )
+        for project_id, info in satisfied.items():
+            if project_id not in pinned:
+                continue
+            version_id, pinned_by = pinned[project_id]
+            version = pinned_versions.get(version_id)
+            if version is not None and not self._is_installed_version(version, info):
+                problems.append(
+                    f'{pinned_by} требует версию {version.get("version_number", version_id)} мода {info.display_name}, '
+                    f'а установлена {info.version} ({info.filename})',
+                )
+        installed_incompatible = self._find_installed([other for _, other in incompatible if other not in chosen], installed_by_key)
+        for project_id, other in incompatible:
+            if other in chosen:
+                problems.append(f'{project_id} несовместим с {other}')
+            elif other in installed_incompatible:
+                info = installed_incompatible[other]
+                problems.append(f'{project_id} несовместим с установленным модом {info.display_name} ({info.filename})')
+        if problems:
+            raise ResolveError(problems)
+
+        titles = {project_id: (project or {}).get('title') for project_id, project in modrinth_metadata.get_projects(chosen).items()}
+        mods = []
+        for project_id, version in chosen.items():
+            file = primary_file(version)
+            mods.append(
+                PlannedMod(
+                    project_id=project_id,
+                    version_id=version['id'],
+                    version_number=version.get('version_number', ''),
+                    title=titles.get(project_id) or project_id,
+                    filename=file['filename'],
+                    url=file['url'],
+                    hashes={algo: value for algo, value in file.get('hashes', {}).items() if algo in ('sha1', 'sha512')},
+                    size=file.get('size'),
+                    required_by=required_by.get(project_id, []),
+                ),
+            )
+        logging.debug(f'План установки: {[(mod.title, mod.version_number) for mod in mods]}, уже установлены: {sorted(satisfied)}')
+        return InstallPlan(game_version, loader, mods)
+
+    @staticmethod
+    def _find_installed(project_ids: list[str], installed_by_key: dict[str, ModInfo]) -> dict[str, ModInfo]:
+        """Проекты Modrinth, моды которых уже лежат в папке (сопоставляются по slug и ID мода)"""
+        if not project_ids or not installed_by_key:
+            return {}
+        projects = modrinth_metadata.get_projects(project_ids)
+        found = {}
+        for project_id in project_ids:
+            slug = (projects.get(project_id) or {}).get('slug') or project_id
+            info = installed_by_key.get(mod_key(slug))
+            if info is not None:
+                found[project_id] = info
+        return found
+
+    @staticmethod
+    def _is_installed_version(version: dict[str, Any], info: ModInfo) -> bool:
+        """Версия Modrinth совпадает с установленной по имени файла или номеру версии"""
+        if any(file.get('filename') == info.filename for file in version.get('files') or []):
+            return True
+        number = version.get('version_number') or ''
+        # Номер версии на Modrinth часто дополнен версией игры или загрузчика: 0.92.0+1.20.1
+        return bool(info.version and number) and (info.version in number or number in info.version)
+
+    @staticmethod
+    def _pick_version(
+        project_id: str,
+        game_version: str,
+        loader: str | None,
+        pinned: tuple[str, str] | None,
+    ) -> dict[str, Any] | None:
+        if pinned is not None:
+            version = modrinth_metadata.get_versions([pinned[0]]).get(pinned[0])
+            return version if version and is_compatible(version, game_version, loader) else None
+
+        params = {'game_versions': json.dumps([game_version])}
+        if loader:
+            params['loaders'] = json.dumps([loader])
+        versions = response_cache.get_json(f'{MODRINTH_API_URL}/project/{project_id}/version', params) or []
+        versions = [version for version in versions if is_compatible(version, game_version, loader)]
+        if not versions:
+            return None
+        # Список отсортирован от новых к старым, sorted сохраняет этот порядок внутри типа
+        return sorted(versions, key=lambda version: VERSION_TYPE_PRIORITY.get(version.get('version_type'), 3))[0]
+
+    @staticmethod
+    def _resolve_dependency_projects(dependencies: list[dict[str, Any]]) -> None:
+        """Зависимости, указанные только версией, дополняет ID проекта"""
+        version_ids = [dep['version_id'] for dep in dependencies if not dep.get('project_id') and dep.get('version_id')]
+        if not version_ids:
+            return
+        versions = modrinth_metadata.get_versions(version_ids)
+        for dependency in dependencies:
+            version = versions.get(dependency.get('version_id') or '')
+            if not dependency.get('project_id') and version:
+                dependency['project_id'] = version['project_id']
+
+    @staticmethod
+    def _no_version_message(
+        project_id: str,
+        game_version: str,
+        loader: str | None,
+        required_by: dict[str, list[str]],
+    ) -> str:
+        target = f'{game_version} ({loader})' if loader else game_version
+        parents = required_by.get(project_id)
+        if parents:
+            return f'Нет версии зависимости {project_id} (нужна для {", ".join(parents)}) под {target}'
+        return f'Нет версии {project_id} под {target}'
+
+
+mod_resolver = ModResolver()
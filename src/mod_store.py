@@ -0,0 +1,264 @@
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from typing import BinaryIO
+
+from config import MOD_STORE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+CHUNK_SIZE = 1024 * 1024
+# ioctl FICLONE из linux/fs.h: копия файла без копирования данных (btrfs, xfs)
+FICLONE = 0x40049409
+# Алгоритмы хэшей Modrinth, по которым можно найти файл в хранилище без скачивания
+ALIAS_ALGORITHMS = ('sha1', 'sha512')
+GC_GRACE_PERIOD = 60 * 60
+
+
+def reflink(src: str, dest: str) -> None:
+    """Копия файла, которая делит данные с оригиналом, пока один из них не изменят"""
+    if fcntl is None:
+        raise OSError('reflink не поддерживается')
+    with open(src, 'rb') as source, open(dest, 'wb') as target:
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        except OSError:
+            target.close()
+            os.remove(dest)
+            raise
+
+
+class ModStore:
+    """
+    Хранилище jar-файлов по содержимому (SHA-256).
+    В папки версий и сборок файлы попадают жёсткими ссылками, reflink или копией,
+    поэтому одинаковый мод хранится на диске один раз.
+    """
+
+    def __init__(self, root: str = MOD_STORE_DIR) -> None:
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(self.root, 'store.sqlite3'), check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    sha256 TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS aliases (
+                    algo TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    PRIMARY KEY (algo, value)
+                );
+                CREATE TABLE IF NOT EXISTS refs (
+                    path TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS refs_sha256 ON refs (sha256);
+                """,
+            )
+        return self._db
+
+    def blob_path(self, sha256: str) -> str:
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def find(self, hashes: dict[str, str]) -> str | None:
+        """SHA-256 уже сохранённого файла по любому из известных хэшей (или None)"""
+        with self._lock:
+            db = self._connect()
+            for algo, value in hashes.items():
+                if algo == 'sha256':
+                    row = db.execute('SELECT sha256 FROM blobs WHERE sha256 = ?', (value.lower(),)).fetchone()
+                else:
+                    row = db.execute(
+                        'SELECT sha256 FROM aliases WHERE algo = ? AND value = ?',
+                        (algo, value.lower()),
+                    ).fetchone()
+                if row is not None and os.path.exists(self.blob_path(row[0])):
+                    return row[0]
+        return None
+
+    def install_file(self, src: str, dest: str) -> str:
+        """Кладёт файл в хранилище и размещает его по пути dest"""
+        with open(src, 'rb') as f:
+            sha256 = self.add_stream(f)
+        self.materialize(sha256, dest)
+        return sha256
+
+    def install_stream(self, stream: BinaryIO, dest: str) -> str:
+        """То же для потока, например файла внутри zip-архива"""
+        sha256 = self.add_stream(stream)
+        self.materialize(sha256, dest)
+        return sha256
+
+    def add_stream(self, stream: BinaryIO) -> str:
+        os.makedirs(self.objects_dir, exist_ok=True)
+        tmp_path = os.path.join(self.objects_dir, f'.{threading.get_ident()}-{time.monotonic_ns()}.tmp')
+        hashers = {algo: hashlib.new(algo) for algo in ('sha256', *ALIAS_ALGORITHMS)}
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    for hasher in hashers.values():
+                        hasher.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            digests = {algo: hasher.hexdigest() for algo, hasher in hashers.items()}
+            blob = self.blob_path(digests['sha256'])
+            if os.path.exists(blob):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.replace(tmp_path, blob)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._register_blob(digests, size)
+        return digests['sha256']
+
+    def adopt(self, path: str) -> str:
+        """
+        Переносит уже лежащий на месте файл (например, только что скачанный) в хранилище.
+        На одной файловой системе данные не копируются: файл становится ссылкой на blob.
+        """
+        hashers = {algo: hashlib.new(algo) for algo in ('sha256', *ALIAS_ALGORITHMS)}
+        size = 0
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                for hasher in hashers.values():
+                    hasher.update(chunk)
+                size += len(chunk)
+        digests = {algo: hasher.hexdigest() for algo, hasher in hashers.items()}
+
+        blob = self.blob_path(digests['sha256'])
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            try:
+                os.link(path, blob)
+            except OSError:
+                shutil.copyfile(path, blob)
+        self._register_blob(digests, size)
+        self.materialize(digests['sha256'], path)
+        return digests['sha256']
+
+    def materialize(self, sha256: str, dest: str) -> str:
+        """
+        Размещает blob по пути dest: жёсткая ссылка, reflink или копия.
+        :return: использованный способ ('existing', 'hardlink', 'reflink', 'copy')
+        """
+        blob = self.blob_path(sha256)
+        os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+        if os.path.exists(dest) and os.path.samefile(dest, blob):
+            method = 'existing'
+        else:
+            tmp_path = f'{dest}.{threading.get_ident()}.tmp'
+            method = 'hardlink'
+            try:
+                os.link(blob, tmp_path)
+            except OSError:
+                method = 'reflink'
+                try:
+                    reflink(blob, tmp_path)
+                except OSError:
+                    method = 'copy'
+                    shutil.copyfile(blob, tmp_path)
+            os.replace(tmp_path, dest)
+
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute('INSERT OR REPLACE INTO refs VALUES (?, ?)', (os.path.abspath(dest), sha256))
+        logging.debug(f'Мод {os.path.basename(dest)} размещён из хранилища ({method})')
+        return method
+
+    def release(self, path: str) -> None:
+        """Забывает ссылку на файл (после удаления мода), blob удалит сборка мусора"""
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute('DELETE FROM refs WHERE path = ?', (os.path.abspath(path),))
+
+    def refcount(self, sha256: str) -> int:
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM refs WHERE sha256 = ?', (sha256,)).fetchone()[0]
+
+    def collect_garbage(self) -> tuple[int, int]:
+        """
+        Удаляет устаревшие ссылки и blob'ы, на которые никто не ссылается.
+        :return: (удалено файлов, освобождено байт)
+        """
+        with self._lock:
+            db = self._connect()
+            refs = db.execute('SELECT r.path, r.sha256, b.size FROM refs r LEFT JOIN blobs b USING (sha256)').fetchall()
+        stale = [(path,) for path, sha256, size in refs if not self._still_references(path, sha256, size)]
+
+        removed = 0
+        freed = 0
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.executemany('DELETE FROM refs WHERE path = ?', stale)
+                # Свежие blob'ы могут ещё ждать размещения, их не трогаем
+                orphans = db.execute(
+                    'SELECT sha256, size FROM blobs WHERE sha256 NOT IN (SELECT sha256 FROM refs) AND created_at < ?',
+                    (time.time() - GC_GRACE_PERIOD,),
+                ).fetchall()
+                for sha256, size in orphans:
+                    try:
+                        os.remove(self.blob_path(sha256))
+                    except FileNotFoundError:
+                        pass
+                    except OSError as e:
+                        logging.warning(f'Не удалось удалить {sha256} из хранилища модов: {e}')
+                        continue
+                    db.execute('DELETE FROM blobs WHERE sha256 = ?', (sha256,))
+                    db.execute('DELETE FROM aliases WHERE sha256 = ?', (sha256,))
+                    removed += 1
+                    freed += size
+
+        # Остатки прерванных записей
+        for entry in os.scandir(self.objects_dir):
+            if entry.is_file() and entry.name.endswith('.tmp'):
+                os.remove(entry.path)
+
+        if removed:
+            logging.info(f'Хранилище модов: удалено {removed} файлов, освобождено {freed // 1024} КБ')
+        return removed, freed
+
+    def _still_references(self, path: str, sha256: str, size: int | None) -> bool:
+        """Файл на месте и это всё ещё тот же мод (для копий сверяем размер)"""
+        try:
+            return os.path.samefile(path, self.blob_path(sha256)) or os.path.getsize(path) == size
+        except OSError:
+            return False
+
+    def _register_blob(self, digests: dict[str, str], size: int) -> None:
+        sha256 = digests['sha256']
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute('INSERT OR IGNORE INTO blobs VALUES (?, ?, ?)', (sha256, size, time.time()))
+                db.executemany(
+                    'INSERT OR REPLACE INTO aliases VALUES (?, ?, ?)',
+                    [(algo, digests[algo], sha256) for algo in ALIAS_ALGORITHMS if algo in digests],
+                )
+
+
+mod_store = ModStore()
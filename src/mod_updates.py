@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+import http_client
+from config import FILE_HASH_CACHE_PATH
+from downloader import ProgressCallback
+from mod_resolver import InstallPlan, PlannedMod, mod_resolver, primary_file
+from mod_store import mod_store
+from modrinth_metadata import MODRINTH_API_URL
+
+CHUNK_SIZE = 1024 * 1024
+# Меньше файлов быстрее посчитать в текущем процессе, чем запускать пул
+PROCESS_POOL_THRESHOLD = 8
+MAX_HASHES_PER_REQUEST = 1000
+
+
+def hash_file(path: str) -> tuple[str, str, str]:
+    """(путь, sha1, sha512) - выполняется в отдельном процессе"""
+    sha1 = hashlib.sha1()
+    sha512 = hashlib.sha512()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha1.update(chunk)
+            sha512.update(chunk)
+    return path, sha1.hexdigest(), sha512.hexdigest()
+
+
+class FileHashCache:
+    """Хэши файлов модов, действительные, пока не изменились размер и время изменения"""
+
+    def __init__(self, path: str = FILE_HASH_CACHE_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha1 TEXT NOT NULL,
+                    sha512 TEXT NOT NULL
+                )
+                """,
+            )
+        return self._db
+
+    def hash_files(self, paths: Iterable[str]) -> dict[str, dict[str, str]]:
+        """Путь -> {'sha1': ..., 'sha512': ...}, пересчитываются только изменённые файлы"""
+        stats = {}
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            stats[path] = (stat.st_size, stat.st_mtime_ns)
+
+        result: dict[str, dict[str, str]] = {}
+        with self._lock:
+            db = self._connect()
+            for path, size, mtime_ns, sha1, sha512 in db.execute('SELECT * FROM file_hashes'):
+                if stats.get(path) == (size, mtime_ns):
+                    result[path] = {'sha1': sha1, 'sha512': sha512}
+
+        missing = [path for path in stats if path not in result]
+        if not missing:
+            return result
+
+        if len(missing) >= PROCESS_POOL_THRESHOLD:
+            with ProcessPoolExecutor() as executor:
+                hashed = list(executor.map(hash_file, missing, chunksize=4))
+        else:
+            hashed = [hash_file(path) for path in missing]
+
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.executemany(
+                    'INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?, ?)',
+                    [(path, *stats[path], sha1, sha512) for path, sha1, sha512 in hashed],
+                )
+        for path, sha1, sha512 in hashed:
+            result[path] = {'sha1': sha1, 'sha512': sha512}
+        logging.debug(f'Посчитаны хэши {len(hashed)} модов, {len(result) - len(hashed)} взяты из кэша')
+        return result
+
+
+@dataclass
+class ModUpdate:
+    path: str
+    project_id: str
+    current: dict[str, Any]
+    latest: dict[str, Any]
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+
+def post_hashes(endpoint: str, hashes: list[str], **extra: Any) -> dict[str, dict[str, Any]]:
+    """SHA-1 файла -> версия Modrinth, файлы, которых Modrinth не знает, в ответ не попадают"""
+    result: dict[str, dict[str, Any]] = {}
+    for start in range(0, len(hashes), MAX_HASHES_PER_REQUEST):
+        response = http_client.post(
+            f'{MODRINTH_API_URL}/{endpoint}',
+            json={'hashes': hashes[start : start + MAX_HASHES_PER_REQUEST], 'algorithm': 'sha1', **extra},
+        )
+        response.raise_for_status()
+        result.update(response.json())
+    return result
+
+
+class ModUpdateChecker:
+    """Проверка обновлений установленных модов пакетными запросами Modrinth по хэшам"""
+
+    def __init__(self) -> None:
+        self.hash_cache = FileHashCache()
+
+    def check(self, mods_dir: str, game_version: str, loader: str | None = None) -> list[ModUpdate]:
+        """
+        Находит моды папки, для которых на Modrinth есть более новая совместимая версия.
+        :raises requests.RequestException: при ошибке сети
+        """
+        if not os.path.isdir(mods_dir):
+            return []
+        paths = [entry.path for entry in os.scandir(mods_dir) if entry.is_file() and entry.name.endswith('.jar')]
+        hashes = self.hash_cache.hash_files(paths)
+        by_sha1 = {file_hashes['sha1']: path for path, file_hashes in hashes.items()}
+        if not by_sha1:
+            return []
+
+        current = post_hashes('version_files', list(by_sha1))
+
+        # Обновления ищем под загрузчик, с которым мод установлен сейчас
+        groups: dict[tuple[str, ...], list[str]] = {}
+        for sha1, version in current.items():
+            loaders = (loader.lower(),) if loader else tuple(version.get('loaders', []))
+            groups.setdefault(loaders, []).append(sha1)
+        latest: dict[str, dict[str, Any]] = {}
+        for loaders, group in groups.items():
+            latest.update(post_hashes('version_files/update', group, loaders=list(loaders), game_versions=[game_version]))
+
+        updates = []
+        for sha1, version in current.items():
+            new_version = latest.get(sha1)
+            if new_version and new_version['id'] != version['id']:
+                updates.append(ModUpdate(by_sha1[sha1], version['project_id'], version, new_version))
+        logging.info(f'Проверено модов: {len(by_sha1)}, найдено обновлений: {len(updates)}')
+        return updates
+
+    def apply(
+        self,
+        updates: list[ModUpdate],
+        progress: ProgressCallback | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> None:
+        """Скачивает новые версии параллельно и только потом удаляет старые файлы"""
+        by_dir: dict[str, list[ModUpdate]] = {}
+        for update in updates:
+            by_dir.setdefault(os.path.dirname(update.path), []).append(update)
+
+        for mods_dir, dir_updates in by_dir.items():
+            mods = []
+            for update in dir_updates:
+                file = primary_file(update.latest)
+                mods.append(
+                    PlannedMod(
+                        project_id=update.project_id,
+                        version_id=update.latest['id'],
+                        version_number=update.latest.get('version_number', ''),
+                        title=update.latest.get('name') or update.name,
+                        filename=file['filename'],
+                        url=file['url'],
+                        hashes={algo: value for algo, value in file.get('hashes', {}).items() if algo in ('sha1', 'sha512')},
+                        size=file.get('size'),
+                    ),
+                )
+            mod_resolver.install(InstallPlan('', None, mods), mods_dir, progress, cancel_event)
+
+            for update, mod in zip(dir_updates, mods):
+                if os.path.join(mods_dir, mod.filename) != update.path and os.path.exists(update.path):
+                    os.remove(update.path)
+                    mod_store.release(update.path)
+
+
+mod_update_checker = ModUpdateChecker()
@@ -0,0 +1,246 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+from config import MODPACKS_DB_PATH, MODPACKS_DIR, MODS_DIR
+from mod_index import mod_index
+
+PACK_ADDED = 'added'
+PACK_UPDATED = 'updated'
+PACK_REMOVED = 'removed'
+
+# Вид изменения, ID сборки, данные сборки (None для удалённой)
+PackListener = Callable[[str, str, dict[str, Any] | None], None]
+# [размер, время изменения, загрузчик из метаданных jar] или None, если файла нет
+FileEntry = list | None
+
+
+@dataclass
+class PackStats:
+    version: str
+    # Имя файла мода -> FileEntry
+    files: dict[str, FileEntry]
+
+    @property
+    def mod_count(self) -> int:
+        return len(self.files)
+
+    @property
+    def total_size(self) -> int:
+        return sum(entry[0] for entry in self.files.values() if entry is not None)
+
+    @property
+    def missing(self) -> int:
+        return sum(entry is None for entry in self.files.values())
+
+    @property
+    def loaders(self) -> dict[str, int]:
+        """Загрузчик -> число модов, моды без метаданных не учитываются"""
+        return dict(Counter(entry[2] for entry in self.files.values() if entry is not None and entry[2]))
+
+
+def _file_entries(version: str, names: Iterable[str]) -> dict[str, FileEntry]:
+    names = list(names)
+    if not names:
+        return {}
+    mods_dir = os.path.join(MODS_DIR, version)
+    # Индекс перечитывает только изменившиеся jar-файлы
+    loaders = {info.filename: info.loader for info in mod_index.scan(mods_dir)}
+    entries: dict[str, FileEntry] = {}
+    for name in names:
+        try:
+            stat = os.stat(os.path.join(mods_dir, name))
+        except OSError:
+            entries[name] = None
+            continue
+        entries[name] = [stat.st_size, stat.st_mtime_ns, loaders.get(name)]
+    return entries
+
+
+class ModpackRepository:
+    """
+    Сборки в одной базе SQLite: список читается одним запросом,
+    изменения пишутся по одной сборке, а подписчики узнают, какая сборка изменилась.
+    Рядом с каждой сборкой хранится статистика её файлов, которая пересчитывается по отдельным файлам.
+    """
+
+    def __init__(self, path: str = MODPACKS_DB_PATH, legacy_dir: str = MODPACKS_DIR) -> None:
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self._packs: dict[str, dict[str, Any]] | None = None
+        self._stats: dict[str, PackStats] | None = None
+        self._listeners: list[PackListener] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS modpacks (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+                """,
+            )
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pack_stats (
+                    id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL
+                )
+                """,
+            )
+        return self._db
+
+    def subscribe(self, listener: PackListener) -> None:
+        """listener вызывается в потоке, который изменил сборку"""
+        self._listeners.append(listener)
+
+    def all(self) -> dict[str, dict[str, Any]]:
+        """ID -> сборка; поле id есть и в самих данных сборки"""
+        with self._lock:
+            return dict(self._load())
+
+    def get(self, pack_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            return self._load().get(pack_id)
+
+    def find_by_name(self, name: str) -> dict[str, Any] | None:
+        with self._lock:
+            return next((pack for pack in self._load().values() if pack['name'] == name), None)
+
+    def create(self, pack: dict[str, Any]) -> dict[str, Any]:
+        pack = {**pack, 'id': uuid.uuid4().hex}
+        self._write(pack)
+        self._notify(PACK_ADDED, pack['id'], pack)
+        return pack
+
+    def update(self, pack_id: str, pack: dict[str, Any]) -> dict[str, Any]:
+        pack = {**pack, 'id': pack_id}
+        self._write(pack)
+        self._notify(PACK_UPDATED, pack_id, pack)
+        return pack
+
+    def delete(self, pack_id: str) -> None:
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute('DELETE FROM modpacks WHERE id = ?', (pack_id,))
+                db.execute('DELETE FROM pack_stats WHERE id = ?', (pack_id,))
+            removed = self._load().pop(pack_id, None)
+            self._load_stats().pop(pack_id, None)
+        if removed is not None:
+            self._notify(PACK_REMOVED, pack_id, None)
+
+    def stats(self, pack_id: str) -> PackStats | None:
+        """
+        Статистика сборки: файлы читаются только для модов, которых ещё нет в сохранённой статистике,
+        поэтому повторные вызовы не обращаются к диску.
+        """
+        with self._lock:
+            pack = self._load().get(pack_id)
+            cached = self._load_stats().get(pack_id)
+        if pack is None:
+            return None
+        if cached is not None and cached.version == pack['version'] and cached.files.keys() == set(pack['mods']):
+            return cached
+
+        known = cached.files if cached is not None and cached.version == pack['version'] else {}
+        entries = _file_entries(pack['version'], (name for name in pack['mods'] if name not in known))
+        stats = PackStats(pack['version'], {name: known[name] if name in known else entries[name] for name in pack['mods']})
+        self._write_stats(pack_id, stats)
+        return stats
+
+    def refresh_stats(self, pack_id: str, names: Iterable[str]) -> PackStats | None:
+        """Перечитывает статистику только для указанных файлов сборки"""
+        stats = self.stats(pack_id)
+        if stats is None:
+            return None
+        entries = _file_entries(stats.version, (name for name in names if name in stats.files))
+        if entries:
+            stats = PackStats(stats.version, {**stats.files, **entries})
+            self._write_stats(pack_id, stats)
+        return stats
+
+    def packs_with_mod(self, version: str, name: str) -> list[str]:
+        with self._lock:
+            return [pack_id for pack_id, pack in self._load().items() if pack['version'] == version and name in pack['mods']]
+
+    def _write_stats(self, pack_id: str, stats: PackStats) -> None:
+        with self._lock:
+            if pack_id not in self._load():
+                return
+            db = self._connect()
+            with db:
+                db.execute('INSERT OR REPLACE INTO pack_stats VALUES (?, ?)', (pack_id, json.dumps(asdict(stats))))
+            self._load_stats()[pack_id] = stats
+
+    def _load_stats(self) -> dict[str, PackStats]:
+        """Вызывается под self._lock"""
+        if self._stats is None:
+            self._stats = {
+                pack_id: PackStats(**json.loads(data)) for pack_id, data in self._connect().execute('SELECT id, data FROM pack_stats')
+            }
+        return self._stats
+
+    def _write(self, pack: dict[str, Any]) -> None:
+        data = {key: value for key, value in pack.items() if key != 'id'}
+        with self._lock:
+            db = self._connect()
+            with db:
+                db.execute(
+                    'INSERT OR REPLACE INTO modpacks VALUES (?, ?)',
+                    (pack['id'], json.dumps(data, ensure_ascii=False)),
+                )
+            self._load()[pack['id']] = pack
+
+    def _notify(self, change: str, pack_id: str, pack: dict[str, Any] | None) -> None:
+        for listener in self._listeners:
+            listener(change, pack_id, pack)
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """Вызывается под self._lock"""
+        if self._packs is None:
+            db = self._connect()
+            self._packs = {}
+            for pack_id, data in db.execute('SELECT id, data FROM modpacks'):
+                self._packs[pack_id] = {**json.loads(data), 'id': pack_id}
+            if db.execute('PRAGMA user_version').fetchone()[0] == 0:
+                self._migrate_legacy(db)
+        return self._packs
+
+    def _migrate_legacy(self, db: sqlite3.Connection) -> None:
+        """Переносит сборки из отдельных JSON-файлов, в которых они хранились раньше"""
+        rows = []
+        for entry in os.scandir(self.legacy_dir) if os.path.isdir(self.legacy_dir) else ():
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                with open(entry.path, encoding='utf-8') as f:
+                    pack = json.load(f)
+            except Exception as e:
+                logging.exception(f'Error loading modpack {entry.name}: {e}')
+                continue
+            pack_id = uuid.uuid4().hex
+            rows.append((pack_id, json.dumps(pack, ensure_ascii=False)))
+            self._packs[pack_id] = {**pack, 'id': pack_id}
+        with db:
+            db.executemany('INSERT INTO modpacks VALUES (?, ?)', rows)
+            db.execute('PRAGMA user_version = 1')
+        if rows:
+            logging.info(f'Сборки перенесены в {self.path}: {len(rows)}')
+
+
+modpack_repository = ModpackRepository()
@@ -0,0 +1,91 @@
+import json
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Iterable
+
+from response_cache import response_cache
+
+MODRINTH_API_URL = 'https://api.modrinth.com/v2'
+# Ограничение длины URL: столько ID влезает в один запрос с запасом
+MAX_IDS_PER_REQUEST = 100
+
+
+class ModrinthMetadata:
+    """
+    Пакетная загрузка проектов и версий Modrinth через /v2/projects и /v2/versions.
+    Одновременные запросы одного и того же ID ждут один общий запрос (single-flight).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._in_flight: dict[tuple[str, str], Future] = {}
+
+    def get_projects(self, ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Проекты по ID или slug, ключ результата - запрошенный идентификатор"""
+        return self._get_many('project', ids)
+
+    def get_project(self, project_id: str) -> dict[str, Any] | None:
+        return self.get_projects([project_id]).get(project_id)
+
+    def get_versions(self, ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        return self._get_many('version', ids)
+
+    def _get_many(self, kind: str, ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        result: dict[str, dict[str, Any]] = {}
+        waiting: dict[str, Future] = {}
+        owned: dict[str, Future] = {}
+
+        for item_id in dict.fromkeys(ids):
+            cached = response_cache.peek_json(f'{MODRINTH_API_URL}/{kind}/{item_id}')
+            if cached is not None:
+                result[item_id] = cached
+                continue
+            with self._lock:
+                future = self._in_flight.get((kind, item_id))
+                if future is None:
+                    future = owned[item_id] = self._in_flight[(kind, item_id)] = Future()
+            waiting[item_id] = future
+
+        owned_ids = list(owned)
+        for start in range(0, len(owned_ids), MAX_IDS_PER_REQUEST):
+            self._fetch_batch(kind, {item_id: owned[item_id] for item_id in owned_ids[start : start + MAX_IDS_PER_REQUEST]})
+
+        for item_id, future in waiting.items():
+            try:
+                data = future.result()
+            except Exception as e:
+                logging.warning(f'Не удалось получить {kind} {item_id} с Modrinth: {e}')
+                continue
+            if data is not None:
+                result[item_id] = data
+        return result
+
+    def _fetch_batch(self, kind: str, futures: dict[str, Future]) -> None:
+        try:
+            items = response_cache.get_json(
+                f'{MODRINTH_API_URL}/{kind}s',
+                {'ids': json.dumps(sorted(futures))},
+            )
+            # Запрашивать можно и по slug, поэтому сопоставляем по обоим полям
+            by_key: dict[str, dict[str, Any]] = {}
+            for item in items or []:
+                by_key[item['id']] = item
+                if item.get('slug'):
+                    by_key[item['slug']] = item
+            for item_id, data in by_key.items():
+                if item_id in futures:
+                    response_cache.put_json(f'{MODRINTH_API_URL}/{kind}/{item_id}', data)
+            for item_id, future in futures.items():
+                future.set_result(by_key.get(item_id))
+        except Exception as e:
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                for item_id in futures:
+                    self._in_flight.pop((kind, item_id), None)
+
+
+modrinth_metadata = ModrinthMetadata()
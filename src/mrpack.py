@@ -0,0 +1,359 @@
+import json
+import logging
+import os
+import posixpath
+import shutil
+import threading
+import zipfile
+from collections.abc import Iterable
+from typing import Any, BinaryIO, Callable
+
+from config import MODS_DIR
+from downloader import DownloadCancelled, DownloadProgress, DownloadTask, downloader
+from instances import instance_manager
+from loader_catalog import loader_catalog
+from mod_resolver import InstallPlan, PlannedMod, mod_resolver
+from mod_store import mod_store
+from mod_updates import mod_update_checker, post_hashes
+from modpack_repository import modpack_repository
+
+MRPACK_INDEX = 'modrinth.index.json'
+# Файлы для клиента применяются после общих и перекрывают их
+OVERRIDE_DIRS = ('overrides/', 'client-overrides/')
+# Загрузчик в JSON сборки -> (ключ dependencies в modrinth.index.json, загрузчик в loader_catalog)
+LOADER_DEPENDENCIES = {
+    'Forge': ('forge', 'forge'),
+    'Fabric': ('fabric-loader', 'fabric'),
+    'Quilt': ('quilt-loader', 'quilt'),
+    'NeoForge': ('neoforge', 'neoforge'),
+}
+# Уже сжатые файлы пишутся в архив как есть: deflate почти не уменьшает их, а только тратит время
+STORED_EXTENSIONS = ('.jar', '.zip', '.png', '.ogg')
+CHUNK_SIZE = 1024 * 1024
+
+# Обработано байт, всего байт (None, пока неизвестно), текущий этап
+PackProgress = Callable[[int, int | None, str], None]
+
+
+class MrpackError(Exception):
+    pass
+
+
+def is_mrpack(path: str) -> bool:
+    try:
+        with zipfile.ZipFile(path) as zipf:
+            return MRPACK_INDEX in zipf.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def _check_cancelled(cancel_event: threading.Event | None, message: str) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        raise DownloadCancelled(message)
+
+
+def _download_progress(progress: PackProgress | None, stage: str) -> Callable[[DownloadProgress], None] | None:
+    if progress is None:
+        return None
+    return lambda p: progress(p.downloaded, p.total, stage)
+
+
+def _copy_stream(
+    src: BinaryIO,
+    dst: BinaryIO,
+    on_chunk: Callable[[int], None],
+    cancel_event: threading.Event | None,
+    message: str,
+) -> None:
+    while chunk := src.read(CHUNK_SIZE):
+        _check_cancelled(cancel_event, message)
+        dst.write(chunk)
+        on_chunk(len(chunk))
+
+
+def _loader_dependency(loader: str, mc_version: str) -> tuple[str, str] | None:
+    if loader not in LOADER_DEPENDENCIES:
+        return None
+    key, catalog_loader = LOADER_DEPENDENCIES[loader]
+    version = loader_catalog.latest(catalog_loader, mc_version, stable_only=True)
+    if not version:
+        return None
+    # Версии Forge в maven записаны вместе с версией игры: 1.20.1-47.2.0
+    return key, version.split('-', 1)[1] if catalog_loader == 'forge' else version
+
+
+def export_mrpack(
+    pack_data: dict[str, Any],
+    output_path: str,
+    progress: PackProgress | None = None,
+    cancel_event: threading.Event | None = None,
+) -> tuple[int, int]:
+    """
+    Сохраняет сборку в формате Modrinth: моды, известные Modrinth, записываются ссылками с хэшами,
+    в архив (overrides/mods) попадают только остальные. Архив пишется во временный файл рядом
+    и заменяет output_path только целиком, поэтому отмена или ошибка не оставляют битый архив.
+    :return: (модов ссылками, модов в архиве)
+    """
+    message = 'Экспорт сборки отменён'
+    mods_dir = os.path.join(MODS_DIR, pack_data['version'])
+    paths = [os.path.join(mods_dir, mod) for mod in pack_data['mods']]
+    if progress:
+        progress(0, None, 'Подсчёт хэшей')
+    # Изменённые файлы хэшируются параллельно в пуле процессов
+    hashes = mod_update_checker.hash_cache.hash_files(paths)
+    _check_cancelled(cancel_event, message)
+    by_sha1 = {file_hashes['sha1']: path for path, file_hashes in hashes.items()}
+    if progress:
+        progress(0, None, 'Поиск модов на Modrinth')
+    try:
+        versions = post_hashes('version_files', list(by_sha1)) if by_sha1 else {}
+    except Exception as e:
+        logging.warning(f'Не удалось найти моды сборки на Modrinth, все файлы попадут в архив: {e}')
+        versions = {}
+    _check_cancelled(cancel_event, message)
+
+    files = []
+    embedded = []
+    for path, file_hashes in hashes.items():
+        version = versions.get(file_hashes['sha1'])
+        file = next((f for f in (version or {}).get('files', []) if f['hashes'].get('sha1') == file_hashes['sha1']), None)
+        if file is None:
+            embedded.append(path)
+            continue
+        files.append(
+            {
+                'path': f'mods/{os.path.basename(path)}',
+                'hashes': {'sha1': file_hashes['sha1'], 'sha512': file_hashes['sha512']},
+                'env': {'client': 'required', 'server': 'required'},
+                'downloads': [file['url']],
+                'fileSize': file.get('size') or os.path.getsize(path),
+            },
+        )
+
+    dependencies = {'minecraft': pack_data['version']}
+    loader_dependency = _loader_dependency(pack_data['loader'], pack_data['version'])
+    if loader_dependency:
+        dependencies[loader_dependency[0]] = loader_dependency[1]
+    index = {
+        'formatVersion': 1,
+        'game': 'minecraft',
+        'versionId': pack_data.get('pack_version', '1.0.0'),
+        'name': pack_data['name'],
+        'files': files,
+        'dependencies': dependencies,
+    }
+
+    total = sum(os.path.getsize(path) for path in embedded)
+    written = 0
+
+    def advance(count: int) -> None:
+        nonlocal written
+        written += count
+        if progress:
+            progress(written, total, 'Запись архива')
+
+    tmp_path = f'{output_path}.part'
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            zipf.writestr(MRPACK_INDEX, json.dumps(index, indent=2, ensure_ascii=False))
+            for path in embedded:
+                info = zipfile.ZipInfo.from_file(path, f'overrides/mods/{os.path.basename(path)}')
+                info.compress_type = zipfile.ZIP_STORED if path.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+                with open(path, 'rb') as src, zipf.open(info, 'w') as dst:
+                    _copy_stream(src, dst, advance, cancel_event, message)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logging.info(f'Сборка {pack_data["name"]} экспортирована: ссылками {len(files)}, в архиве {len(embedded)}')
+    return len(files), len(embedded)
+
+
+def _is_plain_name(name: Any) -> bool:
+    """Имя файла или папки без путей: из архива оно не должно указывать за пределы папки игры"""
+    return (
+        isinstance(name, str)
+        and name not in ('', '.', '..')
+        and not any(char in name for char in ('/', '\\', ':'))
+        and not os.path.isabs(name)
+    )
+
+
+def _target_path(relative_path: str, mc_version: str, game_dir: str) -> str:
+    """Путь файла сборки на диске: моды - в папку модов версии, остальное - в папку игры сборки"""
+    normalized = posixpath.normpath(relative_path.replace('\\', '/'))
+    if normalized.startswith(('../', '/')) or normalized == '..' or ':' in normalized:
+        raise MrpackError(f'Недопустимый путь в сборке: {relative_path}')
+    if normalized.startswith('mods/'):
+        return os.path.join(MODS_DIR, mc_version, *normalized.split('/')[1:])
+    return os.path.join(game_dir, *normalized.split('/'))
+
+
+def _planned_files(
+    files: Iterable[dict[str, Any]],
+    mc_version: str,
+    game_dir: str,
+) -> tuple[list[PlannedMod], list[DownloadTask]]:
+    """
+    Моды (идут через хранилище модов) и остальные файлы сборки (настройки, ресурспаки),
+    которые игра может менять, поэтому они скачиваются отдельными копиями. Серверные файлы пропускаются.
+    """
+    mods_dir = os.path.join(MODS_DIR, mc_version)
+    mods: list[PlannedMod] = []
+    other: list[DownloadTask] = []
+    for file in files:
+        if file.get('env', {}).get('client') == 'unsupported':
+            continue
+        hashes = {algo: value for algo, value in file['hashes'].items() if algo in ('sha1', 'sha512')}
+        if 'sha512' not in hashes or not file.get('downloads'):
+            raise MrpackError(f'У файла {file["path"]} нет SHA-512 или ссылки для загрузки')
+        dest = _target_path(file['path'], mc_version, game_dir)
+        if os.path.dirname(dest) == mods_dir:
+            name = os.path.basename(dest)
+            mods.append(PlannedMod('', '', '', name, name, file['downloads'][0], hashes, file.get('fileSize')))
+        else:
+            other.append(DownloadTask(file['downloads'][0], dest, hashes, file.get('fileSize')))
+    return mods, other
+
+
+def import_mrpack(
+    file_path: str,
+    game_dir: str,
+    progress: PackProgress | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict[str, Any]:
+    """
+    Устанавливает сборку .mrpack: файлы по ссылкам скачиваются параллельно с проверкой SHA-512,
+    уже имеющиеся в хранилище модов берутся с диска.
+    Моды попадают в папку модов версии, настройки и ресурспаки - в game_dir.
+    :return: данные сборки для хранилища сборок
+    :raises MrpackError: если архив не является сборкой Modrinth для Minecraft
+    :raises DownloadCancelled: если импорт отменён через cancel_event
+    """
+    message = 'Импорт сборки отменён'
+    with zipfile.ZipFile(file_path) as zipf:
+        try:
+            index = json.loads(zipf.read(MRPACK_INDEX))
+        except KeyError:
+            raise MrpackError(f'Отсутствует файл {MRPACK_INDEX} в архиве')
+        if index.get('game') != 'minecraft' or 'minecraft' not in index.get('dependencies', {}):
+            raise MrpackError('Сборка предназначена не для Minecraft')
+
+        dependencies = index['dependencies']
+        mc_version = dependencies['minecraft']
+        if not _is_plain_name(mc_version):
+            raise MrpackError(f'Недопустимая версия Minecraft в сборке: {mc_version}')
+        loader = next(
+            (name for name, (key, _) in LOADER_DEPENDENCIES.items() if key in dependencies),
+            'Vanilla',
+        )
+
+        planned, other = _planned_files(index.get('files', []), mc_version, game_dir)
+        mods_dir = os.path.join(MODS_DIR, mc_version)
+        os.makedirs(mods_dir, exist_ok=True)
+        mod_resolver.install(
+            InstallPlan(mc_version, None, planned),
+            mods_dir,
+            _download_progress(progress, 'Загрузка модов'),
+            cancel_event,
+        )
+        if other:
+            downloader.download_all(other, _download_progress(progress, 'Загрузка файлов сборки'), cancel_event)
+
+        mods = [mod.filename for mod in planned]
+        entries = [
+            entry for prefix in OVERRIDE_DIRS for entry in zipf.infolist() if not entry.is_dir() and entry.filename.startswith(prefix)
+        ]
+        total = sum(entry.file_size for entry in entries)
+        extracted = 0
+        for entry in entries:
+            _check_cancelled(cancel_event, message)
+            prefix = next(prefix for prefix in OVERRIDE_DIRS if entry.filename.startswith(prefix))
+            dest = _target_path(entry.filename[len(prefix) :], mc_version, game_dir)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            with zipf.open(entry) as src:
+                if os.path.dirname(dest) == mods_dir:
+                    mod_store.install_stream(src, dest)
+                    mods.append(os.path.basename(dest))
+                else:
+                    with open(dest, 'wb') as f:
+                        _copy_stream(src, f, lambda count: None, cancel_event, message)
+            extracted += entry.file_size
+            if progress:
+                progress(extracted, total, 'Распаковка файлов сборки')
+
+    logging.info(f'Сборка {index.get("name")} импортирована: файлов по ссылкам {len(planned) + len(other)}')
+    return {
+        'name': index.get('name') or os.path.splitext(os.path.basename(file_path))[0],
+        'version': mc_version,
+        'loader': loader,
+        'mods': list(dict.fromkeys(mods)),
+    }
+
+
+def import_legacy_zip(
+    file_path: str,
+    game_dir: str,
+    progress: PackProgress | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict[str, Any]:
+    """Сборка в прежнем формате лаунчера: modpack.json и моды внутри архива"""
+    with zipfile.ZipFile(file_path) as zipf:
+        try:
+            pack_data = json.loads(zipf.read('modpack.json'))
+        except KeyError:
+            raise MrpackError('Отсутствует файл modpack.json в архиве')
+        if not _is_plain_name(pack_data.get('version')):
+            raise MrpackError(f'Недопустимая версия Minecraft в сборке: {pack_data.get("version")}')
+        invalid = [mod for mod in pack_data.get('mods', []) if not _is_plain_name(mod)]
+        if invalid:
+            raise MrpackError(f'Недопустимые имена модов в сборке: {", ".join(map(str, invalid))}')
+        mods_dir = os.path.join(MODS_DIR, pack_data['version'])
+        os.makedirs(mods_dir, exist_ok=True)
+
+        for number, mod in enumerate(pack_data['mods'], 1):
+            _check_cancelled(cancel_event, 'Импорт сборки отменён')
+            # Тот же путь, что и у модов .mrpack, с той же проверкой выхода за папку игры
+            dest = _target_path(f'mods/{mod}', pack_data['version'], game_dir)
+            if os.path.dirname(dest) != mods_dir:
+                raise MrpackError(f'Недопустимый путь в сборке: mods/{mod}')
+            try:
+                with zipf.open(f'mods/{mod}') as src:
+                    mod_store.install_stream(src, dest)
+            except KeyError:
+                logging.warning(f'Мод {mod} отсутствует в архиве')
+            if progress:
+                progress(number, len(pack_data['mods']), 'Распаковка модов')
+    return pack_data
+
+
+def import_pack(
+    file_path: str,
+    progress: PackProgress | None = None,
+    cancel_event: threading.Event | None = None,
+) -> dict[str, Any]:
+    """
+    Импортирует .mrpack или архив прежнего формата лаунчера и сохраняет сборку.
+    Файлы игры сборки распаковываются во временную папку и переносятся в папку сборки, когда известен её ID.
+    :return: сохранённая сборка
+    """
+    staging_dir = instance_manager.stage()
+    try:
+        if is_mrpack(file_path):
+            pack_data = import_mrpack(file_path, staging_dir, progress, cancel_event)
+        else:
+            pack_data = import_legacy_zip(file_path, staging_dir, progress, cancel_event)
+        pack = save_imported_pack(pack_data)
+        instance_manager.apply_staged(pack['id'], staging_dir)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return pack
+
+
+def save_imported_pack(pack_data: dict[str, Any]) -> dict[str, Any]:
+    """Импортированная сборка заменяет сборку с тем же названием"""
+    existing = modpack_repository.find_by_name(pack_data['name'])
+    if existing is None:
+        return modpack_repository.create(pack_data)
+    return modpack_repository.update(existing['id'], {**existing, **pack_data})
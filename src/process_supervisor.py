@@ -0,0 +1,114 @@
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import IO, Callable
+
+from config import SESSION_LOGS_DIR
+from flow import dedicate
+
+CRASH_MARKER = '#@!@#'
+MAX_SESSION_LOGS = 10
+MAX_SESSION_LOG_BYTES = 20 * 1024 * 1024
+
+
+def new_session_log_path(log_dir: str = SESSION_LOGS_DIR, keep: int = MAX_SESSION_LOGS) -> str:
+    """Создаёт путь для лога новой сессии и удаляет самые старые логи"""
+    os.makedirs(log_dir, exist_ok=True)
+    sessions = sorted(f for f in os.listdir(log_dir) if f.startswith('session-') and f.endswith('.log'))
+    for name in sessions[: max(len(sessions) - keep + 1, 0)]:
+        for path in (os.path.join(log_dir, name), os.path.join(log_dir, f'{name}.1')):
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                logging.warning(f'Не удалось удалить старый лог {path}: {e}')
+    return os.path.join(log_dir, f'session-{time.strftime("%Y%m%d-%H%M%S")}.log')
+
+
+class ProcessSupervisor:
+    """Вычитывает stdout/stderr игры в фоне, хранит хвост лога и пишет лог сессии"""
+
+    def __init__(
+        self,
+        process: subprocess.Popen,
+        on_line: Callable[[str, str], None] | None = None,
+        on_exit: Callable[['ProcessSupervisor'], None] | None = None,
+        buffer_size: int = 2000,
+        log_path: str | None = None,
+        max_log_bytes: int = MAX_SESSION_LOG_BYTES,
+    ) -> None:
+        self.process = process
+        self.on_line = on_line
+        self.on_exit = on_exit
+        self.lines: deque[str] = deque(maxlen=buffer_size)
+        self.log_path = log_path or new_session_log_path()
+        self.max_log_bytes = max_log_bytes
+        self.returncode: int | None = None
+        self.crash_report: str | None = None
+        self._crash_marker_seen = False
+        self._lock = threading.Lock()
+        self._log_file = open(self.log_path, 'w', encoding='utf-8')
+        self._log_bytes = 0
+        self._readers: list[threading.Thread] = []
+
+    @property
+    def crashed(self) -> bool:
+        return self.returncode not in (None, 0) or self._crash_marker_seen
+
+    def start(self) -> None:
+        for name, stream in (('stdout', self.process.stdout), ('stderr', self.process.stderr)):
+            if stream is not None:
+                self._readers.append(dedicate(self._drain, name, stream))
+        dedicate(self._wait)
+
+    def tail(self, count: int = 50) -> list[str]:
+        with self._lock:
+            return list(self.lines)[-count:]
+
+    def _drain(self, name: str, stream: IO[bytes]) -> None:
+        try:
+            for raw in iter(stream.readline, b''):
+                line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+                self._handle_line(name, line)
+        except Exception as e:
+            logging.exception(f'Ошибка чтения {name} процесса игры: {e}')
+        finally:
+            stream.close()
+
+    def _handle_line(self, name: str, line: str) -> None:
+        with self._lock:
+            self.lines.append(line)
+            self._write_log(line)
+            if CRASH_MARKER in line:
+                self._crash_marker_seen = True
+                # "#@!@# Game crashed! Crash report saved to: #@!@# <путь>"
+                path = line.rsplit(CRASH_MARKER, 1)[-1].strip()
+                if path.endswith('.txt'):
+                    self.crash_report = path
+        if self.on_line:
+            self.on_line(name, line)
+
+    def _write_log(self, line: str) -> None:
+        data = line + '\n'
+        size = len(data.encode('utf-8'))
+        if self._log_bytes + size > self.max_log_bytes:
+            # Ротация: текущий файл становится .1, лог продолжается в новом
+            self._log_file.close()
+            os.replace(self.log_path, f'{self.log_path}.1')
+            self._log_file = open(self.log_path, 'w', encoding='utf-8')
+            self._log_bytes = 0
+        self._log_file.write(data)
+        self._log_bytes += size
+
+    def _wait(self) -> None:
+        self.returncode = self.process.wait()
+        for reader in self._readers:
+            reader.join()
+        with self._lock:
+            self._log_file.close()
+        logging.info(f'[GAME] Процесс завершился с кодом {self.returncode}, лог: {self.log_path}')
+        if self.on_exit:
+            self.on_exit(self)
@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any
+
+import requests
+
+import http_client
+from config import RESPONSE_CACHE_PATH
+from http_client import RequestCancelled, read_text
+
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+# Сколько живёт запомненный 404, чтобы не долбить API несуществующими ID
+NEGATIVE_TTL = 5 * 60
+DEFAULT_TTL = 10 * 60
+# Порядок важен: первое совпадение определяет TTL
+TTL_RULES: list[tuple[re.Pattern[str], int]] = [
+    (re.compile(r'/v2/search'), 10 * 60),
+    (re.compile(r'/v2/project/[^/]+/version'), 30 * 60),
+    (re.compile(r'/v2/(project|projects)\b'), 60 * 60),
+    (re.compile(r'/v2/(version|versions)\b'), 60 * 60),
+    (re.compile(r'/v2/tag/'), 24 * 60 * 60),
+]
+
+
+def ttl_for(url: str) -> int:
+    for pattern, ttl in TTL_RULES:
+        if pattern.search(url):
+            return ttl
+    return DEFAULT_TTL
+
+
+def cache_key(url: str, params: dict[str, Any] | None = None) -> str:
+    """Нормализованный URL: параметры отсортированы, чтобы порядок не влиял на ключ"""
+    items = sorted((params or {}).items())
+    prepared = requests.Request('GET', url, params=items).prepare()
+    return prepared.url or url
+
+
+class ResponseCache:
+    """Дисковый кэш JSON-ответов API на SQLite с TTL и ревалидацией по ETag"""
+
+    def __init__(self, path: str = RESPONSE_CACHE_PATH, max_bytes: int = MAX_CACHE_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    status INTEGER NOT NULL,
+                    body TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """,
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        return self._db
+
+    def get_json(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        ttl: int | None = None,
+        cancel_event: threading.Event | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Возвращает JSON ответа из кэша или из сети.
+        :param cancel_event: прерывает загрузку ответа, прерванный ответ не кэшируется
+        :return: данные ответа или None, если ресурс не найден (404/410)
+        :raises requests.RequestException: при ошибке сети, если в кэше ничего нет
+        :raises RequestCancelled: если запрос был отменён
+        """
+        key = cache_key(url, params)
+        now = time.time()
+        row = self._lookup(key, now)
+        if row is not None and row['expires_at'] > now:
+            return self._decode(row)
+
+        request_headers = {}
+        if row is not None and row['status'] == 200:
+            if row['etag']:
+                request_headers['If-None-Match'] = row['etag']
+            if row['last_modified']:
+                request_headers['If-Modified-Since'] = row['last_modified']
+
+        ttl = ttl if ttl is not None else ttl_for(url)
+        if cancel_event is not None and cancel_event.is_set():
+            raise RequestCancelled(key)
+        try:
+            response = http_client.get(
+                url,
+                params=params,
+                headers=request_headers,
+                stream=cancel_event is not None,
+                **kwargs,
+            )
+        except requests.RequestException:
+            if row is not None and row['status'] == 200:
+                logging.warning(f'Сеть недоступна, используем устаревший кэш: {key}')
+                return self._decode(row)
+            raise
+
+        with response:
+            if response.status_code == 304 and row is not None:
+                self._touch(key, now + ttl)
+                return self._decode(row)
+            if response.status_code == 200:
+                body = read_text(response, cancel_event)
+                self._store(key, 200, body, response.headers, now + ttl)
+                return json.loads(body)
+            if response.status_code in (404, 410):
+                self._store(key, response.status_code, None, response.headers, now + NEGATIVE_TTL)
+                return None
+
+            # Ошибки сервера не кэшируются, но старые данные лучше, чем ничего
+            if row is not None and row['status'] == 200:
+                logging.warning(f'API вернул {response.status_code}, используем устаревший кэш: {key}')
+                return self._decode(row)
+            response.raise_for_status()
+            return None
+
+    def peek_json(self, url: str, params: dict[str, Any] | None = None) -> Any:
+        """Возвращает свежие данные из кэша без обращения к сети (или None)"""
+        now = time.time()
+        row = self._lookup(cache_key(url, params), now)
+        if row is None or row['status'] != 200 or row['expires_at'] <= now:
+            return None
+        return self._decode(row)
+
+    def put_json(self, url: str, data: Any, params: dict[str, Any] | None = None, ttl: int | None = None) -> None:
+        """Кладёт в кэш данные, полученные другим запросом (например, пакетным)"""
+        ttl = ttl if ttl is not None else ttl_for(url)
+        self._store(cache_key(url, params), 200, json.dumps(data), {}, time.time() + ttl)
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._connect()
+            db.execute('DELETE FROM responses')
+            db.commit()
+
+    @staticmethod
+    def _decode(row: dict[str, Any]) -> Any:
+        return json.loads(row['body']) if row['body'] is not None else None
+
+    def _lookup(self, key: str, now: float) -> dict[str, Any] | None:
+        with self._lock:
+            db = self._connect()
+            cursor = db.execute(
+                'SELECT status, body, etag, last_modified, expires_at FROM responses WHERE key = ?',
+                (key,),
+            )
+            result = cursor.fetchone()
+            if result is None:
+                return None
+            db.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            db.commit()
+        status, body, etag, last_modified, expires_at = result
+        return {
+            'status': status,
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'expires_at': expires_at,
+        }
+
+    def _touch(self, key: str, expires_at: float) -> None:
+        with self._lock:
+            db = self._connect()
+            db.execute('UPDATE responses SET expires_at = ? WHERE key = ?', (expires_at, key))
+            db.commit()
+
+    def _store(self, key: str, status: int, body: str | None, headers: Any, expires_at: float) -> None:
+        size = len(key) + len(body or '')
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    key,
+                    status,
+                    body,
+                    headers.get('ETag'),
+                    headers.get('Last-Modified'),
+                    expires_at,
+                    time.time(),
+                    size,
+                ),
+            )
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """Удаляет давно не использованные ответы, пока кэш не уложится в лимит"""
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes * 0.9
+        freed = 0
+        keys = []
+        for key, size in db.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            if freed >= excess:
+                break
+            keys.append((key,))
+            freed += size
+        db.executemany('DELETE FROM responses WHERE key = ?', keys)
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,106 @@
+import logging
+import math
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from flow import dedicate
+from http_client import RequestCancelled
+
+PAGE_SIZE = 10
+# Сколько страниц держим в памяти вокруг текущей
+MAX_CACHED_PAGES = 5
+
+# (offset, limit, cancel_event) -> (результаты, всего результатов)
+PageFetcher = Callable[[int, int, threading.Event | None], tuple[list[dict[str, Any]], int]]
+
+
+class SearchPages:
+    """
+    Постраничные результаты одного поиска с окном закэшированных страниц.
+    Страницы запрашиваются у API по offset, соседние подгружаются заранее.
+    """
+
+    def __init__(self, fetch: PageFetcher, page_size: int = PAGE_SIZE, max_pages: int = MAX_CACHED_PAGES) -> None:
+        self.fetch = fetch
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.total_hits: int | None = None
+        self._pages: dict[int, list[dict[str, Any]]] = {}
+        self._in_flight: dict[int, Future] = {}
+        self._current = 1
+        self._lock = threading.Lock()
+
+    @property
+    def total_pages(self) -> int:
+        if not self.total_hits:
+            return 1
+        return math.ceil(self.total_hits / self.page_size)
+
+    def peek(self, page: int) -> list[dict[str, Any]] | None:
+        """Страница из памяти без обращения к сети, окно кэша сдвигается к ней"""
+        with self._lock:
+            self._current = page
+            return self._pages.get(page)
+
+    def get(self, page: int, cancel_event: threading.Event | None = None) -> list[dict[str, Any]]:
+        """
+        Возвращает страницу (нумерация с 1), при необходимости загружает её.
+        Одновременные запросы одной страницы ждут одну загрузку.
+        :raises RequestCancelled: если запрос был отменён
+        """
+        while True:
+            with self._lock:
+                if page in self._pages:
+                    return self._pages[page]
+                future = self._in_flight.get(page)
+                owner = future is None
+                if owner:
+                    future = self._in_flight[page] = Future()
+
+            if owner:
+                return self._load(page, future, cancel_event)
+            try:
+                return future.result()
+            except RequestCancelled:
+                # Отменили чужой запрос, а не наш - пробуем загрузить сами
+                if cancel_event is not None and cancel_event.is_set():
+                    raise
+
+    def prefetch(self, page: int) -> None:
+        """Загружает страницу в фоне, если она существует и ещё не загружена"""
+        if page < 1 or page > self.total_pages:
+            return
+        with self._lock:
+            if page in self._pages or page in self._in_flight:
+                return
+        dedicate(self._prefetch, page)
+
+    def _prefetch(self, page: int) -> None:
+        try:
+            self.get(page)
+        except Exception as e:
+            logging.warning(f'Не удалось заранее загрузить страницу {page}: {e}')
+
+    def _load(self, page: int, future: Future, cancel_event: threading.Event | None) -> list[dict[str, Any]]:
+        try:
+            hits, total_hits = self.fetch((page - 1) * self.page_size, self.page_size, cancel_event)
+        except BaseException as e:
+            with self._lock:
+                self._in_flight.pop(page, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self.total_hits = total_hits
+            self._pages[page] = hits
+            self._in_flight.pop(page, None)
+            self._evict()
+        future.set_result(hits)
+        return hits
+
+    def _evict(self) -> None:
+        """Выбрасывает страницы, дальше всего отстоящие от текущей"""
+        while len(self._pages) > self.max_pages:
+            farthest = max(self._pages, key=lambda page: abs(page - self._current))
+            del self._pages[farthest]
@@ -2,12 +2,10 @@ import json
 import logging
 import os
 import random
-import shutil
 import sys
 from typing import Any
 
-import requests
-
+import http_client
 from config import (
     AUTHLIB_INJECTOR_URL,
     AUTHLIB_JAR_PATH,
@@ -18,6 +16,7 @@ from config import (
     nouns,
     numbers,
 )
+from downloader import DownloadTask, downloader
 
 
 def setup_directories():
@@ -69,13 +68,16 @@ def generate_random_username():
 def download_authlib_injector():
     """Скачивает последнюю версию Authlib Injector"""
     try:
-        response = requests.get(AUTHLIB_INJECTOR_URL)
+        response = http_client.get(AUTHLIB_INJECTOR_URL)
         data = response.json()
-        download_url = data['download_url']
 
-        response = requests.get(download_url, stream=True)
-        with open(AUTHLIB_JAR_PATH, 'wb') as f:
-            shutil.copyfileobj(response.raw, f)
+        downloader.download(
+            DownloadTask(
+                url=data['download_url'],
+                dest=AUTHLIB_JAR_PATH,
+                hashes=data.get('checksums', {}),
+            ),
+        )
         return True
     except Exception as e:
         logging.exception(f'Ошибка загрузки Authlib Injector: {e}')
@@ -85,7 +87,7 @@ def download_authlib_injector():
 def download_optifine(version: str):
     try:
         url = 'https://optifine.net/downloads'
-        response = requests.get(url)
+        response = http_client.get(url)
         if response.status_code != 200:
             return None, 'Не удалось получить страницу загрузки OptiFine.'
 
@@ -110,28 +112,6 @@ def install_optifine(version: str):
     return True, f'Открой сайт и скачай OptiFine {version} вручную.'
 
 
-def get_quilt_versions(mc_version: str) -> list[dict[str, Any]]:
-    """Получает версии Quilt через официальное API"""
-    try:
-        response = requests.get(
-            'https://meta.quiltmc.org/v3/versions/loader',
-            timeout=15,
-        )
-        data = response.json()
-        return [
-            {
-                'version': loader['version'],
-                'minecraft_version': loader['separator'],  # Исправлено с metadata
-                'stable': not loader['version'].lower().startswith('beta'),
-            }
-            for loader in data
-            if mc_version in loader['separator']
-        ]
-    except Exception as e:
-        logging.exception(f'Quilt version fetch failed: {e!s}')
-        return []
-
-
 def authenticate_ely_by(username, password) -> dict[str, Any] | None:
     url = 'https://authserver.ely.by/authenticate'
     headers = {'Content-Type': 'application/json'}
@@ -142,7 +122,7 @@ def authenticate_ely_by(username, password) -> dict[str, Any] | None:
         'requestUser': True,
     }
 
-    response = requests.post(url, json=payload, headers=headers)
+    response = http_client.post(url, json=payload, headers=headers)
 
     if response.status_code == 200:
         data = response.json()
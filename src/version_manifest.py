@@ -0,0 +1,114 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+import http_client
+from config import MINECRAFT_DIR, VERSION_MANIFEST_PATH, VERSION_MANIFEST_URL
+from flow import dedicate
+
+# Без сети и без копии на диске не пытаемся скачать манифест при каждом обращении
+RETRY_DELAY = 5 * 60
+
+
+class VersionManifest:
+    """Манифест версий Minecraft с копией на диске и фоновой ревалидацией"""
+
+    def __init__(self, url: str = VERSION_MANIFEST_URL, path: str = VERSION_MANIFEST_PATH) -> None:
+        self.url = url
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: dict[str, Any] | None = None
+        self._refresh_started = False
+        self._failed_at = 0.0
+
+    def get_versions(self) -> list[dict[str, Any]]:
+        """Возвращает список версий: из памяти, с диска или (при первом запуске) из сети"""
+        with self._lock:
+            if self._data is None:
+                self._data = self._load_from_disk()
+            data = self._data
+            failed_recently = time.time() - self._failed_at < RETRY_DELAY
+
+        if data is None:
+            if failed_recently:
+                return []
+            # Копии на диске нет - единственный случай, когда ждём сеть
+            self._refresh_started = True
+            data = self.refresh()
+        else:
+            self.refresh_in_background()
+
+        if not data:
+            return []
+        return data['manifest'].get('versions', [])
+
+    def get_release_ids(self) -> list[str]:
+        return [version['id'] for version in self.get_versions() if version['type'] == 'release']
+
+    def refresh_in_background(self) -> None:
+        """Один раз за сессию ревалидирует манифест в фоновом потоке"""
+        with self._lock:
+            if self._refresh_started:
+                return
+            self._refresh_started = True
+        dedicate(self.refresh)
+
+    def refresh(self) -> dict[str, Any] | None:
+        """Условный запрос манифеста (ETag / If-Modified-Since)"""
+        with self._lock:
+            cached = self._data
+
+        request_headers = {}
+        if cached:
+            if cached.get('etag'):
+                request_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                request_headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            response = http_client.get(self.url, headers=request_headers, timeout=(5, 15))
+            if response.status_code == 304:
+                logging.debug('Манифест версий не изменился')
+                return cached
+            response.raise_for_status()
+            data = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'manifest': response.json(),
+            }
+        except Exception as e:
+            logging.warning(f'Не удалось обновить манифест версий: {e}')
+            with self._lock:
+                self._failed_at = time.time()
+            return cached
+
+        with self._lock:
+            self._data = data
+        self._save_to_disk(data)
+        return data
+
+    def _load_from_disk(self) -> dict[str, Any] | None:
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logging.exception(f'Ошибка чтения манифеста версий: {e}')
+            return None
+
+    def _save_to_disk(self, data: dict[str, Any]) -> None:
+        try:
+            os.makedirs(MINECRAFT_DIR, exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logging.exception(f'Ошибка сохранения манифеста версий: {e}')
+
+
+version_manifest = VersionManifest()